@@ -0,0 +1,121 @@
+from __future__ import annotations
+from typing import Dict, Optional
+from src import errors
+from src.elementtable import CAPACITOR, INDUCTOR, RESISTOR, ElementTable
+from src.solver import GROUND_NODE, MNAPattern
+import numpy as np
+
+
+AC_CHUNK_SIZE = 1024
+
+
+class ACAnalysis:
+    """ Small-signal frequency sweep of R, L, C and source circuits
+
+    Every frequency point is a complex admittance system (G + jwC + 1/jwL) sharing a
+    single sparsity pattern and column ordering. The source values are used as the
+    amplitude of their (zero phase) AC excitation unless overridden by `sources`.
+
+    Attributes
+        element_table: the elements of the circuit
+        pattern: the MNA pattern shared by every frequency point
+        sources: the complex amplitude of the sources, by element table row
+    """
+
+    def __init__(
+        self,
+        element_table: ElementTable,
+        sources: Optional[Dict[int, complex]] = None,
+    ):
+        self.element_table = element_table
+        self.capacitors = element_table.indices(CAPACITOR)
+        self.inductors = element_table.indices(INDUCTOR)
+        self.pattern = MNAPattern(
+            element_table,
+            conductance_elements=np.concatenate(
+                (element_table.indices(RESISTOR), self.capacitors, self.inductors)
+            ),
+        )
+        self.excitation = np.array(element_table.value, dtype=np.complex128)
+        for index, amplitude in (sources or {}).items():
+            self.excitation[index] = amplitude
+
+    def admittances(self, frequencies: np.ndarray) -> np.ndarray:
+        """Returns the stamped admittance of every element at every frequency
+
+        Parameters:
+            frequencies (np.ndarray): the frequencies in Hz, (points,)
+
+        Returns:
+            np.ndarray: the admittances, (points, elements)
+        """
+        omega = 2 * np.pi * np.asarray(frequencies, dtype=np.float64)[:, None]
+        values = self.element_table.value
+        admittances = np.zeros((omega.shape[0], len(values)), dtype=np.complex128)
+        admittances[:, self.pattern.resistors] = 1 / values[self.pattern.resistors]
+        admittances[:, self.capacitors] = 1j * omega * values[self.capacitors]
+        admittances[:, self.inductors] = 1 / (1j * omega * values[self.inductors])
+        return admittances
+
+    def run(self, frequencies: np.ndarray, chunk_size: int = AC_CHUNK_SIZE) -> ACSolution:
+        """Solves the circuit at every frequency, in vectorized chunks of points
+
+        Parameters:
+            frequencies (np.ndarray): the frequencies in Hz, all positive
+            chunk_size (int): the number of frequency points solved together
+
+        Returns:
+            ACSolution: the node phasors at every frequency
+        """
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype=np.float64))
+        if np.any(frequencies <= 0):
+            raise ValueError("the AC frequencies must be positive")
+        rhs = self.pattern.rhs(self.excitation.real) + 1j * self.pattern.rhs(self.excitation.imag)
+        x = np.empty((len(frequencies), self.pattern.size), dtype=np.complex128)
+        for begin in range(0, len(frequencies), chunk_size):
+            points = frequencies[begin : begin + chunk_size]
+            x[begin : begin + chunk_size] = self.pattern.solve_conductance_batch(
+                self.admittances(points), np.broadcast_to(rhs, (len(points), len(rhs)))
+            )
+        return ACSolution(self, frequencies, x)
+
+
+class ACSolution:
+    """ The phasors of a circuit over a frequency sweep
+
+    Attributes
+        frequencies: the frequencies of the sweep, (points,)
+        nodes: the non-ground node numbers
+        node_voltages: the node voltage phasors, (points, nodes)
+        voltage_source_currents: the voltage source current phasors, (points, sources)
+    """
+
+    def __init__(self, analysis: ACAnalysis, frequencies: np.ndarray, x: np.ndarray):
+        self.analysis = analysis
+        pattern = analysis.pattern
+        self.frequencies = frequencies
+        self.x = x
+        self.nodes = pattern.nodes
+        self.node_voltages = pattern.node_voltages(x)
+        self.voltage_source_currents = x[:, pattern.node_count :]
+
+    def voltage(self, node: int) -> np.ndarray:
+        """Returns the phasor of a node voltage at every frequency"""
+        if node == GROUND_NODE:
+            return np.zeros(len(self.frequencies), dtype=np.complex128)
+        index = int(np.searchsorted(self.nodes, node))
+        if index >= len(self.nodes) or self.nodes[index] != node:
+            raise KeyError(node)
+        return self.node_voltages[:, index]
+
+    def transfer(self, output_node: int, input_node: int) -> np.ndarray:
+        """Returns the transfer function V(output_node) / V(input_node) at every frequency"""
+        return self.voltage(output_node) / self.voltage(input_node)
+
+    def impedance(self) -> np.ndarray:
+        """Returns the impedance seen by the only voltage source at every frequency"""
+        pattern = self.analysis.pattern
+        if len(pattern.voltage_sources) != 1:
+            raise errors.SingularCircuitError("the impedance needs exactly one voltage source")
+        source = pattern.voltage_sources[0]
+        return -self.analysis.excitation[source] / self.voltage_source_currents[:, 0]
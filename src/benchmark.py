@@ -0,0 +1,245 @@
+from __future__ import annotations
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+from src import components
+from src.generators import GENERATORS, format_values, generate, write_generated_netlist
+from src.netlistparser import Netlist
+from src.profiling import Profiler, stage
+from src.reduction import ReductionEngine
+from src.solver import MNASystem
+import argparse
+import json
+import sys
+
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+STAGES = ("parse", "convert_value", "reduce", "solve")
+BASELINE_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "baseline.json"
+BASELINE_VERSION = 1
+# a metric regresses when it grows by more than this fraction of its baseline
+DEFAULT_TOLERANCE = 0.5
+# timings below this many seconds are too noisy to be compared
+MIN_COMPARED_SECONDS = 1e-2
+
+
+class BenchmarkResult(NamedTuple):
+    """ The measurements of one stage on one generated circuit
+
+    Attributes
+        family: the generator family (see generators.GENERATORS)
+        elements: the number of elements of the circuit
+        stage: the benchmarked stage (see STAGES)
+        seconds: the best wall time of the repeated runs
+        peak_bytes: the peak of the memory allocated by one run
+    """
+
+    family: str
+    elements: int
+    stage: str
+    seconds: float
+    peak_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.family}/{self.elements}/{self.stage}"
+
+
+class Regression(NamedTuple):
+    """ A metric of a benchmark that grew beyond the tolerance over its baseline """
+
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+    def __str__(self) -> str:
+        return (
+            f"{self.key} {self.metric}: {self.baseline:.6g} -> {self.current:.6g} "
+            f"(x{self.ratio:.2f})"
+        )
+
+
+def _stage_runs(table, netlist_path: Path) -> Dict[str, Callable[[], object]]:
+    literals = format_values(table.value).tolist()
+
+    def convert_values():
+        components._convert_literal.cache_clear()
+        return [components.convert_value(literal) for literal in literals]
+
+    return {
+        "parse": lambda: Netlist.read_element_table(netlist_path),
+        "convert_value": convert_values,
+        "reduce": lambda: ReductionEngine.from_table(table, record_steps=False).reduce(),
+        "solve": lambda: MNASystem(table).solve(),
+    }
+
+
+def measure(run: Callable[[], object], repeat: int = 3, name: str = "run") -> tuple:
+    """Times the best of `repeat` runs, then traces the allocations of one more run
+
+    The timed runs do not trace allocations, tracemalloc slowing them down several times.
+
+    Returns:
+        tuple: the best wall time in seconds and the allocation peak in bytes
+    """
+    seconds = float("inf")
+    for _ in range(max(repeat, 1)):
+        start = perf_counter()
+        run()
+        seconds = min(seconds, perf_counter() - start)
+    with Profiler(trace_allocations=True) as profiler:
+        with stage(f"benchmark.{name}"):
+            run()
+    return seconds, profiler.report()[f"benchmark.{name}"].peak_bytes
+
+
+def run_benchmarks(
+    families: Iterable[str] = tuple(GENERATORS),
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    stages: Iterable[str] = STAGES,
+    repeat: int = 3,
+    seed: int = 0,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> List[BenchmarkResult]:
+    """Benchmarks the hot paths on generated circuits of growing sizes
+
+    Parameters:
+        families (Iterable[str]): the generator families
+        sizes (Iterable[int]): the approximate numbers of elements
+        stages (Iterable[str]): the stages to benchmark, among STAGES
+        repeat (int): the number of timed runs of every stage
+        seed (int): the seed of the generators
+        progress (Optional[Callable]): called with every result as soon as it is measured
+
+    Returns:
+        List[BenchmarkResult]: the measurements
+    """
+    stages = list(stages)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages {sorted(unknown)}, expected some of {STAGES}")
+    results = []
+    with TemporaryDirectory() as directory:
+        for family in families:
+            for size in sizes:
+                table = generate(family, size, seed=seed)
+                netlist_path = Path(directory) / f"{family}_{size}.asc"
+                write_generated_netlist(table, netlist_path, title=f"{family} {size}")
+                runs = _stage_runs(table, netlist_path)
+                for stage_name in stages:
+                    seconds, peak_bytes = measure(runs[stage_name], repeat, stage_name)
+                    result = BenchmarkResult(family, len(table), stage_name, seconds, peak_bytes)
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+                netlist_path.unlink()
+    return results
+
+
+def save_baseline(
+    results: Sequence[BenchmarkResult], file_path: Union[str, Path] = BASELINE_PATH
+):
+    """Persists the results as a baseline, one sorted key per line so that the
+    changes of a new baseline read as a diff"""
+    baseline = {
+        "version": BASELINE_VERSION,
+        "results": {
+            result.key: {"seconds": round(result.seconds, 6), "peak_bytes": result.peak_bytes}
+            for result in results
+        },
+    }
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(file_path: Union[str, Path] = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    """Reads a baseline saved by save_baseline, keyed by family/elements/stage
+
+    Raises:
+        ValueError: when the baseline has an unknown version
+    """
+    baseline = json.loads(Path(file_path).read_text(encoding="utf-8"))
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"unsupported baseline version {baseline.get('version')!r}")
+    return baseline["results"]
+
+
+def compare(
+    results: Sequence[BenchmarkResult],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Regression]:
+    """Lists the metrics that grew by more than `tolerance` over their baseline
+
+    Results missing from the baseline, and timings under MIN_COMPARED_SECONDS, are
+    not compared.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.key)
+        if reference is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            before, after = reference[metric], getattr(result, metric)
+            if metric == "seconds" and max(before, after) < MIN_COMPARED_SECONDS:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append(Regression(result.key, metric, before, after))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing, value conversion, reduction and solving on "
+        "generated circuits, and compare the results with a baseline"
+    )
+    parser.add_argument(
+        "--families", nargs="+", default=list(GENERATORS), choices=list(GENERATORS)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of every stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save", action="store_true", help="overwrite the baseline with the results"
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    arguments = parser.parse_args(argv)
+
+    def report(result: BenchmarkResult):
+        print(
+            f"{result.key:<40}{result.seconds * 1e3:>12.3f} ms"
+            f"{result.peak_bytes / 2 ** 20:>10.1f} MiB",
+            flush=True,
+        )
+
+    results = run_benchmarks(
+        arguments.families,
+        arguments.sizes,
+        arguments.stages,
+        repeat=arguments.repeat,
+        seed=arguments.seed,
+        progress=report,
+    )
+    if arguments.save:
+        save_baseline(results, arguments.baseline)
+        return 0
+    if not arguments.baseline.exists():
+        print(f"no baseline at {arguments.baseline}, run with --save to create it")
+        return 0
+    regressions = compare(results, load_baseline(arguments.baseline), arguments.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from glob import iglob
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from src.netlistparser import Netlist
+import argparse
+import json
+import os
+import sys
+import tempfile
+import zipfile
+import numpy as np
+
+
+NETLIST_PATTERN = "*.asc"
+DEFAULT_CHUNK_SIZE = 64
+
+
+def iter_netlist_paths(source: Union[str, Path], pattern: str = NETLIST_PATTERN) -> Iterator[Path]:
+    """Lazily lists the Netlist files of a directory (recursively) or of a glob
+
+    Parameters:
+        source (Union[str, Path]): a directory, a single file or a glob (e.g. "runs/**/*.asc")
+        pattern (str): the file pattern used when `source` is a directory
+
+    Returns:
+        Iterator[Path]: the Netlist file paths
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        yield from (path for path in source_path.rglob(pattern) if path.is_file())
+    elif source_path.is_file():
+        yield source_path
+    else:
+        yield from (Path(path) for path in iglob(str(source), recursive=True))
+
+
+def netlist_record(netlist: Netlist) -> Dict:
+    """Solves a parsed Netlist and returns its result record
+
+    Parameters:
+        netlist (Netlist): the Netlist to solve
+
+    Returns:
+        Dict: the element and node counts, the effective resistance seen by the source
+        (None unless the circuit has exactly one source) and the node voltages
+    """
+    solution = netlist.solve_dc()
+    pattern = solution.system.pattern
+    sources = len(pattern.voltage_sources) + len(pattern.current_sources)
+    return {
+        "elements": len(netlist.element_table),
+        "nodes": int(pattern.node_count),
+        "effective_resistance": solution.get_effective_resistance() if sources == 1 else None,
+        "node_voltages": {
+            str(node): voltage for node, voltage in solution.get_node_voltages().items()
+        },
+    }
+
+
+def solve_file(path: Union[str, Path]) -> Dict:
+    """Parses and solves one Netlist file, never raising
+
+    Parameters:
+        path (Union[str, Path]): the path of the Netlist file
+
+    Returns:
+        Dict: the result record; `status` is "error" (with an `error` message) when the
+        file could not be parsed or solved
+    """
+    record = {"path": str(path)}
+    try:
+        record.update(netlist_record(Netlist.parse(path, columnar=True)))
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{e.__class__.__name__}: {e}"
+    return record
+
+
+def _solve_chunk(paths: List[str]) -> List[Dict]:
+    return [solve_file(path) for path in paths]
+
+
+def _chunks(paths: Iterable[Path], chunk_size: int) -> Iterator[List[str]]:
+    paths = iter(paths)
+    while True:
+        chunk = [str(path) for path in islice(paths, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_solve(
+    paths: Iterable[Union[str, Path]],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: Optional[int] = None,
+) -> Iterator[Dict]:
+    """Solves many Netlist files over a process pool, yielding results in completion order
+
+    Files are dispatched in chunks to amortize the inter-process overhead, and at most
+    `max_pending` chunks are in flight so huge file lists are consumed lazily. A file
+    that fails only produces an error record. A worker that dies breaks the pool and
+    every chunk in flight: the pool is recreated for the remaining chunks, and the
+    files of the lost chunks are solved again one at a time at the end, so only the
+    file that kills its worker produces an error record.
+
+    Parameters:
+        paths (Iterable[Union[str, Path]]): the Netlist files
+        workers (Optional[int]): the number of processes (0 solves in this process),
+            defaults to the number of CPUs
+        chunk_size (int): the number of files per task
+        max_pending (Optional[int]): the maximum number of chunks in flight,
+            defaults to 4 per worker
+
+    Returns:
+        Iterator[Dict]: the result record of every file (see solve_file)
+    """
+    chunks = _chunks(paths, chunk_size)
+    if workers == 0:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+    lost: List[str] = []
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending: Dict[Future, List[str]] = {}
+        for chunk in chunks:
+            while len(pending) >= max_pending:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+                yield from _collect(pending, done, lost)
+            try:
+                future = executor.submit(_solve_chunk, chunk)
+            except BrokenProcessPool:
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=workers)
+                future = executor.submit(_solve_chunk, chunk)
+            pending[future] = chunk
+        while pending:
+            yield from _collect(pending, wait(pending, return_when=FIRST_COMPLETED).done, lost)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    yield from _solve_isolated(lost)
+
+
+def _collect(
+    pending: Dict[Future, List[str]], done: Iterable[Future], lost: List[str]
+) -> Iterator[Dict]:
+    for future in done:
+        chunk = pending.pop(future)
+        try:
+            yield from future.result()
+        except BrokenProcessPool:
+            lost.extend(chunk)
+        except Exception as e:
+            yield from _error_records(chunk, e)
+
+
+def _solve_isolated(paths: List[str]) -> Iterator[Dict]:
+    """Solves files one at a time in a worker process, so a crash names its file"""
+    executor = None
+    for path in paths:
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=1)
+        try:
+            records = executor.submit(_solve_chunk, [path]).result()
+        except BrokenProcessPool as e:
+            executor.shutdown(wait=False)
+            executor = None
+            records = list(_error_records([path], e))
+        yield from records
+    if executor is not None:
+        executor.shutdown()
+
+
+def _error_records(paths: List[str], error: Exception) -> Iterator[Dict]:
+    for path in paths:
+        yield {"path": path, "status": "error", "error": f"{error.__class__.__name__}: {error}"}
+
+
+class JsonLinesWriter:
+    """ Streams result records to a JSON Lines file, one record per line """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def write(self, record: Dict):
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarWriter:
+    """ Collects the scalar fields of result records into columns saved as a .npz file
+
+    Every column is a NumPy array (path, status, error, elements, nodes,
+    effective_resistance); missing values are stored as NaN or empty strings.
+
+    The records are buffered CHUNK_SIZE at a time: every full chunk is saved as one
+    .npy file per column in a temporary directory next to the output, and close()
+    streams the chunks into the columns of the .npz file, so the memory stays bounded
+    whatever the number of files.
+    """
+
+    COLUMNS = ("path", "status", "error", "elements", "nodes", "effective_resistance")
+    NUMERIC_COLUMNS = ("elements", "nodes", "effective_resistance")
+    CHUNK_SIZE = 4096
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._columns = {column: [] for column in self.COLUMNS}
+        self._chunks = tempfile.TemporaryDirectory(prefix=".chunks-", dir=self.path.parent)
+        self._chunk_count = 0
+        self._length = 0
+        # the widest string of every text column, its dtype in the .npz file
+        self._widths = {
+            column: 1 for column in self.COLUMNS if column not in self.NUMERIC_COLUMNS
+        }
+
+    def write(self, record: Dict):
+        for column, values in self._columns.items():
+            value = record.get(column)
+            if column in self.NUMERIC_COLUMNS:
+                values.append(np.nan if value is None else value)
+            else:
+                values.append("" if value is None else value)
+        if len(self._columns["path"]) >= self.CHUNK_SIZE:
+            self._flush()
+
+    def _chunk_path(self, column: str, chunk: int) -> Path:
+        return Path(self._chunks.name) / f"{column}-{chunk}.npy"
+
+    def _flush(self):
+        if not self._columns["path"]:
+            return
+        for column, values in self._columns.items():
+            array = np.asarray(values, dtype=np.float64 if column in self.NUMERIC_COLUMNS else str)
+            if column in self._widths:
+                self._widths[column] = max(self._widths[column], array.dtype.itemsize // 4)
+            np.save(self._chunk_path(column, self._chunk_count), array)
+            values.clear()
+        self._length += len(array)
+        self._chunk_count += 1
+
+    def close(self):
+        self._flush()
+        try:
+            with zipfile.ZipFile(self.path, "w", allowZip64=True) as archive:
+                for column in self.COLUMNS:
+                    dtype = np.dtype(
+                        np.float64 if column in self.NUMERIC_COLUMNS else f"<U{self._widths[column]}"
+                    )
+                    header = {
+                        "descr": np.lib.format.dtype_to_descr(dtype),
+                        "fortran_order": False,
+                        "shape": (self._length,),
+                    }
+                    with archive.open(f"{column}.npy", "w", force_zip64=True) as f:
+                        np.lib.format.write_array_header_1_0(f, header)
+                        for chunk in range(self._chunk_count):
+                            array = np.load(self._chunk_path(column, chunk))
+                            f.write(array.astype(dtype).tobytes())
+        finally:
+            self._chunks.cleanup()
+
+
+def open_writer(path: Union[str, Path]):
+    """Returns the result writer matching the extension of `path` (.npz or JSON Lines)"""
+    if Path(path).suffix == ".npz":
+        return ColumnarWriter(path)
+    return JsonLinesWriter(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Solve every Netlist file of a directory or glob over a process pool"
+    )
+    parser.add_argument("source", help="a directory, a file or a glob of Netlist files")
+    parser.add_argument("-o", "--output", required=True, help="the .jsonl or .npz result file")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="the number of processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--pattern", default=NETLIST_PATTERN, help="the file pattern of directories")
+    arguments = parser.parse_args(argv)
+
+    writer = open_writer(arguments.output)
+    solved = failed = 0
+    try:
+        for record in bulk_solve(
+            iter_netlist_paths(arguments.source, arguments.pattern),
+            workers=arguments.workers,
+            chunk_size=arguments.chunk_size,
+        ):
+            writer.write(record)
+            if record["status"] == "ok":
+                solved += 1
+            else:
+                failed += 1
+    finally:
+        writer.close()
+    print(f"{solved} netlists solved, {failed} failed", file=sys.stderr)
+    return 0 if solved or not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,65 @@
 from __future__ import annotations
 from numbers import Number
-from typing import List, Union
+from typing import List, Sequence, Union
 from src import errors
+from src import profiling
 import re
 import numpy as np
+from functools import lru_cache
 from itertools import accumulate
 
 PREFIX_LIST = {
     "p": 1e-12,
     "n": 1e-9,
     "µ": 1e-6,
+    "μ": 1e-6,
+    "u": 1e-6,
     "k": 1e3,
     "M": 1e6,
+    "meg": 1e6,
+    "Meg": 1e6,
+    "MEG": 1e6,
     "G": 1e9,
     "T": 1e12,
     "Y": 1e24,
     "Z": 1e21,
     "E": 1e18,
     "P": 1e15,
-    "m": 1e-6,
+    "m": 1e-3,
     "h": 1e2,
     "da": 1e1,
     "d": 1e-1,
     "c": 1e-2,
     "f": 1e-15,
-    "a": 1e-8,
+    "a": 1e-18,
     "y": 1e-24,
     "z": 1e-21,
 }
 
+_SEPARATORS_PATTERN = re.compile(r"[,\s]+")
+_VALUE_PATTERN = re.compile(
+    r"([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)("
+    + "|".join(sorted(map(re.escape, PREFIX_LIST), key=len, reverse=True))
+    + ")?"
+)
+VALUE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _convert_literal(value: str) -> float:
+    match = _VALUE_PATTERN.match(_SEPARATORS_PATTERN.sub("", value))
+    if not match:
+        raise errors.ValueConversionError(value)
+    number, prefix = match.groups()
+    return float(number) * PREFIX_LIST.get(prefix, 1)
+
+
+# convert_value is too hot to be wrapped, the profiler reads the cache counters instead
+profiling.register_counter("convert_value", lambda: sum(_convert_literal.cache_info()[:2]))
+profiling.register_counter(
+    "convert_value.parsed", lambda: _convert_literal.cache_info().misses
+)
+
 
 def convert_value(value: Union[str, float]) -> Union[float, int]:
     """This converts a string value into a float equivalent
@@ -36,21 +67,42 @@ def convert_value(value: Union[str, float]) -> Union[float, int]:
     Args:
         value Union[str, float]: The value of the equivalent element together with its prefix
 
+    Raises:
+        errors.ValueConversionError: when the value does not start with a number
+
     Returns:
         Union[float, int]: The converted value of the object
     """
-    prefix_value = None
-    if not isinstance(value, Number):
-        try:
-            value = re.sub(r"[,\s]+", "", value.strip())
-            prefix_match = re.search(r"([pnµkMGTYZEPmhdadcfayz]{1})", value)
-            prefix_value = prefix_match.group(1) if prefix_match else 1
-            value = float(
-                re.search(r"([\d]+\.*\d*)", value).group(1)
-            ) * PREFIX_LIST.get(prefix_value, 1)
-        except Exception as e:
-            print(e)
-    return value
+    if isinstance(value, Number):
+        return value
+    return _convert_literal(value)
+
+
+def convert_values(values: Union[Sequence[str], np.ndarray]) -> np.ndarray:
+    """This converts a batch of string values into a float64 array
+
+    Every distinct literal is only parsed once, repeated literals (e.g. "10k") are
+    looked up from the conversion cache.
+
+    Args:
+        values Union[Sequence[str], np.ndarray]: The values together with their prefix
+
+    Raises:
+        errors.ValueConversionError: when a value does not start with a number
+
+    Returns:
+        np.ndarray: The converted values, with the shape of `values`
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64)
+    literals, inverse = np.unique(values, return_inverse=True)
+    converted = np.fromiter(
+        (_convert_literal(str(literal)) for literal in literals.tolist()),
+        dtype=np.float64,
+        count=len(literals),
+    )
+    return converted[inverse].reshape(values.shape)
 
 
 class Wire:
@@ -90,6 +142,10 @@ class LinearElement(BaseElement):
         start_node: the start node where the element is connected to
         end_node: the end node where the element is connected to
         tag: the name of the element in the circuit
+        name: the name of the element in the Netlist file (r1, v2, ...), None for the
+            elements that do not come from a file line (e.g. reduced resistors)
+        terminals: the (start, end) nodes in the order of the Netlist line, which set
+            the polarity of sources (start_node and end_node are sorted)
         prefix: the prefix of the value of the element (m -> milli, M -> Mega, ...)
         symbol: the symbol of the element (R -> Resistor, L -> Inductor,...)
         voltage: the voltage across the element
@@ -110,13 +166,14 @@ class LinearElement(BaseElement):
         if start_node == end_node:
             raise errors.SameNodeError()
 
-        self.start_node, self.end_node = sorted((int(start_node), int(end_node)))
+        self.terminals = (int(start_node), int(end_node))
         if int(end_node) == 0:
             self.start_node, self.end_node = (int(start_node), int(end_node))
         else:
             self.start_node, self.end_node = sorted((int(start_node), int(end_node)))
 
         self.tag = element_tag + "_" + str(self.start_node) + str(self.end_node)
+        self.name: Optional[str] = None
         self.prefix = None
         self.voltage = voltage
         self.current = current
@@ -390,12 +447,12 @@ class Loop:
     """
 
     def __init__(self, elements: List[BaseElement], unknown_tag=[]):
-        if elements <= 1:
-            raise NotALoppError("This is not a Loop")
+        if len(elements) <= 1:
+            raise errors.NotALoopError("This is not a Loop")
 
         if not unknown_tag:
             if sum([element.voltage for element in elements]) != 0:
-                raise NotALoppError("This is not a Loop")
+                raise errors.NotALoopError("This is not a Loop")
 
         self.element_count = len(elements)
         self.start_element = elements[0]
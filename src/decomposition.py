@@ -0,0 +1,205 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from src import errors
+from src.elementtable import CURRENT_SOURCE, INDUCTOR, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.ordering import GROUND_NODE, NodeNumbering
+from src.solver import DCSolution, MNAPattern, MNASystem
+import networkx as nx
+import os
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+
+# the kinds stamped by the DC analysis (inductors as shorts), capacitors are open circuits
+SOLVED_KINDS = (RESISTOR, VOLTAGE_SOURCE, CURRENT_SOURCE, INDUCTOR)
+# below this number of solved elements, the blocks are solved in this process
+PARALLEL_MIN_ELEMENTS = 50_000
+
+
+class Decomposition:
+    """ Splits a circuit into connected components and biconnected blocks
+
+    The blocks of a connected component are joined at articulation nodes and form
+    a tree rooted at the ground. A block only touches the rest of its component
+    through its articulation nodes, and the one closest to the ground (its
+    reference) carries no net current: the voltages of a block relative to its
+    reference are therefore independent of the other blocks. Every block is solved
+    with its reference as a local ground, and the absolute voltages are stitched
+    back by adding the voltage of the reference, from the ground outwards.
+
+    Attributes
+        element_table: the elements of the circuit
+        numbering: the dense index of the nodes solved in DC
+        components: the connected component of every node (dense index order)
+        blocks: the block of every element, -1 for elements not solved in DC
+        references: the reference node of every block
+        articulation_nodes: the nodes shared by several blocks
+    """
+
+    def __init__(self, element_table: ElementTable):
+        self.element_table = element_table
+        solved = np.flatnonzero(np.isin(element_table.kind, SOLVED_KINDS))
+        self.solved = solved
+        self.numbering = NodeNumbering(
+            np.concatenate((element_table.start_node[solved], element_table.end_node[solved]))
+        )
+        start = self.numbering.index(element_table.start_node[solved])
+        end = self.numbering.index(element_table.end_node[solved])
+        node_count = self.numbering.node_count
+
+        graph = sp.coo_matrix(
+            (np.ones(len(solved)), (start, end)), shape=(node_count, node_count)
+        ).tocsr()
+        self.component_count, self.components = connected_components(graph, directed=False)
+        self._distance = shortest_path(graph, directed=False, unweighted=True, indices=0)
+
+        # the biconnected blocks of the (simple) graph, parallel elements share a block
+        pairs, pair_of_element = np.unique(
+            np.column_stack((np.minimum(start, end), np.maximum(start, end))),
+            axis=0,
+            return_inverse=True,
+        )
+        simple_graph = nx.Graph()
+        simple_graph.add_edges_from(pairs.tolist())
+        pair_index = {pair: index for index, pair in enumerate(map(tuple, pairs.tolist()))}
+        block_of_pair = np.empty(len(pairs), dtype=np.int64)
+        self.block_count = 0
+        for edges in nx.biconnected_component_edges(simple_graph):
+            for a, b in edges:
+                block_of_pair[pair_index[(a, b) if a < b else (b, a)]] = self.block_count
+            self.block_count += 1
+        self.articulation_nodes = self.numbering.original(
+            np.sort(np.fromiter(nx.articulation_points(simple_graph), dtype=np.int64))
+        )
+
+        self.blocks = np.full(len(element_table), -1, dtype=np.int64)
+        self.blocks[solved] = block_of_pair[np.reshape(pair_of_element, -1)]
+        # the reference of a block is its node closest to the ground
+        block_of_solved = self.blocks[solved]
+        endpoint_block = np.concatenate((block_of_solved, block_of_solved))
+        endpoint = np.concatenate((start, end))
+        order = np.lexsort((self._distance[endpoint], endpoint_block))
+        first = np.r_[True, endpoint_block[order][1:] != endpoint_block[order][:-1]]
+        self._reference_index = np.zeros(self.block_count, dtype=np.int64)
+        self._reference_index[endpoint_block[order][first]] = endpoint[order][first]
+        self.references = self.numbering.original(self._reference_index)
+
+    def floating_nodes(self) -> np.ndarray:
+        """Returns the nodes with no path to the ground"""
+        return self.numbering.nodes[~np.isfinite(self._distance)]
+
+    def block_table(self, block: int) -> ElementTable:
+        """Returns the elements of a block, its reference node renumbered as the ground"""
+        return self._blocks_table(np.flatnonzero(self.blocks == block))[0]
+
+    def _blocks_table(self, elements: np.ndarray) -> Tuple[ElementTable, np.ndarray]:
+        table = self.element_table
+        reference = self.references[self.blocks[elements]]
+        start, end = table.start_node[elements], table.end_node[elements]
+        return (
+            ElementTable(
+                table.kind[elements],
+                np.where(start == reference, GROUND_NODE, start),
+                np.where(end == reference, GROUND_NODE, end),
+                table.value[elements],
+                [table.tags[index] for index in elements.tolist()],
+            ),
+            elements,
+        )
+
+    def chunks(self, chunk_count: int) -> List[Tuple[ElementTable, np.ndarray]]:
+        """Groups the blocks into balanced chunks of independent sub-circuits
+
+        The blocks of a chunk only share the (local) ground, so the chunk is one
+        block-diagonal system solved with a single factorization.
+
+        Returns:
+            List[Tuple[ElementTable, np.ndarray]]: the table and element rows of every chunk
+        """
+        sizes = np.bincount(self.blocks[self.solved], minlength=self.block_count)
+        bounds = np.cumsum(sizes)
+        chunk_of_block = np.minimum(
+            (bounds - sizes) * chunk_count // max(int(bounds[-1]) if len(bounds) else 1, 1),
+            chunk_count - 1,
+        )
+        chunk_of_element = chunk_of_block[self.blocks[self.solved]]
+        order = np.argsort(chunk_of_element, kind="stable")
+        splits = np.searchsorted(chunk_of_element[order], np.arange(1, chunk_count))
+        return [
+            self._blocks_table(self.solved[group])
+            for group in np.split(order, splits)
+            if len(group)
+        ]
+
+    def solve(self, workers: Optional[int] = None) -> DCSolution:
+        """Solves the blocks (in parallel for large circuits) and stitches the solution
+
+        Parameters:
+            workers (Optional[int]): the number of processes, 0 or 1 to solve in this
+                process; defaults to the number of CPUs for circuits of more than
+                PARALLEL_MIN_ELEMENTS elements
+
+        Returns:
+            DCSolution: the DC operating point of the whole circuit
+
+        Raises:
+            errors.SingularCircuitError: when a part of the circuit has no path to the ground
+        """
+        floating = self.floating_nodes()
+        if len(floating):
+            raise errors.SingularCircuitError(
+                f"nodes {floating[:10].tolist()} have no path to the ground"
+            )
+        if not len(self.solved):
+            raise errors.SingularCircuitError("the circuit has no nodes to solve")
+        if workers is None:
+            workers = 1 if len(self.solved) < PARALLEL_MIN_ELEMENTS else os.cpu_count() or 1
+        chunks = self.chunks(max(workers, 1))
+        tables = [table for table, _ in chunks]
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(solve_block_chunk, tables))
+        else:
+            results = [solve_block_chunk(table) for table in tables]
+        return self._stitch(chunks, results)
+
+    def _stitch(self, chunks: list, results: list) -> DCSolution:
+        numbering = self.numbering
+        local = np.zeros(numbering.node_count)
+        currents = np.full(len(self.element_table), np.nan)
+        for (_, elements), (nodes, voltages, element_currents) in zip(chunks, results):
+            local[numbering.index(nodes)] = voltages
+            currents[elements] = element_currents
+
+        # every node hangs from the reference of the block it is solved in
+        parent = np.zeros(numbering.node_count, dtype=np.int64)
+        block_reference = self._reference_index[self.blocks[self.solved]]
+        for nodes in (self.element_table.start_node, self.element_table.end_node):
+            index = numbering.index(nodes[self.solved])
+            own = index != block_reference
+            parent[index[own]] = block_reference[own]
+        # pointer jumping: voltages[n] sums the local voltages from n up to (excluded)
+        # parent[n], so the depth of the block tree only costs log(depth) passes
+        voltages = local
+        while np.any(parent):
+            voltages = voltages + voltages[parent]
+            parent = parent[parent]
+
+        pattern = MNAPattern(self.element_table)
+        system = MNASystem(self.element_table, pattern=pattern)
+        x = np.concatenate(
+            (
+                voltages[numbering.index(pattern.nodes)],
+                currents[pattern.branches],
+            )
+        )
+        return DCSolution(system, x)
+
+
+def solve_block_chunk(table: ElementTable) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Solves a chunk of blocks, returning its nodes, their local voltages and the
+    current of every element"""
+    solution = MNASystem(table).solve()
+    return solution.nodes, solution.node_voltages, solution.element_currents
@@ -0,0 +1,247 @@
+from __future__ import annotations
+from array import array
+from hashlib import blake2b
+from sys import intern
+from typing import Dict, Iterable, List, Optional
+from src import errors
+from src.components import (
+    CurrentSource,
+    LinearCapacitor,
+    LinearElement,
+    LinearInductor,
+    Resistor,
+    VoltageSource,
+    convert_value,
+)
+from src.netlistreader import ElementRecord
+import numpy as np
+
+
+RESISTOR = 0
+VOLTAGE_SOURCE = 1
+CURRENT_SOURCE = 2
+CAPACITOR = 3
+INDUCTOR = 4
+
+KIND_SYMBOLS = ("r", "v", "i", "c", "l")
+SYMBOL_KINDS = {symbol: kind for kind, symbol in enumerate(KIND_SYMBOLS)}
+KIND_CLASSES = (Resistor, VoltageSource, CurrentSource, LinearCapacitor, LinearInductor)
+
+
+class ElementTable:
+    """ A compact, columnar store of the elements of a Netlist
+
+    Every element is one row of four contiguous arrays plus an interned tag, instead
+    of one LinearElement object per element. The nodes keep the order of the
+    Netlist file (start_node is the positive terminal).
+
+    Attributes
+        kind: the kind code of every element (RESISTOR, VOLTAGE_SOURCE, ...)
+        start_node: the start node of every element
+        end_node: the end node of every element
+        value: the converted value of every element
+        tags: the (interned) name of every element
+    """
+
+    def __init__(
+        self,
+        kind: np.ndarray,
+        start_node: np.ndarray,
+        end_node: np.ndarray,
+        value: np.ndarray,
+        tags: Optional[List[str]] = None,
+    ):
+        self.kind = np.asarray(kind, dtype=np.uint8)
+        self.start_node = np.asarray(start_node, dtype=np.int64)
+        self.end_node = np.asarray(end_node, dtype=np.int64)
+        self.value = np.asarray(value, dtype=np.float64)
+        if tags is None:
+            tags = [
+                intern(f"{KIND_SYMBOLS[kind]}{index}")
+                for index, kind in enumerate(self.kind.tolist())
+            ]
+        self.tags = tags
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the element arrays in bytes (tags excluded)"""
+        return self.kind.nbytes + self.start_node.nbytes + self.end_node.nbytes + self.value.nbytes
+
+    @classmethod
+    def from_records(cls, records: Iterable[ElementRecord]) -> ElementTable:
+        """Builds a table straight from a stream of tokenized Netlist lines
+
+        Parameters:
+            records (Iterable[ElementRecord]): the tokenized element lines
+
+        Returns:
+            ElementTable: the table of the elements
+        """
+        kind, start_node, end_node, value = array("B"), array("q"), array("q"), array("d")
+        tags = []
+        for record in records:
+            element_kind = SYMBOL_KINDS.get(record.symbol)
+            if element_kind is None:
+                raise errors.NetlistSyntaxError(
+                    record.line_number, record.name, f"unsupported element {record.name}"
+                )
+            if record.start_node == record.end_node:
+                raise errors.SameNodeError()
+            kind.append(element_kind)
+            start_node.append(record.start_node)
+            end_node.append(record.end_node)
+            value.append(convert_value(record.value))
+            tags.append(intern(record.name))
+        return cls(
+            kind=np.frombuffer(kind, dtype=np.uint8),
+            start_node=np.frombuffer(start_node, dtype=np.int64),
+            end_node=np.frombuffer(end_node, dtype=np.int64),
+            value=np.frombuffer(value, dtype=np.float64),
+            tags=tags,
+        )
+
+    @classmethod
+    def from_components(cls, components_dict: Dict[str, List[LinearElement]]) -> ElementTable:
+        """Builds a table from a components dict of LinearElement lists, with the nodes
+        of every element in the order of its Netlist line (see LinearElement.terminals)
+        and tagged with its Netlist name when it has one
+
+        Parameters:
+            components_dict (Dict): the components, keyed by element symbol
+
+        Returns:
+            ElementTable: the table of the elements
+        """
+        elements = [
+            (SYMBOL_KINDS[symbol], element)
+            for symbol in KIND_SYMBOLS
+            for element in components_dict.get(symbol) or []
+        ]
+        return cls(
+            kind=np.fromiter((kind for kind, _ in elements), dtype=np.uint8, count=len(elements)),
+            start_node=np.fromiter(
+                (element.terminals[0] for _, element in elements),
+                dtype=np.int64,
+                count=len(elements),
+            ),
+            end_node=np.fromiter(
+                (element.terminals[1] for _, element in elements),
+                dtype=np.int64,
+                count=len(elements),
+            ),
+            value=np.fromiter(
+                (element.value for _, element in elements), dtype=np.float64, count=len(elements)
+            ),
+            tags=[intern(element.name or element.tag) for _, element in elements],
+        )
+
+    @classmethod
+    def concatenate(cls, tables: Iterable[ElementTable]) -> ElementTable:
+        """Stacks the rows of several tables, in order
+
+        Parameters:
+            tables (Iterable[ElementTable]): the tables to stack
+
+        Returns:
+            ElementTable: the table of every element
+        """
+        tables = list(tables)
+        if len(tables) == 1:
+            return tables[0]
+        return cls(
+            kind=np.concatenate([table.kind for table in tables] or [np.empty(0, np.uint8)]),
+            start_node=np.concatenate([table.start_node for table in tables] or [np.empty(0)]),
+            end_node=np.concatenate([table.end_node for table in tables] or [np.empty(0)]),
+            value=np.concatenate([table.value for table in tables] or [np.empty(0)]),
+            tags=[tag for table in tables for tag in table.tags],
+        )
+
+    def topology_fingerprint(self) -> str:
+        """Returns a digest of the connectivity of the table
+
+        Two tables with the same element kinds and (start_node, end_node) pairs, in the
+        same order, share a fingerprint whatever their values and tags.
+
+        Returns:
+            str: the hexadecimal topology fingerprint
+        """
+        digest = blake2b(digest_size=16)
+        for column in (self.kind, self.start_node, self.end_node):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        return digest.hexdigest()
+
+    def indices(self, kind: int) -> np.ndarray:
+        """Returns the rows of every element of a kind
+
+        Parameters:
+            kind (int): the kind code (RESISTOR, VOLTAGE_SOURCE, ...)
+
+        Returns:
+            np.ndarray: the row indices, in table order
+        """
+        return np.flatnonzero(self.kind == kind)
+
+    def index_of(self, tag: str) -> int:
+        """Returns the row of the element with a tag
+
+        Parameters:
+            tag (str): the tag of the element
+
+        Raises:
+            KeyError: when no element or more than one element has the tag
+
+        Returns:
+            int: the row of the element
+        """
+        rows = [index for index, element_tag in enumerate(self.tags) if element_tag == tag]
+        if len(rows) != 1:
+            raise KeyError(f"{len(rows)} elements are tagged {tag!r}, expected exactly one")
+        return rows[0]
+
+    def nodes(self) -> np.ndarray:
+        """Returns the sorted distinct node numbers of the table"""
+        return np.unique(np.concatenate((self.start_node, self.end_node)))
+
+    def connection_nodes(self) -> np.ndarray:
+        """Returns the (start_node, end_node) pairs ordered the same way as LinearElement does
+
+        Returns:
+            np.ndarray: an (n, 2) array of node pairs
+        """
+        low = np.minimum(self.start_node, self.end_node)
+        high = np.maximum(self.start_node, self.end_node)
+        to_ground = self.end_node == 0
+        return np.column_stack(
+            (np.where(to_ground, self.start_node, low), np.where(to_ground, 0, high))
+        )
+
+    def element(self, index: int) -> LinearElement:
+        """Materializes a single row as a LinearElement
+
+        Parameters:
+            index (int): the row of the element
+
+        Returns:
+            LinearElement: the element view of the row
+        """
+        element = KIND_CLASSES[self.kind[index]](
+            value=float(self.value[index]),
+            start_node=int(self.start_node[index]),
+            end_node=int(self.end_node[index]),
+        )
+        element.name = self.tags[index]
+        return element
+
+    def to_components(self) -> Dict[str, List[LinearElement]]:
+        """Materializes the table as a components dict of LinearElement lists
+
+        Returns:
+            Dict[str, List[LinearElement]]: the elements, keyed by element symbol
+        """
+        components = {"v": [], "l": [], "r": [], "i": [], "c": []}
+        for index, kind in enumerate(self.kind.tolist()):
+            components[KIND_SYMBOLS[kind]].append(self.element(index))
+        return components
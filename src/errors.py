@@ -57,3 +57,139 @@ class SameNodeError(BaseError):
 
     def __str__(self):
         return f"The Nodes cannot be the same (start_node != end_node)"
+
+
+class SingularCircuitError(BaseError):
+    """Exception raised when the circuit equations have no unique solution
+    (floating nodes, loops of voltage sources, ...).
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return f"The circuit cannot be solved: {self.message}"
+
+
+class NetlistSyntaxError(BaseError):
+    """Exception raised when a line of a Netlist file cannot be tokenized.
+    """
+
+    def __init__(self, line_number, line, reason):
+        self.line_number = line_number
+        self.line = line
+        self.reason = reason
+
+    def __str__(self):
+        return f"Line {self.line_number} ({self.line.strip()!r}) is not valid: {self.reason}"
+
+
+class ValueConversionError(BaseError):
+    """Exception raised when an element value cannot be converted to a number.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return f"The value {self.value!r} is not a number with an optional SI prefix"
+
+
+class ServiceOverloadedError(BaseError):
+    """Exception raised when the solving service has no free slot for a new circuit.
+    """
+
+    def __init__(self, max_pending):
+        self.max_pending = max_pending
+
+    def __str__(self):
+        return f"The service is busy solving {self.max_pending} circuits, retry later"
+
+
+class ServiceResponseError(BaseError):
+    """Exception raised when the solving service answers a request with an error.
+    """
+
+    def __init__(self, status, message):
+        self.status = status
+        self.message = message
+
+    def __str__(self):
+        return f"The service answered {self.status}: {self.message}"
+
+
+class BinaryNetlistError(BaseError):
+    """Exception raised when a binary Netlist file is missing sections or has an unknown format.
+    """
+
+    def __init__(self, file_path, reason):
+        self.file_path = file_path
+        self.reason = reason
+
+    def __str__(self):
+        return f"{self.file_path} cannot be loaded: {self.reason}"
+
+
+class SubcircuitError(BaseError):
+    """Exception raised when a subcircuit is undefined or cannot be reduced to its ports.
+    """
+
+    def __init__(self, name, reason):
+        self.name = name
+        self.reason = reason
+
+    def __str__(self):
+        return f"The subcircuit {self.name} cannot be used: {self.reason}"
+
+
+class MissingGroundError(SingularCircuitError):
+    """Exception raised when no element of the circuit is connected to the ground node.
+    """
+
+    def __init__(self):
+        super().__init__("no element is connected to the ground (node 0)")
+
+
+class FloatingNodeError(SingularCircuitError):
+    """Exception raised when nodes have no path to the ground through any element.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        super().__init__(f"nodes {self.nodes[:10]} have no path to the ground")
+
+
+class VoltageSourceLoopError(SingularCircuitError):
+    """Exception raised when voltage sources and inductors (shorts in DC) form a loop, their
+    currents are then undetermined.
+    """
+
+    def __init__(self, tags):
+        self.tags = list(tags)
+        super().__init__(
+            f"the elements {self.tags[:10]} close a loop of voltage sources and inductors"
+        )
+
+
+class CurrentSourceCutsetError(SingularCircuitError):
+    """Exception raised when nodes are only connected to the ground through current sources,
+    their voltages are then undetermined.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        super().__init__(
+            f"nodes {self.nodes[:10]} are only connected to the ground through current sources"
+        )
+
+
+class ParameterError(BaseError):
+    """Exception raised when a .param expression or a sweep directive cannot be evaluated.
+    """
+
+    def __init__(self, name, reason):
+        self.name = name
+        self.reason = reason
+
+    def __str__(self):
+        return f"The parameter {self.name} cannot be evaluated: {self.reason}"
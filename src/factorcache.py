@@ -0,0 +1,157 @@
+from __future__ import annotations
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, Dict, Hashable, Optional
+from src.elementtable import ElementTable
+from src.solver import MNAPattern
+import numpy as np
+
+
+def values_fingerprint(values: np.ndarray) -> str:
+    """Returns a digest of a set of element values"""
+    return blake2b(
+        np.ascontiguousarray(values, dtype=np.float64).tobytes(), digest_size=16
+    ).hexdigest()
+
+
+class LRUCache:
+    """ A least recently used cache bounded by an entry count and a byte budget
+
+    Attributes
+        max_entries: the maximum number of entries
+        max_bytes: the maximum total size of the entries in bytes
+        hits: the number of lookups that found their entry
+        misses: the number of lookups that did not find their entry
+        evictions: the number of entries dropped to respect the limits
+        current_bytes: the total size of the cached entries
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable):
+        """Returns the cached value of a key (None if missing) and marks it as recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value, nbytes: int = 0):
+        """Caches a value, evicting the least recently used entries if over a limit
+
+        Values larger than `max_bytes` are not cached.
+        """
+        if nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def get_or_create(self, key: Hashable, create: Callable, size: Callable = lambda _: 0):
+        """Returns the cached value of a key, creating and caching it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.put(key, value, size(value))
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit, miss and eviction counters and the current occupancy"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+        }
+
+
+class FactorizationCache:
+    """ Caches MNA patterns (symbolic structure and column ordering) by topology
+    fingerprint, and sparse factorizations by topology and values fingerprint
+
+    A solve on a known topology skips the graph analysis and the ordering; a solve
+    on known topology and values also skips the numeric factorization.
+
+    Attributes
+        patterns: the LRU cache of MNA patterns
+        factorizations: the LRU cache of MNA factorizations
+    """
+
+    def __init__(
+        self,
+        max_patterns: int = 64,
+        max_factorizations: int = 64,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.patterns = LRUCache(max_entries=max_patterns, max_bytes=max_bytes // 4)
+        self.factorizations = LRUCache(
+            max_entries=max_factorizations, max_bytes=max_bytes - max_bytes // 4
+        )
+
+    def get_pattern(
+        self, element_table: ElementTable, fingerprint: Optional[str] = None
+    ) -> MNAPattern:
+        """Returns the MNA pattern of the topology of an element table
+
+        Parameters:
+            element_table (ElementTable): the elements of the circuit
+            fingerprint (Optional[str]): the topology fingerprint, if already known
+
+        Returns:
+            MNAPattern: the cached or newly built pattern
+        """
+        fingerprint = fingerprint or element_table.topology_fingerprint()
+        return self.patterns.get_or_create(
+            fingerprint, lambda: MNAPattern(element_table), lambda pattern: pattern.nbytes
+        )
+
+    def get_factorization(self, pattern: MNAPattern, fingerprint: str, values: np.ndarray):
+        """Returns the factorization of a pattern for a set of element values
+
+        Parameters:
+            pattern (MNAPattern): the pattern of the topology
+            fingerprint (str): the topology fingerprint of the pattern
+            values (np.ndarray): the element values, only the resistor values are part
+                of the key since the sources do not change the matrix
+
+        Returns:
+            MNAFactorization: the cached or newly computed factorization
+        """
+        return self.factorizations.get_or_create(
+            (fingerprint, values_fingerprint(values[pattern.resistors])),
+            lambda: pattern.factorize(values),
+            lambda factorization: factorization.nbytes,
+        )
+
+    def clear(self):
+        self.patterns.clear()
+        self.factorizations.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the counters of the pattern and factorization caches"""
+        return {"patterns": self.patterns.stats(), "factorizations": self.factorizations.stats()}
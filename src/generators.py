@@ -0,0 +1,235 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, Union
+from src.elementtable import CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE, ElementTable
+import numpy as np
+
+
+# the resistor values are drawn from the E12 series over six decades
+E12_SERIES = np.array([1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2])
+VALUE_PREFIXES = ((1e6, "Meg"), (1e3, "k"), (1.0, ""))
+
+
+def resistor_values(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Draws `count` E12 resistor values between 1 and 820k"""
+    return E12_SERIES[rng.integers(len(E12_SERIES), size=count)] * 10.0 ** rng.integers(
+        6, size=count
+    )
+
+
+def _table(kinds, start_nodes, end_nodes, values) -> ElementTable:
+    return ElementTable(
+        np.concatenate(kinds),
+        np.concatenate(start_nodes),
+        np.concatenate(end_nodes),
+        np.concatenate(values),
+    )
+
+
+def _source(node: int, value: float = 10.0):
+    return (
+        np.array([VOLTAGE_SOURCE]),
+        np.array([node]),
+        np.array([0]),
+        np.array([value]),
+    )
+
+
+def ladder(elements: int, seed: int = 0) -> ElementTable:
+    """A resistor ladder: series resistors along a rail, a shunt resistor to the
+    ground at every rung, driven by a voltage source at its first node
+
+    Parameters:
+        elements (int): the approximate number of elements
+        seed (int): the seed of the resistor values
+
+    Returns:
+        ElementTable: the ladder, reducible by series/parallel steps alone
+    """
+    rungs = max((elements - 1) // 2, 1)
+    rng = np.random.default_rng(seed)
+    rail = np.arange(1, rungs + 1)
+    kind, start_node, end_node, value = _source(1)
+    return _table(
+        (kind, np.full(2 * rungs, RESISTOR)),
+        (start_node, rail, rail + 1),
+        (end_node, rail + 1, np.zeros(rungs, dtype=np.int64)),
+        (value, resistor_values(2 * rungs, rng)),
+    )
+
+
+def grid(elements: int, seed: int = 0) -> ElementTable:
+    """A square resistor mesh driven by a voltage source at one corner and
+    grounded through a resistor at the opposite corner
+
+    Parameters:
+        elements (int): the approximate number of elements
+        seed (int): the seed of the resistor values
+
+    Returns:
+        ElementTable: the mesh, which series/parallel steps cannot reduce
+    """
+    size = max(int(round(np.sqrt(max(elements - 2, 2) / 2))), 2)
+    rng = np.random.default_rng(seed)
+    node = np.arange(1, size * size + 1).reshape(size, size)
+    start_node = np.concatenate((node[:, :-1].ravel(), node[:-1, :].ravel(), [node[-1, -1]]))
+    end_node = np.concatenate((node[:, 1:].ravel(), node[1:, :].ravel(), [0]))
+    kind, source_start, source_end, value = _source(1)
+    return _table(
+        (kind, np.full(len(start_node), RESISTOR)),
+        (source_start, start_node),
+        (source_end, end_node),
+        (value, resistor_values(len(start_node), rng)),
+    )
+
+
+def series_parallel_tree(elements: int, seed: int = 0) -> ElementTable:
+    """A random series-parallel network grown from a single resistor by splitting
+    random resistors in series (a new node) or doubling them in parallel
+
+    Parameters:
+        elements (int): the approximate number of elements
+        seed (int): the seed of the network and of the resistor values
+
+    Returns:
+        ElementTable: the network between node 1 and the ground, fully reducible
+    """
+    resistors = max(elements - 1, 1)
+    rng = np.random.default_rng(seed)
+    start_node = np.empty(resistors, dtype=np.int64)
+    end_node = np.empty(resistors, dtype=np.int64)
+    start_node[0], end_node[0] = 1, 0
+    split = (rng.random(resistors) * np.arange(resistors)).astype(np.int64).tolist()
+    series = (rng.random(resistors) < 0.5).tolist()
+    next_node = 2
+    for count in range(1, resistors):
+        edge = split[count]
+        if series[count]:
+            start_node[count], end_node[count] = next_node, end_node[edge]
+            end_node[edge] = next_node
+            next_node += 1
+        else:
+            start_node[count], end_node[count] = start_node[edge], end_node[edge]
+    kind, source_start, source_end, value = _source(1)
+    return _table(
+        (kind, np.full(resistors, RESISTOR)),
+        (source_start, start_node),
+        (source_end, end_node),
+        (value, resistor_values(resistors, rng)),
+    )
+
+
+def star_delta(elements: int, seed: int = 0) -> ElementTable:
+    """A chain of three-node stages, alternating delta (Δ) stages and stages with
+    a star (Y) to a centre node, the rails of consecutive stages joined by resistors
+
+    Parameters:
+        elements (int): the approximate number of elements
+        seed (int): the seed of the resistor values
+
+    Returns:
+        ElementTable: the chain between node 1 and the ground, which needs Y-Δ
+        transforms to be reduced
+    """
+    stages = max((elements - 2) // 6, 1)
+    rng = np.random.default_rng(seed)
+    # stage k has the rail nodes 4k+1..4k+3 and the centre node 4k+4
+    rails = 4 * np.arange(stages)[:, None] + np.arange(1, 4)
+    centre = 4 * np.arange(stages) + 4
+    star = np.arange(stages) % 2 == 1
+    delta_start = rails[~star][:, [0, 1, 2]].ravel()
+    delta_end = rails[~star][:, [1, 2, 0]].ravel()
+    star_start = rails[star].ravel()
+    star_end = np.repeat(centre[star], 3)
+    link_start = rails[:-1].ravel()
+    link_end = rails[1:].ravel()
+    start_node = np.concatenate((delta_start, star_start, link_start, [rails[-1, 2]]))
+    end_node = np.concatenate((delta_end, star_end, link_end, [0]))
+    kind, source_start, source_end, value = _source(1)
+    return _table(
+        (kind, np.full(len(start_node), RESISTOR)),
+        (source_start, start_node),
+        (source_end, end_node),
+        (value, resistor_values(len(start_node), rng)),
+    )
+
+
+def multi_source(elements: int, seed: int = 0, sources: int = 8) -> ElementTable:
+    """A resistor mesh with voltage and current sources to the ground at random nodes
+
+    Parameters:
+        elements (int): the approximate number of elements
+        seed (int): the seed of the source placement and of the values
+        sources (int): the number of sources, half of them current sources
+
+    Returns:
+        ElementTable: the mesh and its sources
+    """
+    mesh = grid(max(elements - sources, 4), seed)
+    rng = np.random.default_rng(seed + 1)
+    nodes = mesh.nodes()
+    placed = rng.choice(nodes[nodes != 0], size=min(sources, len(nodes) - 1), replace=False)
+    kind = np.where(np.arange(len(placed)) % 2 == 0, VOLTAGE_SOURCE, CURRENT_SOURCE)
+    # the corner source of the mesh is kept, node 1 gets no second voltage source
+    kind[placed == 1] = CURRENT_SOURCE
+    return _table(
+        (mesh.kind, kind),
+        (mesh.start_node, placed),
+        (mesh.end_node, np.zeros(len(placed), dtype=np.int64)),
+        (mesh.value, rng.uniform(1e-3, 10.0, size=len(placed)).round(3)),
+    )
+
+
+GENERATORS: Dict[str, Callable[..., ElementTable]] = {
+    "ladder": ladder,
+    "grid": grid,
+    "series_parallel": series_parallel_tree,
+    "star_delta": star_delta,
+    "multi_source": multi_source,
+}
+
+
+def generate(family: str, elements: int, seed: int = 0) -> ElementTable:
+    """Generates a circuit of one of the GENERATORS families
+
+    Raises:
+        ValueError: when the family is unknown
+    """
+    if family not in GENERATORS:
+        raise ValueError(f"unknown circuit family {family!r}, expected one of {list(GENERATORS)}")
+    return GENERATORS[family](elements, seed=seed)
+
+
+def format_values(values: np.ndarray) -> np.ndarray:
+    """Formats values as Netlist literals with engineering prefixes (4.7k, 1.2Meg, ...)"""
+    values = np.asarray(values, dtype=np.float64)
+    literals = np.array([f"{value:.6g}" for value in values.tolist()], dtype=object)
+    for scale, prefix in VALUE_PREFIXES[:-1]:
+        scaled = np.flatnonzero((np.abs(values) >= scale) & (np.abs(values) < scale * 1e3))
+        literals[scaled] = [f"{value / scale:.6g}{prefix}" for value in values[scaled].tolist()]
+    return literals
+
+
+def write_generated_netlist(
+    element_table: ElementTable, file_path: Union[str, Path], title: str = "Generated"
+):
+    """Saves a generated circuit as a text Netlist, the values written with prefixes
+    so that parsing it exercises the value conversion
+
+    Parameters:
+        element_table (ElementTable): the elements to save
+        file_path (Union[str, Path]): the path of the text file
+        title (str): the title line of the Netlist
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(f"{title}\n")
+        f.writelines(
+            f"{tag} {start_node} {end_node} {literal}\n"
+            for tag, start_node, end_node, literal in zip(
+                element_table.tags,
+                element_table.start_node.tolist(),
+                element_table.end_node.tolist(),
+                format_values(element_table.value).tolist(),
+            )
+        )
+        f.write(".end\n")
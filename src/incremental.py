@@ -0,0 +1,163 @@
+from __future__ import annotations
+from typing import Dict, Optional
+from src import errors
+from src.elementtable import CAPACITOR, INDUCTOR, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.solver import DCSolution, MNAPattern, MNASystem
+import numpy as np
+
+
+MAX_LOW_RANK_UPDATES = 16
+MAX_CAPACITANCE_CONDITION = 1e12
+
+
+class IncrementalSolver:
+    """ Keeps the DC solution of a circuit up to date while element values change
+
+    Resistor edits are applied as low-rank (Sherman-Morrison/Woodbury) corrections
+    of the factorization of the base matrix: each edited resistor costs one extra
+    back-substitution the first time it is edited and a tiny dense solve afterwards.
+    Source edits only need one back-substitution. The matrix is refactorized when
+    too many resistors have been edited, when the correction becomes ill-conditioned
+    or when an edit changes the topology (a zero or infinite resistance). A zero
+    resistance is solved as a 0 V source, a short whose current is a branch unknown.
+
+    Attributes
+        element_table: the topology of the circuit
+        values: the current element values
+        refactorizations: the number of full factorizations done so far
+    """
+
+    def __init__(self, element_table: ElementTable, pattern: Optional[MNAPattern] = None):
+        self.element_table = element_table
+        self.values = np.array(element_table.value, dtype=np.float64)
+        self.pattern = pattern if pattern is not None else MNAPattern(element_table)
+        self.refactorizations = 0
+        self._refactorize()
+
+    def _refactorize(self):
+        kind = self.element_table.kind
+        self._shorts = (kind == RESISTOR) & (self.values == 0)
+        pattern = self.pattern
+        if self._shorts.any():
+            kind = np.where(self._shorts, VOLTAGE_SOURCE, kind).astype(np.uint8)
+        table = ElementTable(
+            kind,
+            self.element_table.start_node,
+            self.element_table.end_node,
+            self.values,
+            self.element_table.tags,
+        )
+        if self._shorts.any():
+            pattern = MNAPattern(table)
+        system = MNASystem(table, pattern=pattern)
+        system.factorize()
+        self.system = system
+        self.refactorizations += 1
+        self._base_conductances = pattern.conductances(self.values)
+        self._conductance_changes: Dict[int, float] = {}
+        self._corrections: Dict[int, np.ndarray] = {}
+        self._base_x = system.solve_rhs(pattern.rhs(self.values))
+        self.x = self._base_x
+
+    def _incidence(self, index: int) -> np.ndarray:
+        pattern = self.system.pattern
+        vector = np.zeros(pattern.size)
+        start, end = pattern.start_index[index], pattern.end_index[index]
+        if start >= 0:
+            vector[start] += 1.0
+        if end >= 0:
+            vector[end] -= 1.0
+        return vector
+
+    def _incidence_products(self, indices: list, x: np.ndarray) -> np.ndarray:
+        """Returns u_i^T x for the incidence vector u_i of every element index"""
+        pattern = self.system.pattern
+        padded = np.concatenate((x, np.zeros((1,) + x.shape[1:])))
+        return padded[pattern.start_index[indices]] - padded[pattern.end_index[indices]]
+
+    def _apply_corrections(self):
+        if not self._conductance_changes:
+            self.x = self._base_x
+            return
+        updated = list(self._conductance_changes)
+        for index in updated:
+            if index not in self._corrections:
+                self._corrections[index] = self.system.solve_rhs(self._incidence(index))
+        corrections = np.column_stack([self._corrections[index] for index in updated])
+        capacitance = np.diag([1 / self._conductance_changes[index] for index in updated])
+        capacitance += self._incidence_products(updated, corrections)
+        if np.linalg.cond(capacitance) > MAX_CAPACITANCE_CONDITION:
+            self._refactorize()
+            return
+        projections = self._incidence_products(updated, self._base_x)
+        self.x = self._base_x - corrections @ np.linalg.solve(capacitance, projections)
+
+    def set_value(self, index: int, value: float) -> DCSolution:
+        """Changes the value of one element and returns the updated solution
+
+        Parameters:
+            index (int): the row of the element in the element table
+            value (float): the new (converted) value of the element
+
+        Returns:
+            DCSolution: the DC operating point with the new value
+
+        Raises:
+            errors.SingularCircuitError: when the circuit has no unique solution with the
+                new value, the solver then keeps the previous value
+        """
+        state = (
+            self.values[index],
+            self.system,
+            self._shorts,
+            self._base_conductances,
+            dict(self._conductance_changes),
+            self._corrections,
+            self._base_x,
+            self.x,
+            self.refactorizations,
+        )
+        try:
+            return self._set_value(index, value)
+        except errors.SingularCircuitError:
+            (
+                self.values[index],
+                self.system,
+                self._shorts,
+                self._base_conductances,
+                self._conductance_changes,
+                self._corrections,
+                self._base_x,
+                self.x,
+                self.refactorizations,
+            ) = state
+            raise
+
+    def _set_value(self, index: int, value: float) -> DCSolution:
+        kind = self.element_table.kind[index]
+        self.values[index] = value
+
+        if kind in (CAPACITOR, INDUCTOR):
+            pass
+        elif kind != RESISTOR:
+            self._base_x = self.system.solve_rhs(self.system.pattern.rhs(self.values))
+            self._apply_corrections()
+        elif not np.isfinite(value) or value == 0 or self._shorts[index]:
+            self._refactorize()
+        else:
+            change = 1 / value - self._base_conductances[index]
+            if change == 0:
+                self._conductance_changes.pop(index, None)
+            else:
+                self._conductance_changes[index] = change
+            if len(self._conductance_changes) > MAX_LOW_RANK_UPDATES:
+                self._refactorize()
+            else:
+                self._apply_corrections()
+        return self.solution()
+
+    def solution(self) -> DCSolution:
+        """Returns the current DC operating point"""
+        if not np.all(np.isfinite(self.x)):
+            raise errors.SingularCircuitError("the MNA matrix is numerically singular")
+        return DCSolution(self.system, self.x)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+from pathlib import Path
+from sys import intern
+from typing import Iterator, List, Optional, Sequence, Union
+from src import errors
+from src.elementtable import ElementTable
+from src.subcircuit import read_hierarchical_table
+import argparse
+import sys
+import numpy as np
+
+
+BINARY_SUFFIX = ".netb"
+MAGIC = b"NETLISTB"
+FORMAT_VERSION = 1
+SECTION_ALIGNMENT = 8
+
+# every section offset is in bytes from the start of the file, all values little endian
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("reserved", "<u4"),
+        ("element_count", "<u8"),
+        ("node_count", "<u8"),
+        ("nodes", "<u8"),
+        ("kind", "<u8"),
+        ("start_node", "<u8"),
+        ("end_node", "<u8"),
+        ("value", "<u8"),
+        ("tag_offsets", "<u8"),
+        ("tag_data", "<u8"),
+        ("tag_data_size", "<u8"),
+    ]
+)
+KIND_DTYPE = np.dtype("u1")
+NODE_DTYPE = np.dtype("<i8")
+VALUE_DTYPE = np.dtype("<f8")
+OFFSET_DTYPE = np.dtype("<u8")
+
+
+class TagTable(Sequence):
+    """ The element tags of a binary Netlist, decoded from its string table on access
+
+    The tags are stored as one UTF-8 blob and the offset of every tag in it, so
+    opening a file does not decode (or even read) the tags.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        begin, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return intern(self._data[begin:end].tobytes().decode("utf-8"))
+
+    def __iter__(self) -> Iterator[str]:
+        data = self._data.tobytes()
+        offsets = self._offsets.tolist()
+        for begin, end in zip(offsets, offsets[1:]):
+            yield intern(data[begin:end].decode("utf-8"))
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+def write_binary_netlist(element_table: ElementTable, file_path: Union[str, Path]):
+    """Saves an element table in the binary Netlist format
+
+    The file is a fixed header (HEADER_DTYPE) followed by 8-byte aligned sections:
+    the sorted distinct node numbers, the kind, start node, end node and value of
+    every element, and a string table holding the tags (offsets and UTF-8 data).
+
+    Parameters:
+        element_table (ElementTable): the elements to save
+        file_path (Union[str, Path]): the path of the binary file
+    """
+    encoded_tags = [tag.encode("utf-8") for tag in element_table.tags]
+    tag_offsets = np.zeros(len(encoded_tags) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum([len(tag) for tag in encoded_tags], out=tag_offsets[1:])
+    sections = [
+        ("nodes", element_table.nodes().astype(NODE_DTYPE)),
+        ("kind", element_table.kind.astype(KIND_DTYPE)),
+        ("start_node", element_table.start_node.astype(NODE_DTYPE)),
+        ("end_node", element_table.end_node.astype(NODE_DTYPE)),
+        ("value", element_table.value.astype(VALUE_DTYPE)),
+        ("tag_offsets", tag_offsets),
+        ("tag_data", np.frombuffer(b"".join(encoded_tags), dtype=np.uint8)),
+    ]
+
+    header = np.zeros((), dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = FORMAT_VERSION
+    header["element_count"] = len(element_table)
+    header["node_count"] = len(sections[0][1])
+    header["tag_data_size"] = int(tag_offsets[-1])
+    offset = HEADER_DTYPE.itemsize
+    for name, section in sections:
+        offset = _aligned(offset)
+        header[name] = offset
+        offset += section.nbytes
+
+    with open(file_path, "wb") as f:
+        f.write(header.tobytes())
+        for name, section in sections:
+            f.write(b"\0" * (int(header[name]) - f.tell()))
+            f.write(section.tobytes())
+
+
+def read_binary_header(file_path: Union[str, Path]) -> np.void:
+    """Reads and checks the header of a binary Netlist file
+
+    Raises:
+        errors.BinaryNetlistError: when the file is not a binary Netlist of a known version
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read(HEADER_DTYPE.itemsize)
+    if len(raw) < HEADER_DTYPE.itemsize:
+        raise errors.BinaryNetlistError(file_path, "the file is too short")
+    header = np.frombuffer(raw, dtype=HEADER_DTYPE)[0]
+    if header["magic"] != MAGIC:
+        raise errors.BinaryNetlistError(file_path, "the file is not a binary Netlist")
+    if header["version"] != FORMAT_VERSION:
+        raise errors.BinaryNetlistError(
+            file_path, f"unsupported format version {int(header['version'])}"
+        )
+    return header
+
+
+def read_binary_netlist(file_path: Union[str, Path], mmap: bool = True) -> ElementTable:
+    """Opens a binary Netlist file as an element table
+
+    With `mmap`, the columns are read-only numpy.memmap views of the file: opening
+    takes constant time whatever the size of the Netlist, pages are only read when
+    used and worker processes opening the same file share the page cache instead of
+    holding copies (pass the path, not the table, to the workers).
+
+    Parameters:
+        file_path (Union[str, Path]): the path of the binary file
+        mmap (bool): whether to memory-map the file instead of reading it
+
+    Returns:
+        ElementTable: the table of the elements
+    """
+    header = read_binary_header(file_path)
+    elements = int(header["element_count"])
+    if mmap:
+        data = np.memmap(file_path, dtype=np.uint8, mode="r")
+    else:
+        data = np.fromfile(file_path, dtype=np.uint8)
+
+    def section(name: str, dtype: np.dtype, count: int) -> np.ndarray:
+        begin = int(header[name])
+        end = begin + count * dtype.itemsize
+        if end > len(data):
+            raise errors.BinaryNetlistError(file_path, f"the {name} section is truncated")
+        return data[begin:end].view(dtype)
+
+    return ElementTable(
+        kind=section("kind", KIND_DTYPE, elements),
+        start_node=section("start_node", NODE_DTYPE, elements),
+        end_node=section("end_node", NODE_DTYPE, elements),
+        value=section("value", VALUE_DTYPE, elements),
+        tags=TagTable(
+            section("tag_offsets", OFFSET_DTYPE, elements + 1),
+            section("tag_data", np.dtype(np.uint8), int(header["tag_data_size"])),
+        ),
+    )
+
+
+def write_netlist_text(
+    element_table: ElementTable, file_path: Union[str, Path], title: str = "Netlist"
+):
+    """Saves an element table as a text (.asc) Netlist, values written in full precision
+
+    Parameters:
+        element_table (ElementTable): the elements to save
+        file_path (Union[str, Path]): the path of the text file
+        title (str): the title line of the Netlist
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(f"{title}\n")
+        for tag, start_node, end_node, value in zip(
+            element_table.tags,
+            element_table.start_node.tolist(),
+            element_table.end_node.tolist(),
+            element_table.value.tolist(),
+        ):
+            f.write(f"{tag} {start_node} {end_node} {value!r}\n")
+        f.write(".end\n")
+
+
+def convert_netlist(source: Union[str, Path], target: Union[str, Path]):
+    """Converts a text Netlist to the binary format, or back when `source` is binary
+
+    Parameters:
+        source (Union[str, Path]): the Netlist file to convert (.asc or .netb)
+        target (Union[str, Path]): the path of the converted file
+    """
+    if Path(source).suffix == BINARY_SUFFIX:
+        write_netlist_text(read_binary_netlist(source), target, title=Path(source).stem)
+    else:
+        write_binary_netlist(read_hierarchical_table(source), target)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=f"Convert a text Netlist to the binary {BINARY_SUFFIX} format, or back"
+    )
+    parser.add_argument("source", help=f"the .asc or {BINARY_SUFFIX} Netlist file")
+    parser.add_argument("target", help="the path of the converted file")
+    arguments = parser.parse_args(argv)
+    convert_netlist(arguments.source, arguments.target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from src.components import (
     Resistor,
     LinearInductor,
@@ -8,22 +8,45 @@ from src.components import (
     LinearElement,
     VoltageSource,
     CurrentSource,
+    convert_value,
 )
-from src.errors import ErrorParsing
+from src.errors import ErrorParsing, NetlistSyntaxError
+from src.profiling import instrumented
+from src.netlistreader import ElementRecord, read_netlist_records
+from src.parameters import is_expression, resolve_records
+from src.subcircuit import hierarchical_table, read_hierarchical_table
+from src.elementtable import ElementTable
+from src.netlistbinary import BINARY_SUFFIX, read_binary_netlist, write_binary_netlist
+from src.reduction import ReductionEngine
+from src.steplog import StepLog, iter_part_text
+from src.decomposition import Decomposition
+from src.factorcache import FactorizationCache
+from src.incremental import IncrementalSolver
+from src.ac import ACAnalysis, ACSolution
+from src.transient import TRAPEZOIDAL, TransientAnalysis, WaveformArray, WaveformFile
+from src.solver import BatchSolution, DCSolution, MNASystem, solve_dc, solve_dc_batch
+from src.ports import PortEquivalents, port_equivalents
+from src.topology import TopologyIndex
+from src.sensitivity import Sensitivities, adjoint_sensitivities
+from src.sweep import DEFAULT_CHUNK_SIZE, ParametricNetlist, SweepPoint
 import networkx as nx
+import numpy as np
 import re
 from pathlib import Path
-from collections import Counter
 from itertools import groupby
-from functools import reduce
 from operator import __or__, __add__
 
+if TYPE_CHECKING:
+    from src.resultcache import ResultCache
+
 
 class Netlist(object):
     """ This is a netlist object that parses a Netlist file
     Parameters:
         components_dict (Dict): The dictionary containing the components
         explanatory_parts (Optional[Dict[str, List[str]]]): A dict of texts explaining the necessary steps of the current state
+        step_logs (Optional[Tuple[StepLog, ...]]): The compact logs of the reductions that led to the current state
+        element_table (Optional[ElementTable]): The columnar table of the components, used instead of components_dict
 
     Attributes:
         elements: the elements/components detected from the Netlist file
@@ -32,28 +55,103 @@ class Netlist(object):
         resistors: the resistors detected from the Netlist file
         inductors: the inductors detected from the Netlist file
         capacitors: the capacitors detected from the Netlist file
+        topology: the node to element incidence, built and validated on first access
+            (parsing a text Netlist accesses it, a binary one or a table does not)
+        content_key: the content key of the parsed file when parsed through a ResultCache
     """
 
     def __init__(
         self,
         components_dict: Optional[dict],
-        explanatory_parts: Optional[Dict[str, List[str]]] = [],
+        explanatory_parts: Optional[Dict[str, List[str]]] = None,
+        element_table: Optional[ElementTable] = None,
+        step_logs: Optional[Tuple[StepLog, ...]] = None,
     ):
-        self._is_parsed = True
-        try:
-            self._elements = components_dict
-            self.branches = self._elements
-            (
-                self._floating_element_nodes,
-                self._parallel_element_nodes,
-            ) = self.get_element_connection_nodes()
-            self.explanatory_parts = explanatory_parts
-            self.is_reduced = False
-        except Exception as e:
-            self._is_parsed = False
-            print(f"Issue parsing Netlist file")
+        self._components = components_dict
+        self._element_table = element_table
+        self._incremental_solver = None
+        self.content_key = None
+        self._topology: Optional[TopologyIndex] = None
+        self._connection_nodes: Optional[Tuple[List, List]] = None
+        self._explanatory_parts = list(explanatory_parts or [])
+        self.step_logs = tuple(step_logs or ())
+        self.is_reduced = False
+
+    @property
+    def explanatory_parts(self) -> List[Dict]:
+        """The reduction steps as dicts of Resistor objects, materialized from the step
+        logs on access (get_explanation does not need them)"""
+        return self._explanatory_parts + [
+            part for step_log in self.step_logs for part in step_log.iter_parts()
+        ]
+
+    @property
+    def _elements(self) -> Dict[str, List[LinearElement]]:
+        """The components dict, materialized from the element table on first access"""
+        if self._components is None and self._element_table is not None:
+            self._components = self._element_table.to_components()
+        return self._components
+
+    @property
+    def branches(self) -> Dict[str, List[LinearElement]]:
+        return self._elements
+
+    @property
+    def topology(self) -> TopologyIndex:
+        """The node to element incidence, built and validated on first access
+
+        Raises:
+            errors.SingularCircuitError: when the connectivity of the circuit cannot give
+                a unique solution (see TopologyIndex.validate)
+        """
+        if self._topology is None:
+            self._topology = TopologyIndex(self.element_table).validate()
+        return self._topology
+
+    def validate(self) -> Netlist:
+        """Builds and validates the topology now instead of on first use
+
+        Raises:
+            errors.SingularCircuitError: see TopologyIndex.validate
+        """
+        self.topology
+        return self
+
+    @property
+    def _floating_element_nodes(self) -> List[Tuple[int, int]]:
+        return self.get_element_connection_nodes()[0]
+
+    @property
+    def _parallel_element_nodes(self) -> List[Tuple[int, int]]:
+        return self.get_element_connection_nodes()[1]
+
+    @property
+    def element_table(self) -> ElementTable:
+        """The columnar table of the components, built from components_dict if needed"""
+        if self._element_table is None:
+            self._element_table = ElementTable.from_components(self._components)
+        return self._element_table
 
     @classmethod
+    @instrumented("parse", elements=len)
+    def read_element_table(cls, file_path: Path) -> ElementTable:
+        """Streams a Netlist file straight into a columnar element table,
+        without creating a LinearElement per line
+
+        Subcircuit instances are replaced by the elements of the (cached) macromodel
+        of their subcircuit, see subcircuit.hierarchical_table.
+
+        Parameters:
+            file_path (Path): The path of the file on the system
+        Returns:
+            ElementTable: the table of the elements
+        """
+        if not (file_path):
+            raise ErrorParsing()
+        return read_hierarchical_table(file_path)
+
+    @classmethod
+    @instrumented("parse", elements=lambda elements: sum(map(len, (elements or {}).values())))
     def read_netlist_file(cls, file_path: Path):
         """ This is a netlist reader method that parses a Netlist file
         Parameters:
@@ -61,48 +159,129 @@ class Netlist(object):
         """
         if not (file_path):
             raise ErrorParsing()
-        _elements = None
-        try:
-            _elements = {"v": [], "l": [], "r": [], "i": [], "c": []}
-
-            with open(file_path, "r") as f:
-                _netlist_lines = f.readlines()[1:-1]
+        _elements = {"v": [], "l": [], "r": [], "i": [], "c": []}
+        directives: List[tuple] = []
+        # a {...} value needs the .param lines, which may follow it: only these records
+        # are kept, their elements created in their place once the file is read
+        deferred: List[Tuple[ElementRecord, int]] = []
+        for record in read_netlist_records(file_path, directives=directives):
+            if is_expression(record.value) and record.symbol in _elements:
+                deferred.append((record, len(_elements[record.symbol])))
+                _elements[record.symbol].append(None)
+            else:
+                element = cls.create_element(record)
+                _elements[record.symbol].append(element)
+        if deferred:
+            records = resolve_records([record for record, _ in deferred], directives)
+            for record, (_, position) in zip(records, deferred):
+                _elements[record.symbol][position] = cls.create_element(record)
+        return _elements
 
-            for line in _netlist_lines:
-                element_symbol = line[0].lower()
-                start_node = int(line.split(" ")[1].strip())
-                end_node = int(line.split(" ")[2].strip())
-                value = line.split(" ")[-1].strip()
+    @classmethod
+    def iter_elements(cls, file_path: Path) -> Iterator[LinearElement]:
+        """Streams the elements of a Netlist file, reading and tokenizing one line at a time
 
-                _elements.get(element_symbol).append(
-                    Netlist.get_supported_elements(element_symbol=element_symbol)(
-                        start_node=start_node, end_node=end_node, value=value
-                    )
-                )
+        Parameters:
+            file_path (Path): The path of the file on the system
+        Returns:
+            Iterator[LinearElement]: the elements in file order
+        """
+        if not (file_path):
+            raise ErrorParsing()
+        for record in read_netlist_records(file_path):
+            yield cls.create_element(record)
 
-        except Exception as e:
-            print(f"Issue parsing Netlist {e}, file could be corrupt")
+    @classmethod
+    def create_element(cls, record: ElementRecord) -> LinearElement:
+        """Builds the linear element of a tokenized Netlist line
 
-        return _elements
+        Parameters:
+            record (ElementRecord): the tokenized element line
+        Returns:
+            LinearElement: the linear element representation
+        """
+        element_class = cls.get_supported_elements(element_symbol=record.symbol)
+        if element_class is None:
+            raise NetlistSyntaxError(
+                record.line_number, record.name, f"unsupported element {record.name}"
+            )
+        element = element_class(
+            start_node=record.start_node, end_node=record.end_node, value=record.value
+        )
+        element.name = record.name
+        return element
 
     @classmethod
     def load(cls, netlist_components: dict) -> Netlist:
         return Netlist(components_dict=netlist_components)
 
     @classmethod
-    def parse(cls, file_path: Path) -> Netlist:
+    def from_table(cls, element_table: ElementTable) -> Netlist:
+        return Netlist(components_dict=None, element_table=element_table)
+
+    @classmethod
+    def from_text(cls, text: str) -> Netlist:
+        """Parses the content of a Netlist file (title line included) into a columnar Netlist
+
+        Parameters:
+            text (str): the Netlist text
+        Returns:
+            Netlist: the object representation of the Netlist
+        """
+        return cls.from_table(hierarchical_table(text.splitlines())).validate()
+
+    @classmethod
+    def parse(
+        cls, file_path: Path, columnar: bool = False, cache: Optional[ResultCache] = None
+    ) -> Netlist:
         """Loads and Parses a Netlist object
 
         Parameters:
-          file_path (Path): The path of the file on the system
+          file_path (Path): The path of the file on the system, binary Netlist files
+            (.netb) are memory-mapped into a columnar Netlist
+          columnar (bool): Whether to hold the elements in a columnar ElementTable
+            and only create LinearElement objects when they are asked for
+          cache (Optional[ResultCache]): a persistent cache of the parsed element tables,
+            keyed by the content of the file; the Netlist is then columnar
         Returns:
             Netlist: the object representation of the parsed Netlist file
         """
-        _elements = cls.read_netlist_file(file_path)
-        netlist_obj = None
-        if _elements:
-            netlist_obj = Netlist(_elements)
-        return netlist_obj
+        if file_path and Path(file_path).suffix == BINARY_SUFFIX:
+            return cls.from_table(read_binary_netlist(file_path))
+        if cache is not None:
+            return cache.parse(file_path)
+        if columnar:
+            netlist_obj = cls.from_table(cls.read_element_table(file_path))
+        else:
+            _elements = cls.read_netlist_file(file_path)
+            netlist_obj = Netlist(_elements) if _elements else None
+        # the text was read line by line anyway, a broken circuit fails at load
+        return netlist_obj.validate() if netlist_obj is not None else None
+
+    @classmethod
+    def sweep(
+        cls, file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None
+    ) -> Iterator[SweepPoint]:
+        """Runs the .step/.dc sweeps of a Netlist file, parsing its topology once
+
+        Parameters:
+          file_path (Path): The path of the file on the system
+          chunk_size (int): the number of points evaluated and solved as one batch
+          workers (Optional[int]): the number of processes (see ParametricNetlist.run)
+        Returns:
+            Iterator[SweepPoint]: the DC operating point of every point, streamed in order
+        """
+        if not (file_path):
+            raise ErrorParsing()
+        return ParametricNetlist.read(file_path).run(chunk_size=chunk_size, workers=workers)
+
+    def save_binary(self, file_path: Path):
+        """Saves the elements in the binary Netlist format (see netlistbinary)
+
+        Parameters:
+            file_path (Path): The path of the .netb file
+        """
+        write_binary_netlist(self.element_table, file_path)
 
     @classmethod
     def get_supported_elements(cls, element_symbol) -> LinearElement:
@@ -131,28 +310,13 @@ class Netlist(object):
     def __get_loop(self):
         pass
 
-    def __get_branches(self):
-        """Get the total elements in the Netlist file
-
-      Returns:
-          List[LinearElement]: A list of the linear Elements discovered
-      """
-        return (
-            self._elements.get("i")
-            + self._elements.get("v")
-            + self._elements.get("r")
-            + self._elements.get("c")
-            + self._elements.get("l")
-        )
-
     def get_sources(self) -> List:
         """Returns the current sources and voltage sources found in the Netlist
 
         Returns:
             Optional[List]: A list of current and voltage sources
         """
-        if self._is_parsed:
-            return self.get_voltage_sources() + self.get_current_sources()
+        return self.get_voltage_sources() + self.get_current_sources()
 
     def get_voltage_sources(self):
         """Returns a list of voltage sources found in the Netlist
@@ -171,6 +335,153 @@ class Netlist(object):
         """
         return self._elements.get("i")
 
+    def get_resistors(self):
+        """Returns a list of resistors found in the Netlist
+
+        Returns:
+            Optional[List]: A list of resistors
+        """
+        return self._elements.get("r")
+
+    def get_topology_fingerprint(self) -> str:
+        """Returns a digest of the element kinds and (start_node, end_node) pairs,
+        shared by every Netlist with the same connectivity whatever its values
+
+        Returns:
+            str: the topology fingerprint
+        """
+        return self.element_table.topology_fingerprint()
+
+    @instrumented("solve", elements=lambda solution: len(solution.element_currents))
+    def solve_dc(self, cache: Optional[FactorizationCache] = None) -> DCSolution:
+        """Solves every node voltage and branch current of the Netlist with a
+        single sparse Modified Nodal Analysis factorization
+
+        Parameters:
+            cache (Optional[FactorizationCache]): a cache of the symbolic structure and
+                factorizations, shared by the solves of Netlists of the same topology
+        Returns:
+            DCSolution: the DC operating point of the circuit
+        """
+        return solve_dc(self, cache=cache)
+
+    def solve_decomposed(self, workers: Optional[int] = None) -> DCSolution:
+        """Solves the DC operating point block by block
+
+        The circuit is split into its connected components and biconnected blocks
+        (see decomposition.Decomposition); the blocks are solved independently, on
+        several processes for large circuits, and their solutions stitched together.
+
+        Parameters:
+            workers (Optional[int]): the number of processes, 0 or 1 to solve in this process
+        Returns:
+            DCSolution: the DC operating point of the circuit
+        """
+        return Decomposition(self.element_table).solve(workers=workers)
+
+    def update_element_value(
+        self, element: Union[str, int], value: Union[str, float]
+    ) -> DCSolution:
+        """Changes the value of one element and returns the updated DC solution
+
+        The first call factorizes the circuit; later calls update the solution with
+        low-rank corrections of that factorization instead of a full re-solve, and
+        fall back to a refactorization when the change affects the topology.
+
+        Parameters:
+            element (Union[str, int]): the name of the element in the Netlist file
+                (e.g. "r1"), which is its tag, or its element table row
+            value (Union[str, float]): the new value of the element (e.g. "4.7k")
+        Returns:
+            DCSolution: the DC operating point with the new value
+        """
+        element_table = self.element_table
+        index = element if isinstance(element, int) else element_table.index_of(element)
+        value = convert_value(value)
+        if self._incremental_solver is None:
+            self._incremental_solver = IncrementalSolver(element_table)
+        solution = self._incremental_solver.set_value(index, value)
+        if not element_table.value.flags.writeable:
+            element_table.value = element_table.value.copy()
+        element_table.value[index] = value
+        self._components = None
+        return solution
+
+    def solve_batch(
+        self, values: np.ndarray, cache: Optional[FactorizationCache] = None
+    ) -> BatchSolution:
+        """Solves the Netlist topology for many sets of element values at once
+        (e.g. Monte Carlo or corner runs), sharing the symbolic structure of the system
+
+        Parameters:
+            values (np.ndarray): the element values of every run, (runs, elements),
+                with the columns in the order of `element_table.tags`
+            cache (Optional[FactorizationCache]): a cache of the symbolic structure
+        Returns:
+            BatchSolution: the node voltages, element currents and effective
+            resistance of every run
+        """
+        return solve_dc_batch(self.element_table, values, cache=cache)
+
+    def port_equivalents(
+        self, pairs: Iterable[Tuple[int, int]], cache: Optional[FactorizationCache] = None
+    ) -> PortEquivalents:
+        """Computes the Thévenin/Norton equivalent seen from many node pairs, all of
+        them from the factorization of the DC operating point
+
+        Parameters:
+            pairs (Iterable[Tuple[int, int]]): the (a, b) node pairs of the ports
+            cache (Optional[FactorizationCache]): a cache of the symbolic structure and
+                factorizations
+        Returns:
+            PortEquivalents: the open circuit voltage, resistance and short circuit
+            current of every port
+        """
+        return port_equivalents(MNASystem.from_netlist(self, cache=cache), pairs)
+
+    def sensitivities(
+        self, nodes: Optional[Iterable[int]] = None, cache: Optional[FactorizationCache] = None
+    ) -> Sensitivities:
+        """Computes d(node voltage)/d(element value) for every resistor and source with the
+        adjoint method, one transposed solve per output node (see adjoint_sensitivities)
+
+        Parameters:
+            nodes (Optional[Iterable[int]]): the output nodes, every non-ground node by default
+            cache (Optional[FactorizationCache]): a cache of the symbolic structure and
+                factorizations
+        Returns:
+            Sensitivities: the sensitivities of the output nodes, indexed by element tag
+        """
+        return adjoint_sensitivities(MNASystem.from_netlist(self, cache=cache), nodes)
+
+    def transient(
+        self, stop_time: float, step: float, method: str = TRAPEZOIDAL, **options
+    ) -> Union[WaveformArray, WaveformFile]:
+        """Simulates the Netlist in the time domain, with its capacitors and inductors
+
+        Parameters:
+            stop_time (float): the end of the simulation
+            step (float): the time step (the largest one with adaptive=True)
+            method (str): "trapezoidal" or "backward_euler"
+            options: the options of TransientAnalysis.run (adaptive, reltol, output, ...)
+        Returns:
+            Union[WaveformArray, WaveformFile]: the node voltages and branch currents
+        """
+        return TransientAnalysis(self.element_table, method=method).run(
+            stop_time, step, **options
+        )
+
+    def ac_sweep(self, frequencies: np.ndarray, **options) -> ACSolution:
+        """Solves the small-signal phasors of the Netlist over a frequency sweep
+
+        Parameters:
+            frequencies (np.ndarray): the frequencies in Hz
+            options: the options of ACAnalysis.run (chunk_size)
+        Returns:
+            ACSolution: the node phasors at every frequency
+        """
+        return ACAnalysis(self.element_table).run(frequencies, **options)
+
     def get_combination_resistors(self):
         series_nodes, parallel_nodes = self.get_element_connection_nodes()
 
@@ -221,155 +532,67 @@ class Netlist(object):
         return series_resistors, parallel_resistors, floating_resistors
 
     @classmethod
-    def calculate_effective_resistance(cls, netlist_obj: Netlist):
-        result = None
+    @instrumented("reduce")
+    def calculate_effective_resistance(cls, netlist_obj: Netlist, explain: bool = True):
+        """Reduces the resistors of a Netlist with series/parallel and star/delta steps
 
-        if len(netlist_obj._elements.get("r")) == 1:
-            result = netlist_obj
+        The sources' nodes are kept as terminals, the reduction runs on a single
+        multigraph (see ReductionEngine). With `explain`, every step is recorded in
+        a compact StepLog, only rendered to text by get_explanation.
 
-        else:
-            (
-                series_resistors,
-                parallel_resistors,
-                floating_resistors,
-            ) = netlist_obj.get_combination_resistors()
-
-            effective_resistance = []
-            eq_series_resistor = None
-            eq_parallel_resistor = None
-            explanatory_parts = netlist_obj.explanatory_parts
-            voltage_sources = netlist_obj.get_voltage_sources()
-            current_sources = netlist_obj.get_current_sources()
-
-            if parallel_resistors:
-                for node in parallel_resistors:
-                    eq_parallel_resistor = reduce(
-                        lambda x, y: x | y, parallel_resistors[node]
-                    )
-                    effective_resistance.append(eq_parallel_resistor)
-
-            if series_resistors:
-                eq_series_resistor = reduce(lambda x, y: x + y, series_resistors)
-                effective_resistance.append(eq_series_resistor)
-            explanatory_parts.append(
-                {
-                    "series_resistors": series_resistors,
-                    "parallel_resistors": parallel_resistors,
-                    "series_accumulation": eq_series_resistor,
-                    "parallel_accumulation": eq_parallel_resistor,
-                }
-            )
-            effective_resistance.extend(floating_resistors)
-            components = {
-                "v": voltage_sources,
-                "l": [],
-                "r": effective_resistance,
-                "i": current_sources,
-                "c": [],
-            }
-
-            simplified_netlist = Netlist(
-                components_dict=components, explanatory_parts=explanatory_parts
-            )
-            return Netlist.calculate_effective_resistance(simplified_netlist)
-        return result
-
-    def get_explanation(self):
-        explanatory_text = ""
-        series_explanation = ""
-        parallel_explanation = ""
-        reversed_explanation_part = self.explanatory_parts[::-1]
-        if reversed_explanation_part:
-            for explanation_part in reversed_explanation_part:
-                if explanation_part["series_resistors"]:
-                    series_explanation = " ".join(
-                        map(
-                            lambda resistor: f"{resistor.tag} ({resistor.value}{resistor.symbol})",
-                            explanation_part["series_resistors"][::-1],
-                        )
-                    )
-                    series_explanation_1 = " + ".join(
-                        map(
-                            lambda resistor: f" ({resistor.value}{resistor.symbol}),",
-                            explanation_part["series_resistors"][::-1],
-                        )
-                    )
-                    series_accumulation = explanation_part["series_accumulation"]
-                    series_explanation = (
-                        "\nThe following resistors are in Series: "
-                        + series_explanation
-                        + "\n( "
-                        + series_explanation_1
-                        + " ) "
-                        + f" = {series_accumulation.value}{series_accumulation.symbol}"
-                        + "\n"
-                    )
-
-                if len(explanation_part["parallel_resistors"]) > 0:
-                    print(explanation_part["parallel_resistors"])
-                    parallel_resistors = reduce(
-                        lambda x, y: x + y,
-                        explanation_part["parallel_resistors"].values(),
-                    )[::-1]
-
-                    parallel_explanation = " ".join(
-                        map(
-                            lambda resistor: f"{resistor.tag} ({resistor.value}{resistor.symbol}),",
-                            parallel_resistors,
-                        )
-                    )
-                    parallel_explanation_1 = " + ".join(
-                        map(
-                            lambda resistor: f" 1/({resistor.value}{resistor.symbol}) ",
-                            parallel_resistors,
-                        )
-                    )
-                    parallel_accumulation = explanation_part["parallel_accumulation"]
-
-                    parallel_explanation = (
-                        "\nThe following resistors are in Parallel: "
-                        + parallel_explanation
-                        + "\n1 /"
-                        + "("
-                        + parallel_explanation_1
-                        + ")"
-                        + f" = {parallel_accumulation.value}{parallel_accumulation.symbol}"
-                        + "\n"
-                    )
-
-            explanatory_text = series_explanation + parallel_explanation
-        return explanatory_text
+        Parameters:
+            netlist_obj (Netlist): the Netlist to reduce
+            explain (bool): whether to record the steps, pass False when the explanation
+                is never read (e.g. batch solves)
+        Returns:
+            Netlist: a Netlist holding the sources and the equivalent resistor(s)
+        """
+        if len(netlist_obj._elements.get("r")) == 1:
+            return netlist_obj
+
+        engine = ReductionEngine.from_netlist(netlist_obj, record_steps=explain).reduce()
+        components = {
+            "v": netlist_obj.get_voltage_sources(),
+            "l": [],
+            "r": engine.get_resistors(),
+            "i": netlist_obj.get_current_sources(),
+            "c": [],
+        }
+        return Netlist(
+            components_dict=components,
+            explanatory_parts=netlist_obj._explanatory_parts,
+            step_logs=netlist_obj.step_logs + ((engine.step_log,) if explain else ()),
+        )
 
-    def get_element_connection_nodes(self):
-        """Returns a list of nodes in parallel, series found in the Netlist
+    def iter_explanation(self) -> Iterator[str]:
+        """Streams the explanation of the reduction steps, rendered one step at a time
 
         Returns:
-            Optional[List]: A list of nodes in parallel
+            Iterator[str]: the text of every step
         """
-        parallel_element_nodes = []
-        floating_element_nodes = []
-
-        try:
-            element_nodes = [
-                (element.start_node, element.end_node)
-                for element in self.__get_branches()
-            ]
-            distinct_element_nodes = Counter(element_nodes)
-            counted_connected_nodes = distinct_element_nodes
-
-            for node, count in counted_connected_nodes.items():
-                if count > 1:
-                    parallel_element_nodes.append(node)
-                else:
-                    floating_element_nodes.append(node)
+        for part in self._explanatory_parts:
+            yield from iter_part_text(part)
+        for step_log in self.step_logs:
+            yield from step_log.iter_text()
 
-            self._floating_element_nodes = floating_element_nodes
-            self._parallel_element_nodes = parallel_element_nodes
+    @instrumented("explain")
+    def get_explanation(self) -> str:
+        return "".join(self.iter_explanation())
 
-        except Exception as e:
-            print(e)
+    @instrumented("connection_nodes")
+    def get_element_connection_nodes(self):
+        """Returns a list of nodes in parallel, series found in the Netlist, counted on
+        the topology index, computed on first use
 
-        return (
-            self._floating_element_nodes,
-            self._parallel_element_nodes,
-        )
+        Returns:
+            Optional[List]: A list of nodes in parallel
+        """
+        if self._connection_nodes is None:
+            pairs, counts = self.topology.connection_counts()
+            pairs = list(map(tuple, pairs.tolist()))
+            parallel = (counts > 1).tolist()
+            self._connection_nodes = (
+                [pair for pair, many in zip(pairs, parallel) if not many],
+                [pair for pair, many in zip(pairs, parallel) if many],
+            )
+        return self._connection_nodes
@@ -0,0 +1,162 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+from src import errors
+
+
+COMMENT_PREFIX = "*"
+CONTINUATION_PREFIX = "+"
+INLINE_COMMENT = ";"
+END_DIRECTIVE = ".end"
+SUBCKT_DIRECTIVE = ".subckt"
+EXPRESSION_OPEN = "{"
+EXPRESSION_CLOSE = "}"
+
+
+class ElementRecord(NamedTuple):
+    """A single element line of a Netlist, tokenized once
+
+    Attributes
+        name: the name of the element in the Netlist file (r1, v2, ...)
+        symbol: the lower case symbol of the element (r, v, i, c, l)
+        start_node: the start node of the element
+        end_node: the end node of the element
+        value: the (unconverted) value of the element
+        line_number: the line of the file where the element starts
+    """
+
+    name: str
+    symbol: str
+    start_node: int
+    end_node: int
+    value: str
+    line_number: int
+
+
+def iter_logical_lines(
+    lines: Iterable[str], has_title: bool = True
+) -> Iterator[tuple]:
+    """Joins continuation lines and strips comments, one physical line at a time
+
+    Parameters:
+        lines (Iterable[str]): the physical lines of the Netlist (e.g. an open file)
+        has_title (bool): whether the first line is a title line (SPICE convention)
+
+    Returns:
+        Iterator[tuple]: (line_number, tokens) for every logical line before `.end`
+    """
+    pending_tokens: List[str] = []
+    pending_line_number = 0
+
+    for line_number, line in enumerate(lines, start=1):
+        if has_title and line_number == 1:
+            continue
+
+        line = line.split(INLINE_COMMENT, 1)[0]
+        tokens = line.split()
+        if not tokens or tokens[0].startswith(COMMENT_PREFIX):
+            continue
+
+        if tokens[0].startswith(CONTINUATION_PREFIX):
+            if not pending_tokens:
+                raise errors.NetlistSyntaxError(
+                    line_number, line, "continuation without a preceding line"
+                )
+            first_token = tokens[0][len(CONTINUATION_PREFIX) :]
+            pending_tokens.extend(([first_token] if first_token else []) + tokens[1:])
+            continue
+
+        if pending_tokens:
+            yield pending_line_number, pending_tokens
+
+        if tokens[0].lower() == END_DIRECTIVE:
+            return
+
+        pending_tokens, pending_line_number = tokens, line_number
+
+    if pending_tokens:
+        yield pending_line_number, pending_tokens
+
+
+def iter_netlist_records(
+    lines: Iterable[str], has_title: bool = True, directives: Optional[List[tuple]] = None
+) -> Iterator[ElementRecord]:
+    """Streams the element records of a Netlist without loading it in memory
+
+    Directive lines (starting with `.`) other than `.end` are skipped, or appended to
+    `directives` when given.
+
+    Parameters:
+        lines (Iterable[str]): the physical lines of the Netlist (e.g. an open file)
+        has_title (bool): whether the first line is a title line (SPICE convention)
+        directives (Optional[List[tuple]]): collects the (line_number, tokens) of the
+            directive lines (.param, .step, ...)
+
+    Returns:
+        Iterator[ElementRecord]: the element records in file order
+    """
+    for line_number, tokens in iter_logical_lines(lines, has_title=has_title):
+        name = tokens[0]
+        if name.lower() == SUBCKT_DIRECTIVE:
+            raise errors.NetlistSyntaxError(
+                line_number,
+                " ".join(tokens),
+                "subcircuits need the hierarchical reader (Netlist.parse(columnar=True))",
+            )
+        if name.startswith("."):
+            if directives is not None:
+                directives.append((line_number, tokens))
+            continue
+        yield element_record(tokens, line_number)
+
+
+def element_record(tokens: List[str], line_number: int) -> ElementRecord:
+    """Builds the record of one tokenized element line
+
+    Raises:
+        errors.NetlistSyntaxError: when the line is not <name> <node> <node> ... <value>
+    """
+    if len(tokens) < 4:
+        raise errors.NetlistSyntaxError(
+            line_number, " ".join(tokens), "expected <name> <node> <node> <value>"
+        )
+    try:
+        start_node, end_node = int(tokens[1]), int(tokens[2])
+    except ValueError:
+        raise errors.NetlistSyntaxError(line_number, " ".join(tokens), "nodes must be integers")
+    value = tokens[-1]
+    if value.endswith(EXPRESSION_CLOSE) and not value.startswith(EXPRESSION_OPEN):
+        # a {...} expression value with spaces spans several tokens
+        opening = [
+            position
+            for position in range(3, len(tokens))
+            if tokens[position].startswith(EXPRESSION_OPEN)
+        ]
+        if opening:
+            value = " ".join(tokens[opening[-1] :])
+    return ElementRecord(
+        name=tokens[0],
+        symbol=tokens[0][0].lower(),
+        start_node=start_node,
+        end_node=end_node,
+        value=value,
+        line_number=line_number,
+    )
+
+
+def read_netlist_records(
+    file_path: Union[str, Path], has_title: bool = True, directives: Optional[List[tuple]] = None
+) -> Iterator[ElementRecord]:
+    """Streams the element records of a Netlist file line by line
+
+    Parameters:
+        file_path (Path): the path of the Netlist file
+        has_title (bool): whether the first line is a title line (SPICE convention)
+        directives (Optional[List[tuple]]): collects the directive lines (see
+            iter_netlist_records)
+
+    Returns:
+        Iterator[ElementRecord]: the element records in file order
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        yield from iter_netlist_records(f, has_title=has_title, directives=directives)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from typing import Optional
+from src.elementtable import ElementTable
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+
+GROUND_NODE = 0
+
+NATURAL = "NATURAL"
+COLAMD = "COLAMD"
+MINIMUM_DEGREE = "MMD_AT_PLUS_A"
+REVERSE_CUTHILL_MCKEE = "RCM"
+# the SuperLU orderings are computed by the first factorization, the others up front
+SUPERLU_ORDERINGS = (NATURAL, COLAMD, MINIMUM_DEGREE, "MMD_ATA")
+ORDERINGS = SUPERLU_ORDERINGS + (REVERSE_CUTHILL_MCKEE,)
+# minimum degree on the structure of A + A^T suits the (nearly symmetric) MNA matrices,
+# it needs about half the fill of COLAMD on resistor meshes
+DEFAULT_ORDERING = MINIMUM_DEGREE
+
+
+class NodeNumbering:
+    """ Compacts arbitrary node numbers into a dense 0..N-1 index, the ground node being 0
+
+    Attributes
+        nodes: the original node number of every dense index (nodes[0] is the ground)
+        node_count: the number of nodes, ground included
+    """
+
+    def __init__(self, nodes: np.ndarray):
+        # sorted then deduplicated, np.unique hashes int64 keys several times slower
+        nodes = np.sort(np.asarray(nodes, dtype=np.int64), axis=None)
+        nodes = nodes[np.concatenate(([True], nodes[1:] != nodes[:-1]))]
+        self.nodes = np.concatenate(([GROUND_NODE], nodes[nodes != GROUND_NODE]))
+        self.node_count = len(self.nodes)
+
+    @classmethod
+    def from_table(cls, element_table: ElementTable) -> NodeNumbering:
+        return cls(element_table.nodes())
+
+    def index(self, nodes: np.ndarray) -> np.ndarray:
+        """Maps original node numbers to their dense index
+
+        Raises:
+            KeyError: when a node is not part of the numbering
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        index = np.searchsorted(self.nodes[1:], nodes) + 1
+        index = np.where(nodes == GROUND_NODE, 0, index)
+        known = self.nodes[np.minimum(index, self.node_count - 1)] == nodes
+        if not np.all(known):
+            unknown = np.atleast_1d(nodes)[~np.atleast_1d(known)]
+            raise KeyError(f"unknown nodes {unknown.tolist()}")
+        return index
+
+    def original(self, index: np.ndarray) -> np.ndarray:
+        """Maps dense node indices back to the original node numbers"""
+        return self.nodes[np.asarray(index, dtype=np.int64)]
+
+    def renumber(self, element_table: ElementTable) -> ElementTable:
+        """Returns the table with its nodes replaced by their dense index
+
+        Parameters:
+            element_table (ElementTable): a table whose nodes are all part of the numbering
+
+        Returns:
+            ElementTable: the renumbered table, sharing the kind, value and tag columns
+        """
+        return ElementTable(
+            element_table.kind,
+            self.index(element_table.start_node),
+            self.index(element_table.end_node),
+            element_table.value,
+            element_table.tags,
+        )
+
+
+def structure_graph(indices: np.ndarray, indptr: np.ndarray, size: int) -> sp.csr_matrix:
+    """Returns the adjacency of the symmetrized structure (A + A^T) of a CSC pattern"""
+    matrix = sp.csc_matrix((np.ones(len(indices)), indices, indptr), shape=(size, size))
+    return (matrix + matrix.T).tocsr()
+
+
+def symmetric_ordering(
+    indices: np.ndarray, indptr: np.ndarray, size: int, method: str = REVERSE_CUTHILL_MCKEE
+) -> Optional[np.ndarray]:
+    """Computes a symmetric ordering of the unknowns of a CSC pattern up front
+
+    Parameters:
+        indices, indptr: the CSC sparsity pattern of the matrix
+        size (int): the number of unknowns
+        method (str): one of ORDERINGS; the SuperLU orderings are left to the
+            factorization and return None
+
+    Returns:
+        Optional[np.ndarray]: the unknown placed at every position, or None
+    """
+    if method not in ORDERINGS:
+        raise ValueError(f"unknown ordering {method!r}, expected one of {ORDERINGS}")
+    if method in SUPERLU_ORDERINGS:
+        return None
+    graph = structure_graph(indices, indptr, size)
+    return np.asarray(reverse_cuthill_mckee(graph, symmetric_mode=True), dtype=np.int64)
+
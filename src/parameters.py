@@ -0,0 +1,339 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
+from src import errors
+from src.components import convert_value
+from src.netlistreader import EXPRESSION_CLOSE, EXPRESSION_OPEN, ElementRecord
+import ast
+import re
+import numpy as np
+
+
+PARAM_DIRECTIVE = ".param"
+STEP_DIRECTIVE = ".step"
+DC_DIRECTIVE = ".dc"
+SWEEP_MODES = ("lin", "dec", "oct", "list")
+# the functions an expression may call, all of them applying elementwise to sweeps
+FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "ln": np.log,
+    "log": np.log,
+    "log10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "atan": np.arctan,
+    "pow": np.power,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+CONSTANTS = {"pi": np.pi}
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Pow,
+    ast.USub,
+    ast.UAdd,
+)
+# a number, its exponent matched whole (1e-3 is not 1 with an "e" suffix), then an
+# optional SI prefix or unit (4.7k, 1Meg, 10uF), not preceded by a name character
+_LITERAL_PATTERN = re.compile(
+    r"(?<![\w.])((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?![eE][+-]?\d)"
+    r"([a-zA-Zµμ]\w*)?"
+)
+_ASSIGNMENT_PATTERN = re.compile(r"([A-Za-z_]\w*)\s*=")
+
+Value = Union[float, np.ndarray]
+
+
+def is_expression(value: str) -> bool:
+    """Returns whether an element value is a {...} expression instead of a literal"""
+    return value.startswith(EXPRESSION_OPEN)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Tuple[object, Tuple[str, ...]]:
+    """Checks and compiles an expression once
+
+    The literals with SI prefixes are converted to plain numbers, then only
+    arithmetic, the FUNCTIONS and names are accepted: an expression cannot reach
+    Python builtins or attributes.
+
+    Raises:
+        errors.ParameterError: when the expression is not valid
+
+    Returns:
+        Tuple: the code object and the parameter names the expression reads
+    """
+    text = expression.strip()
+    if text.startswith(EXPRESSION_OPEN) and text.endswith(EXPRESSION_CLOSE):
+        text = text[1:-1]
+    text = _LITERAL_PATTERN.sub(
+        lambda match: (
+            repr(float(convert_value(match.group(0)))) if match.group(2) else match.group(0)
+        ),
+        text,
+    ).replace("^", "**")
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise errors.ParameterError(expression, f"invalid syntax ({e.msg})")
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise errors.ParameterError(expression, f"{type(node).__name__} is not allowed")
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords
+        ):
+            raise errors.ParameterError(expression, "only the FUNCTIONS can be called")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise errors.ParameterError(expression, "only numbers are allowed")
+        if isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+            names.add(node.id)
+    names -= set(CONSTANTS)
+    return compile(tree, "<expression>", "eval"), tuple(sorted(names))
+
+
+def expression_names(expression: str) -> Tuple[str, ...]:
+    """Returns the parameter names an expression reads"""
+    return compile_expression(expression)[1]
+
+
+def evaluate(expression: str, parameters: Mapping[str, Value]) -> Value:
+    """Evaluates an expression, elementwise when parameters are arrays (sweep points)
+
+    Parameters:
+        expression (str): the expression, with or without its braces (e.g. "{2 * R0}")
+        parameters (Mapping[str, Value]): the value(s) of the parameters
+
+    Raises:
+        errors.ParameterError: when the expression is invalid or reads an undefined name
+
+    Returns:
+        Value: a number, or an array with the shape of the parameter arrays
+    """
+    code, names = compile_expression(expression)
+    missing = [name for name in names if name not in parameters]
+    if missing:
+        raise errors.ParameterError(expression, f"{missing} are not defined")
+    namespace = {**CONSTANTS, **FUNCTIONS, **{name: parameters[name] for name in names}}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return eval(code, {"__builtins__": {}}, namespace)
+
+
+def parse_param_directive(tokens: List[str], line_number: int = 0) -> Dict[str, str]:
+    """Splits a .param line into its definitions, `.param a=1k b = {2 * a}`
+
+    Raises:
+        errors.NetlistSyntaxError: when the line has no name=expression definition
+    """
+    text = " ".join(tokens[1:])
+    assignments = list(_ASSIGNMENT_PATTERN.finditer(text))
+    if not assignments or assignments[0].start() != 0:
+        raise errors.NetlistSyntaxError(
+            line_number, " ".join(tokens), "expected .param <name>=<expression>..."
+        )
+    ends = [assignment.start() for assignment in assignments[1:]] + [len(text)]
+    definitions = {}
+    for assignment, end in zip(assignments, ends):
+        expression = text[assignment.end() : end].strip()
+        if not expression:
+            raise errors.NetlistSyntaxError(
+                line_number, " ".join(tokens), f"{assignment.group(1)} has no expression"
+            )
+        definitions[assignment.group(1)] = expression
+    return definitions
+
+
+def parameter_definitions(directives: Iterable[Tuple[int, List[str]]]) -> Dict[str, str]:
+    """Collects the .param definitions of the directive lines of a Netlist"""
+    definitions: Dict[str, str] = {}
+    for line_number, tokens in directives:
+        if tokens[0].lower() == PARAM_DIRECTIVE:
+            definitions.update(parse_param_directive(tokens, line_number))
+    return definitions
+
+
+def resolve_parameters(
+    definitions: Mapping[str, str], overrides: Optional[Mapping[str, Value]] = None
+) -> Dict[str, Value]:
+    """Evaluates every parameter, in dependency order
+
+    Parameters:
+        definitions (Mapping[str, str]): the expression of every parameter
+        overrides (Optional[Mapping[str, Value]]): values replacing the definitions
+            (e.g. the swept parameters, as arrays over the sweep points)
+
+    Raises:
+        errors.ParameterError: when the definitions are circular or read undefined names
+
+    Returns:
+        Dict[str, Value]: the value of every defined and overridden parameter
+    """
+    values: Dict[str, Value] = dict(overrides or {})
+    resolving: Set[str] = set()
+
+    def resolve(name: str) -> Value:
+        if name in values:
+            return values[name]
+        if name not in definitions:
+            raise errors.ParameterError(name, "it is not defined by a .param directive")
+        if name in resolving:
+            raise errors.ParameterError(name, "its definition is circular")
+        resolving.add(name)
+        expression = definitions[name]
+        dependencies = expression_names(expression)
+        values[name] = evaluate(
+            expression, {dependency: resolve(dependency) for dependency in dependencies}
+        )
+        resolving.discard(name)
+        return values[name]
+
+    for name in definitions:
+        resolve(name)
+    return values
+
+
+class Sweep(NamedTuple):
+    """The values taken by a parameter or an element value over a sweep
+
+    Attributes
+        name: the name of the parameter, or the tag of the element
+        values: the swept values, in sweep order
+        is_parameter: whether `name` is a parameter (.step param) or an element (.dc, .step)
+    """
+
+    name: str
+    values: np.ndarray
+    is_parameter: bool
+
+
+def sweep_values(mode: str, numbers: List[float], name: str = "") -> np.ndarray:
+    """Returns the points of a linear, per decade, per octave or listed sweep
+
+    Parameters:
+        mode (str): one of SWEEP_MODES
+        numbers (List[float]): start, stop and increment (lin) or points per decade /
+            octave (dec, oct), or the listed values
+
+    Raises:
+        errors.ParameterError: when the sweep is empty or never reaches its stop
+    """
+    if mode == "list":
+        if not numbers:
+            raise errors.ParameterError(name, "the list sweep has no values")
+        return np.asarray(numbers, dtype=np.float64)
+    if len(numbers) != 3:
+        raise errors.ParameterError(name, f"a {mode} sweep needs <start> <stop> <increment>")
+    start, stop, increment = numbers
+    if mode == "lin":
+        if increment == 0 or (stop - start) * increment < 0:
+            raise errors.ParameterError(name, f"{increment} never steps from {start} to {stop}")
+        count = int(np.floor((stop - start) / increment + 1e-9)) + 1
+        return start + increment * np.arange(count)
+    base = 10.0 if mode == "dec" else 2.0
+    if start <= 0 or stop < start or increment < 1:
+        raise errors.ParameterError(name, f"a {mode} sweep needs 0 < start <= stop and points >= 1")
+    count = int(np.floor(increment * np.log(stop / start) / np.log(base) + 1e-9)) + 1
+    return start * base ** (np.arange(count) / increment)
+
+
+def _parse_sweep(tokens: List[str], line_number: int, parameter: bool) -> Tuple[Sweep, int]:
+    """Parses one `[lin|dec|oct] [param] <name> <start> <stop> <increment>` or
+    `[param] <name> list <value>...` sweep, returning it and the tokens it used"""
+    line = " ".join(tokens)
+    position = 0
+    mode = "lin"
+    if position < len(tokens) and tokens[position].lower() in SWEEP_MODES[:3]:
+        mode = tokens[position].lower()
+        position += 1
+    if position < len(tokens) and tokens[position].lower() == "param":
+        parameter = True
+        position += 1
+    if position >= len(tokens):
+        raise errors.NetlistSyntaxError(line_number, line, "expected the swept name")
+    name = tokens[position]
+    position += 1
+    if position < len(tokens) and tokens[position].lower() == "list":
+        mode, numbers = "list", tokens[position + 1 :]
+        position = len(tokens)
+    else:
+        numbers = tokens[position : position + 3]
+        position += 3
+    try:
+        numbers = [float(convert_value(number)) for number in numbers]
+    except errors.ValueConversionError as e:
+        raise errors.NetlistSyntaxError(line_number, line, str(e))
+    return Sweep(name, sweep_values(mode, numbers, name), parameter), position
+
+
+def parse_sweep_directives(directives: Iterable[Tuple[int, List[str]]]) -> List[Sweep]:
+    """Collects the sweeps of the .step and .dc directive lines of a Netlist
+
+    `.step [lin|dec|oct] param <name> <start> <stop> <increment>`, `.step param <name>
+    list <value>...` and `.step <element> ...` sweep a parameter or an element value;
+    `.dc [lin|dec|oct] <source> <start> <stop> <increment> [<source> ...]` sweeps source
+    values. The sweeps are nested in order, the first one varying fastest.
+    """
+    sweeps = []
+    for line_number, tokens in directives:
+        directive = tokens[0].lower()
+        if directive == STEP_DIRECTIVE:
+            sweeps.append(_parse_sweep(tokens[1:], line_number, parameter=False)[0])
+        elif directive == DC_DIRECTIVE:
+            remaining = tokens[1:]
+            while remaining:
+                sweep, used = _parse_sweep(remaining, line_number, parameter=False)
+                sweeps.append(sweep)
+                remaining = remaining[used:]
+    names = [sweep.name for sweep in sweeps]
+    if len(set(names)) != len(names):
+        raise errors.ParameterError(names, "a name is swept by more than one directive")
+    return sweeps
+
+
+def nominal_parameters(directives: List[Tuple[int, List[str]]]) -> Dict[str, Value]:
+    """Evaluates the parameters of a Netlist at their nominal values: their .param
+    definition, or the first value of their .step when no .param defines them"""
+    definitions = parameter_definitions(directives)
+    defaults = {
+        sweep.name: float(sweep.values[0])
+        for sweep in parse_sweep_directives(directives)
+        if sweep.is_parameter and sweep.name not in definitions
+    }
+    return resolve_parameters(definitions, defaults)
+
+
+def resolve_records(
+    records: List[ElementRecord], directives: List[Tuple[int, List[str]]]
+) -> List[ElementRecord]:
+    """Replaces the {...} values of element records by their value at the nominal parameters
+
+    Parameters:
+        records (List[ElementRecord]): the element records, some with expression values
+        directives (List[Tuple[int, List[str]]]): the (line_number, tokens) of the
+            directive lines
+
+    Returns:
+        List[ElementRecord]: the records with literal values
+    """
+    if not any(is_expression(record.value) for record in records):
+        return records
+    parameters = nominal_parameters(directives)
+    return [
+        record._replace(value=repr(float(evaluate(record.value, parameters))))
+        if is_expression(record.value)
+        else record
+        for record in records
+    ]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Tuple
+from src import errors
+from src.solver import MNAFactorization, MNASystem
+import numpy as np
+
+
+# below this number of distinct port nodes, their transfer impedances are solved at once
+MAX_TRANSFER_NODES = 4096
+# the number of right hand sides solved together, bounds the dense solution blocks
+SOLVE_BLOCK_SIZE = 256
+
+
+class PortEquivalents:
+    """ The Thévenin and Norton equivalents of a circuit seen from node pairs
+
+    A port (a, b) is equivalent to a voltage source `voltage` in series with
+    `resistance`, or to a current source `current` in parallel with `resistance`:
+    `voltage` is the open circuit voltage V(a) - V(b), `resistance` the resistance
+    between a and b once the voltage sources are shorted and the current sources
+    opened, and `current` the short circuit current, from a to b through the short
+    (infinite when an ideal voltage source sits across the port).
+
+    Attributes
+        pairs: the (a, b) node pair of every port, (ports, 2)
+        voltage: the Thévenin voltage of every port
+        resistance: the Thévenin (Norton) resistance of every port
+        current: the Norton current of every port
+    """
+
+    def __init__(self, pairs: np.ndarray, voltage: np.ndarray, resistance: np.ndarray):
+        self.pairs = pairs
+        self.voltage = voltage
+        self.resistance = resistance
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.current = voltage / resistance
+        self._ports: Dict[Tuple[int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def get_equivalent(self, start_node: int, end_node: int) -> Tuple[float, float]:
+        """Returns the Thévenin voltage and resistance of a port
+
+        Raises:
+            KeyError: when the pair was not computed
+        """
+        if not self._ports:
+            self._ports = {pair: port for port, pair in enumerate(map(tuple, self.pairs.tolist()))}
+        port = self._ports[(start_node, end_node)]
+        return float(self.voltage[port]), float(self.resistance[port])
+
+
+def _solve_columns(factorization: MNAFactorization, rhs: np.ndarray) -> np.ndarray:
+    x = factorization.solve(rhs)
+    if not np.all(np.isfinite(x)):
+        raise errors.SingularCircuitError("the MNA matrix is numerically singular")
+    return x
+
+
+def _transfer_resistance(
+    factorization: MNAFactorization, size: int, rows: np.ndarray
+) -> np.ndarray:
+    """Solves a unit injection at every distinct port node and combines the transfer
+    impedances Z into R(a, b) = Z_aa + Z_bb - Z_ab - Z_ba"""
+    nodes, position = np.unique(rows, return_inverse=True)
+    position = position.reshape(rows.shape)
+    grounded = nodes < 0
+    solved = np.flatnonzero(~grounded)
+    # the ground has a zero row and column
+    transfer = np.zeros((len(nodes), len(nodes)))
+    for begin in range(0, len(solved), SOLVE_BLOCK_SIZE):
+        block = solved[begin : begin + SOLVE_BLOCK_SIZE]
+        rhs = np.zeros((size, len(block)))
+        rhs[nodes[block], np.arange(len(block))] = 1.0
+        transfer[np.ix_(solved, block)] = _solve_columns(factorization, rhs)[nodes[solved]]
+    a, b = position[:, 0], position[:, 1]
+    return transfer[a, a] + transfer[b, b] - transfer[a, b] - transfer[b, a]
+
+
+def _pair_resistance(factorization: MNAFactorization, size: int, rows: np.ndarray) -> np.ndarray:
+    """Solves a unit current from b to a for every port, in blocks of right hand sides"""
+    resistance = np.empty(len(rows))
+    for begin in range(0, len(rows), SOLVE_BLOCK_SIZE):
+        block = rows[begin : begin + SOLVE_BLOCK_SIZE]
+        columns = np.arange(len(block))
+        rhs = np.zeros((size + 1, len(block)))
+        # the ground row (index -1) is the extra last row, dropped before solving
+        np.add.at(rhs, (block[:, 0], columns), 1.0)
+        np.add.at(rhs, (block[:, 1], columns), -1.0)
+        x = np.vstack((_solve_columns(factorization, rhs[:-1]), np.zeros((1, len(block)))))
+        resistance[begin : begin + len(block)] = x[block[:, 0], columns] - x[block[:, 1], columns]
+    return resistance
+
+
+def port_equivalents(system: MNASystem, pairs: Iterable[Tuple[int, int]]) -> PortEquivalents:
+    """Computes the Thévenin/Norton equivalents of many ports with one factorization
+
+    The open circuit voltages come from the operating point. The resistances are
+    the responses to unit currents injected in the circuit with its sources turned
+    off, which is the same MNA matrix with another right hand side: all of them are
+    solved with the factorization of the operating point, either one right hand side
+    per distinct port node (the transfer impedances between the port nodes, when the
+    ports share nodes) or one per port.
+
+    Parameters:
+        system (MNASystem): the MNA system of the circuit
+        pairs (Iterable[Tuple[int, int]]): the (a, b) node pairs of the ports
+
+    Raises:
+        KeyError: when a node of a port is not part of the circuit
+        errors.SingularCircuitError: when the circuit has no unique solution
+
+    Returns:
+        PortEquivalents: the equivalent of every port, in the order of `pairs`
+    """
+    pairs = np.asarray(list(pairs) if not isinstance(pairs, np.ndarray) else pairs, dtype=np.int64)
+    pairs = pairs.reshape(-1, 2)
+    rows = system.node_index(pairs)
+    x = system.solve_rhs(system.rhs)
+    voltages = np.append(system.pattern.node_voltages(x), 0.0)
+    voltage = voltages[rows[:, 0]] - voltages[rows[:, 1]]
+
+    factorization = system.factorize()
+    distinct = len(np.unique(rows))
+    if distinct <= MAX_TRANSFER_NODES and distinct < len(rows):
+        resistance = _transfer_resistance(factorization, system.size, rows)
+    else:
+        resistance = _pair_resistance(factorization, system.size, rows)
+    return PortEquivalents(pairs, voltage, resistance)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+import tracemalloc
+
+
+class StageEvent(NamedTuple):
+    """One timed run of an instrumented stage, as passed to the profiler hooks
+
+    Attributes
+        stage: the name of the stage (parse, convert_value, reduce, ...)
+        wall_time: the duration of the run in seconds
+        elements: the number of elements processed by the run (0 if unknown)
+        peak_bytes: the peak of the memory allocated during the run, 0 when
+            allocations are not traced
+        depth: the number of enclosing stages
+    """
+
+    stage: str
+    wall_time: float
+    elements: int
+    peak_bytes: int
+    depth: int
+
+
+class StageStats:
+    """ The accumulated runs of one stage
+
+    Attributes
+        calls: the number of runs
+        wall_time: the total duration in seconds
+        max_wall_time: the longest run in seconds
+        elements: the total number of elements processed
+        peak_bytes: the largest allocation peak of a run
+    """
+
+    __slots__ = ("calls", "wall_time", "max_wall_time", "elements", "peak_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_time = 0.0
+        self.max_wall_time = 0.0
+        self.elements = 0
+        self.peak_bytes = 0
+
+    def add(self, event: StageEvent):
+        self.calls += 1
+        self.wall_time += event.wall_time
+        self.max_wall_time = max(self.max_wall_time, event.wall_time)
+        self.elements += event.elements
+        self.peak_bytes = max(self.peak_bytes, event.peak_bytes)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ProfileReport:
+    """ The statistics of every stage recorded by a Profiler
+
+    Attributes
+        stages: the statistics by stage name, in the order the stages first ran
+    """
+
+    def __init__(self, stages: Dict[str, StageStats]):
+        self.stages = stages
+
+    def __getitem__(self, stage: str) -> StageStats:
+        return self.stages[stage]
+
+    def __contains__(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Returns the statistics as plain dicts (e.g. to serialize them to JSON)"""
+        return {stage: stats.as_dict() for stage, stats in self.stages.items()}
+
+    def __str__(self) -> str:
+        lines = [
+            f"{'stage':<24}{'calls':>10}{'total ms':>12}{'max ms':>10}{'elements':>12}{'peak KiB':>10}"
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(
+                f"{stage:<24}{stats.calls:>10}{stats.wall_time * 1e3:>12.3f}"
+                f"{stats.max_wall_time * 1e3:>10.3f}{stats.elements:>12}"
+                f"{stats.peak_bytes / 1024:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+class _Stage:
+    """The context of one run of a stage, `elements` may be set while it runs"""
+
+    __slots__ = ("profiler", "name", "elements", "_start", "_start_memory", "_children_peak")
+
+    def __init__(self, profiler: Optional[Profiler], name: str, elements: int):
+        self.profiler = profiler
+        self.name = name
+        self.elements = elements
+
+    def __enter__(self) -> _Stage:
+        if self.profiler is not None:
+            self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler is not None:
+            self.profiler._exit(self)
+
+
+_NULL_STAGE = _Stage(None, "", 0)
+_active_profiler: ContextVar[Optional[Profiler]] = ContextVar("active_profiler", default=None)
+_counters: Dict[str, Callable[[], int]] = {}
+
+
+def register_counter(name: str, read: Callable[[], int]):
+    """Registers a call counter, for functions too hot to be wrapped as stages
+
+    The profiler reports the increase of the counter while it was active as the
+    calls of a stage without timing.
+
+    Parameters:
+        name (str): the name of the stage
+        read (Callable[[], int]): returns the current (monotonic) count
+    """
+    _counters[name] = read
+
+
+class Profiler:
+    """ Records the wall time, calls, elements and allocation peaks of the stages
+
+    Profiling is opt-in: the instrumented functions only look up the active
+    profiler (a context variable) and call straight through when there is none,
+    and the hottest functions are not wrapped at all but report the counters they
+    already keep (see register_counter). Stages run in worker processes are not
+    recorded.
+
+        with Profiler(trace_allocations=True) as profiler:
+            Netlist.parse(path).get_explanation()
+        print(profiler.report())
+
+    Attributes
+        trace_allocations: whether to record allocation peaks with tracemalloc (slow)
+        hooks: the callables called with a StageEvent after every run of a stage
+    """
+
+    def __init__(
+        self,
+        trace_allocations: bool = False,
+        hooks: Optional[List[Callable[[StageEvent], None]]] = None,
+    ):
+        self.trace_allocations = trace_allocations
+        self.hooks = list(hooks or [])
+        self._stats: Dict[str, StageStats] = {}
+        self._stack: List[_Stage] = []
+        self._token = None
+        self._started_tracing = False
+        self._counter_start: Dict[str, int] = {}
+        self._counter_calls: Dict[str, int] = {}
+
+    def add_hook(self, hook: Callable[[StageEvent], None]):
+        self.hooks.append(hook)
+
+    def __enter__(self) -> Profiler:
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._counter_start = {name: read() for name, read in _counters.items()}
+        self._token = _active_profiler.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_profiler.reset(self._token)
+        self._token = None
+        self._counter_calls = self._read_counters()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def stage(self, name: str, elements: int = 0) -> _Stage:
+        """Returns the context of one run of a stage"""
+        return _Stage(self, name, elements)
+
+    def _enter(self, stage: _Stage):
+        stage._children_peak = 0
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent._children_peak = max(parent._children_peak, peak)
+            tracemalloc.reset_peak()
+            stage._start_memory = current
+        self._stack.append(stage)
+        stage._start = perf_counter()
+
+    def _exit(self, stage: _Stage):
+        wall_time = perf_counter() - stage._start
+        self._stack.pop()
+        peak_bytes = 0
+        if self.trace_allocations:
+            peak = max(tracemalloc.get_traced_memory()[1], stage._children_peak)
+            peak_bytes = max(peak - stage._start_memory, 0)
+            if self._stack:
+                parent = self._stack[-1]
+                parent._children_peak = max(parent._children_peak, peak)
+        event = StageEvent(stage.name, wall_time, stage.elements, peak_bytes, len(self._stack))
+        stats = self._stats.get(stage.name)
+        if stats is None:
+            stats = self._stats[stage.name] = StageStats()
+        stats.add(event)
+        for hook in self.hooks:
+            hook(event)
+
+    def _read_counters(self) -> Dict[str, int]:
+        return {
+            name: _counters[name]() - start for name, start in self._counter_start.items()
+        }
+
+    def report(self) -> ProfileReport:
+        """Returns the statistics recorded so far"""
+        stages = dict(self._stats)
+        # while the profiler is active, the counters are read live
+        counts = self._read_counters() if self._token is not None else self._counter_calls
+        for name, calls in counts.items():
+            if calls:
+                stages.setdefault(name, StageStats()).calls += calls
+        return ProfileReport(stages)
+
+
+def active_profiler() -> Optional[Profiler]:
+    """Returns the profiler recording the current context, if any"""
+    return _active_profiler.get()
+
+
+def stage(name: str, elements: int = 0) -> _Stage:
+    """Returns the context of one run of a stage, a no-op when profiling is disabled
+
+        with profiling.stage("assemble", elements=len(element_table)):
+            ...
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name, elements)
+
+
+def instrumented(name: str, elements: Optional[Callable] = None):
+    """Decorates a function as a profiled stage
+
+    Parameters:
+        name (str): the name of the stage
+        elements (Optional[Callable]): returns the number of elements processed,
+            from the result of the function
+    """
+
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return function(*args, **kwargs)
+            with _Stage(profiler, name, 0) as run:
+                result = function(*args, **kwargs)
+                if elements is not None:
+                    run.elements = elements(result)
+            return result
+
+        return wrapper
+
+    return decorate
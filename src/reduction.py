@@ -0,0 +1,457 @@
+from __future__ import annotations
+from collections import deque
+from heapq import heappop, heappush
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.components import Resistor
+from src.elementtable import CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.steplog import DELTA_WYE, PARALLEL, SERIES, WYE_DELTA, StepLog
+import numpy as np
+
+
+# the transformations merging no edge applied in a row without lowering the number of
+# edges, after which they stop
+ZERO_GAIN_STALL = 16
+# above this degree the triangles of a node are only found from their other corners
+MAX_TRIANGLE_DEGREE = 16
+
+
+def _pair(node_a: int, node_b: int) -> Tuple[int, int]:
+    return (node_a, node_b) if node_a < node_b else (node_b, node_a)
+
+
+class ReductionEngine:
+    """ A series/parallel and star/delta reducer working on one mutable resistor multigraph
+
+    Every node tracks its incident edges (its degree) and every node pair tracks its
+    bundle of parallel edges. Reducible parallel bundles and degree-2 nodes are kept
+    in work queues, so each reduction step is O(1) and the whole collapse is O(n).
+
+    When series/parallel steps are exhausted (e.g. on a bridge), star (Y) to delta
+    (Δ) and delta to star transformations are tried, best first: a transformation
+    replaces three edges by three others, some of which are merged right away, by a
+    parallel step when a delta edge doubles an existing edge, by a series step when
+    a node is left with two edges. The transformation merging the most edges is
+    applied, then series/parallel steps run again, so every transformation lowers
+    the number of edges and the reduction terminates.
+
+    With `zero_gain`, when no transformation merges an edge, one that merges none is
+    applied, the closest to a terminal first: it keeps the number of edges but lets
+    merges resume from the terminals inwards, e.g. on chains of stars and deltas. Such
+    a step never undoes the transformation that created its three edges, and they
+    stop after ZERO_GAIN_STALL of them in a row did not lower the number of edges, so
+    meshes (grids) that they cannot reduce are not reshuffled for long.
+
+    Attributes
+        terminals: the nodes that must not be reduced away (e.g. the source nodes)
+        transformations: whether star/delta transformations are applied
+        zero_gain: whether transformations merging no edge are applied too
+        step_log: the compact log of the steps, None when steps are not recorded
+    """
+
+    def __init__(
+        self,
+        start_nodes: Iterable[int],
+        end_nodes: Iterable[int],
+        values: Iterable[float],
+        terminals: Optional[Iterable[int]] = None,
+        record_steps: bool = True,
+        transformations: bool = True,
+        zero_gain: bool = False,
+    ):
+        self.terminals: Set[int] = set(terminals or ())
+        self.record_steps = record_steps
+        self.transformations = transformations
+        self.zero_gain = zero_gain
+
+        self._start: List[int] = []
+        self._end: List[int] = []
+        self._value: List[float] = []
+        self.step_log = StepLog(self._start, self._end, self._value) if record_steps else None
+        self._alive: List[bool] = []
+        self._edge_count = 0
+        # the transformation that created every edge, 0 before the first one
+        self._origin: List[int] = []
+        self._transformation_count = 0
+        # the distance of the nodes to the terminals, ranking zero-gain transformations
+        self._distance: Dict[int, int] = {}
+        self._zero_gain_stall = 0
+        self._incident: Dict[int, Set[int]] = {}
+        self._bundles: Dict[Tuple[int, int], Set[int]] = {}
+
+        self._parallel_queue = deque()
+        self._node_queue = deque()
+        # the candidate transformations by decreasing number of merged edges
+        self._transformation_heap: List[
+            Tuple[Tuple[int, int, int, int], int, Tuple[int, ...]]
+        ] = []
+
+        for start_node, end_node, value in zip(start_nodes, end_nodes, values):
+            self._add_edge(int(start_node), int(end_node), float(value))
+        self._next_node = max(self._incident, default=0) + 1
+
+    @classmethod
+    def from_table(
+        cls,
+        element_table: ElementTable,
+        terminals: Optional[Iterable[int]] = None,
+        record_steps: bool = True,
+        transformations: bool = True,
+        zero_gain: bool = False,
+    ) -> ReductionEngine:
+        """Builds the resistor multigraph of an element table
+
+        Parameters:
+            element_table (ElementTable): the elements of the circuit
+            terminals (Optional[Iterable[int]]): the nodes to keep, defaults to the
+                nodes of the voltage and current sources
+            record_steps (bool): whether to record the step trace
+            transformations (bool): whether to apply star/delta transformations
+            zero_gain (bool): whether to apply transformations merging no edge too,
+                slower but needed by chains of stars and deltas
+
+        Returns:
+            ReductionEngine: the (not yet reduced) engine
+        """
+        resistors = element_table.indices(RESISTOR)
+        if terminals is None:
+            sources = np.flatnonzero(
+                (element_table.kind == VOLTAGE_SOURCE) | (element_table.kind == CURRENT_SOURCE)
+            )
+            terminals = np.concatenate(
+                (element_table.start_node[sources], element_table.end_node[sources])
+            ).tolist()
+        return cls(
+            element_table.start_node[resistors].tolist(),
+            element_table.end_node[resistors].tolist(),
+            element_table.value[resistors].tolist(),
+            terminals=terminals,
+            record_steps=record_steps,
+            transformations=transformations,
+            zero_gain=zero_gain,
+        )
+
+    @classmethod
+    def from_netlist(
+        cls,
+        netlist,
+        terminals=None,
+        record_steps: bool = True,
+        transformations: bool = True,
+        zero_gain: bool = False,
+    ) -> ReductionEngine:
+        return cls.from_table(
+            netlist.element_table,
+            terminals=terminals,
+            record_steps=record_steps,
+            transformations=transformations,
+            zero_gain=zero_gain,
+        )
+
+    def _add_edge(self, start_node: int, end_node: int, value: float) -> int:
+        edge = len(self._value)
+        self._start.append(start_node)
+        self._end.append(end_node)
+        self._value.append(value)
+        self._alive.append(True)
+        self._edge_count += 1
+        self._origin.append(self._transformation_count)
+        self._incident.setdefault(start_node, set()).add(edge)
+        self._incident.setdefault(end_node, set()).add(edge)
+        bundle = self._bundles.setdefault(_pair(start_node, end_node), set())
+        bundle.add(edge)
+        if len(bundle) == 2:
+            self._parallel_queue.append(_pair(start_node, end_node))
+        self._node_queue.append(start_node)
+        self._node_queue.append(end_node)
+        return edge
+
+    def _remove_edge(self, edge: int):
+        start_node, end_node = self._start[edge], self._end[edge]
+        self._alive[edge] = False
+        self._edge_count -= 1
+        self._incident[start_node].discard(edge)
+        self._incident[end_node].discard(edge)
+        pair = _pair(start_node, end_node)
+        self._bundles[pair].discard(edge)
+        if not self._bundles[pair]:
+            del self._bundles[pair]
+        self._node_queue.append(start_node)
+        self._node_queue.append(end_node)
+
+    def _other_node(self, edge: int, node: int) -> int:
+        return self._end[edge] if self._start[edge] == node else self._start[edge]
+
+    def _resistor(self, edge: int) -> Resistor:
+        return Resistor(self._value[edge], self._start[edge], self._end[edge])
+
+    def degree(self, node: int) -> int:
+        return len(self._incident.get(node, ()))
+
+    def _collapse_parallel(self, pair: Tuple[int, int]):
+        edges = sorted(self._bundles.get(pair, ()))
+        if len(edges) < 2:
+            return
+        values = [self._value[edge] for edge in edges]
+        # a 0 Ω edge shorts the whole bundle
+        value = 0.0 if 0 in values else 1 / sum(1 / value for value in values)
+        for edge in edges:
+            self._remove_edge(edge)
+        merged = self._add_edge(pair[0], pair[1], value)
+        if self.record_steps:
+            self.step_log.record(PARALLEL, edges, (merged,))
+
+    def _collapse_node(self, node: int):
+        if node in self.terminals:
+            return
+        edges = sorted(self._incident.get(node, ()))
+        if len(edges) == 1 and self.terminals:
+            self._remove_edge(edges[0])
+        elif len(edges) == 2:
+            first, second = edges
+            node_a, node_b = self._other_node(first, node), self._other_node(second, node)
+            if node_a == node_b:
+                return
+            value = self._value[first] + self._value[second]
+            self._remove_edge(first)
+            self._remove_edge(second)
+            merged = self._add_edge(node_a, node_b, value)
+            if self.record_steps:
+                self.step_log.record(SERIES, edges, (merged,))
+
+    def _wye(self, node: int) -> Optional[Tuple[List[int], List[int]]]:
+        """Returns the edges and far nodes of a star centred on a node, None if it is not one"""
+        if node in self.terminals:
+            return None
+        edges = self._incident.get(node, ())
+        if len(edges) != 3:
+            return None
+        edges = sorted(edges)
+        ends = [self._other_node(edge, node) for edge in edges]
+        if len(set(ends)) != 3 or any(self._value[edge] == 0 for edge in edges):
+            return None
+        return edges, ends
+
+    def _wye_delta_gain(self, node: int) -> Optional[int]:
+        """The number of edges a Y-Δ would merge: delta edges doubling existing edges,
+        and far nodes left with two edges"""
+        wye = self._wye(node)
+        if wye is None:
+            return None
+        ends = wye[1]
+        doubled = [
+            [_pair(x, y) in self._bundles for y in ends if y != x] for x in ends
+        ]
+        gain = sum(map(sum, doubled)) // 2
+        for x, existing in zip(ends, doubled):
+            # x loses its star edge and gains the delta edges that are not doubles
+            if x not in self.terminals and self.degree(x) + 1 - sum(existing) == 2:
+                gain += 1
+        return gain
+
+    def _delta(self, nodes: Tuple[int, int, int]) -> Optional[List[int]]:
+        """Returns the edges (ab, bc, ca) of a triangle of single edges, None if it is not one"""
+        a, b, c = nodes
+        edges = []
+        for pair in (_pair(a, b), _pair(b, c), _pair(c, a)):
+            bundle = self._bundles.get(pair)
+            if bundle is None or len(bundle) != 1:
+                return None
+            edges.append(next(iter(bundle)))
+        if any(self._value[edge] == 0 for edge in edges):
+            return None
+        return edges
+
+    def _delta_wye_gain(self, nodes: Tuple[int, int, int]) -> Optional[int]:
+        """The number of corners that would be left with two edges"""
+        if self._delta(nodes) is None:
+            return None
+        return sum(node not in self.terminals and self.degree(node) == 3 for node in nodes)
+
+    def _undoes(self, edges: List[int]) -> bool:
+        """Whether the edges were all created by one transformation, which a
+        transformation of these edges would undo"""
+        origins = {self._origin[edge] for edge in edges}
+        return len(origins) == 1 and next(iter(origins)) > 0
+
+    def _zero_gain_allowed(self) -> bool:
+        return self.zero_gain and self._zero_gain_stall < ZERO_GAIN_STALL
+
+    def _priority(
+        self, operation: int, nodes: Tuple[int, ...]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """Ranks a transformation by the edges it merges, then by the degrees of the
+        nodes it connects (the fill it may cause), None when it is not applicable
+
+        Zero-gain transformations are ranked by the distance of their nodes to the
+        terminals first, then Y-Δ before Δ-Y.
+        """
+        if operation == WYE_DELTA:
+            gain = self._wye_delta_gain(nodes[0])
+            if gain is None:
+                return None
+            edges, ends = self._wye(nodes[0])
+            if gain:
+                return -gain, 0, 0, sum(self.degree(end) for end in ends)
+        else:
+            gain = self._delta_wye_gain(nodes)
+            if gain is None:
+                return None
+            edges, ends = self._delta(nodes), nodes
+            if gain:
+                return -gain, 0, 0, 0
+        if not self._zero_gain_allowed() or self._undoes(edges):
+            return None
+        distance = min(self._distance.get(node, 0) for node in nodes)
+        rank = 0 if operation == WYE_DELTA else 1
+        return 0, distance, rank, sum(self.degree(end) for end in ends)
+
+    def _measure_distances(self):
+        """Numbers the nodes by their distance to the closest terminal (breadth first)"""
+        self._distance = {terminal: 0 for terminal in self.terminals}
+        queue = deque(self.terminals)
+        while queue:
+            node = queue.popleft()
+            for edge in self._incident.get(node, ()):
+                other = self._other_node(edge, node)
+                if other not in self._distance:
+                    self._distance[other] = self._distance[node] + 1
+                    queue.append(other)
+
+    def _push_transformations(self, node: int):
+        wye = self._wye(node)
+        candidates = [] if wye is None else [(WYE_DELTA, (node,))]
+        if self.zero_gain:
+            # any triangle may take a zero-gain Δ-Y, not only those of a star
+            ends = sorted(
+                {self._other_node(edge, node) for edge in self._incident.get(node, ())}
+            )
+            if len(ends) > MAX_TRIANGLE_DEGREE:
+                ends = []
+        else:
+            ends = [] if wye is None else sorted(wye[1])
+        for position, x in enumerate(ends):
+            for y in ends[position + 1 :]:
+                if _pair(x, y) in self._bundles:
+                    candidates.append((DELTA_WYE, tuple(sorted((node, x, y)))))
+        for operation, nodes in candidates:
+            priority = self._priority(operation, nodes)
+            if priority is not None:
+                heappush(self._transformation_heap, (priority, operation, nodes))
+
+    def _wye_delta(self, node: int):
+        edges, (a, b, c) = self._wye(node)
+        r_a, r_b, r_c = (self._value[edge] for edge in edges)
+        products = r_a * r_b + r_b * r_c + r_c * r_a
+        for edge in edges:
+            self._remove_edge(edge)
+        created = (
+            self._add_edge(a, b, products / r_c),
+            self._add_edge(b, c, products / r_a),
+            self._add_edge(c, a, products / r_b),
+        )
+        if self.record_steps:
+            self.step_log.record(WYE_DELTA, edges, created)
+
+    def _delta_wye(self, nodes: Tuple[int, int, int]):
+        a, b, c = nodes
+        edges = self._delta(nodes)
+        r_ab, r_bc, r_ca = (self._value[edge] for edge in edges)
+        total = r_ab + r_bc + r_ca
+        centre = self._next_node
+        self._next_node += 1
+        self._distance[centre] = min(self._distance.get(node, 0) for node in nodes)
+        for edge in edges:
+            self._remove_edge(edge)
+        created = (
+            self._add_edge(a, centre, r_ab * r_ca / total),
+            self._add_edge(b, centre, r_ab * r_bc / total),
+            self._add_edge(c, centre, r_bc * r_ca / total),
+        )
+        if self.record_steps:
+            self.step_log.record(DELTA_WYE, edges, created)
+
+    def _collapse_series_parallel(self, visited: Optional[Set[int]] = None):
+        while self._parallel_queue or self._node_queue:
+            if self._parallel_queue:
+                self._collapse_parallel(self._parallel_queue.popleft())
+            else:
+                node = self._node_queue.popleft()
+                if visited is not None:
+                    visited.add(node)
+                self._collapse_node(node)
+
+    def reduce(self) -> ReductionEngine:
+        """Collapses every parallel bundle and every non-terminal degree-2 node, then
+        applies star/delta transformations while they merge edges (or, with
+        `zero_gain`, until those merging no edge stall)
+
+        Dangling (degree-1) non-terminal nodes carry no current and are removed when
+        terminals are given. Transformations need terminals too.
+
+        Returns:
+            ReductionEngine: the reduced engine
+        """
+        self._collapse_series_parallel()
+        if not (self.transformations and self.terminals):
+            return self
+        if self.zero_gain:
+            self._measure_distances()
+        for node in list(self._incident):
+            self._push_transformations(node)
+        heap = self._transformation_heap
+        while heap:
+            priority, operation, nodes = heappop(heap)
+            current = self._priority(operation, nodes)
+            if current is None:
+                continue
+            if current != priority:
+                # stale priority, the candidate is retried with its current one
+                heappush(heap, (current, operation, nodes))
+                continue
+            edge_count = self._edge_count
+            self._transformation_count += 1
+            if operation == WYE_DELTA:
+                self._wye_delta(nodes[0])
+            else:
+                self._delta_wye(nodes)
+            visited: Set[int] = set()
+            self._collapse_series_parallel(visited)
+            if self._edge_count < edge_count:
+                self._zero_gain_stall = 0
+            else:
+                self._zero_gain_stall += 1
+            # the ranks of the changed nodes and of their neighbours may have changed
+            changed = set(visited)
+            for node in visited:
+                for edge in self._incident.get(node, ()):
+                    changed.add(self._other_node(edge, node))
+            for node in changed:
+                self._push_transformations(node)
+        return self
+
+    @property
+    def steps(self) -> List[dict]:
+        """The steps in the explanatory_parts format of a Netlist, materialized on access"""
+        return list(self.step_log.iter_parts()) if self.step_log is not None else []
+
+    def get_resistors(self) -> List[Resistor]:
+        """Returns the remaining (equivalent) resistors
+
+        Returns:
+            List[Resistor]: a resistor for every edge left in the multigraph
+        """
+        return [self._resistor(edge) for edge, alive in enumerate(self._alive) if alive]
+
+    def edge_count(self) -> int:
+        return self._edge_count
+
+    def effective_resistance(self, node_a: int, node_b: int) -> Optional[float]:
+        """Returns the resistance between two nodes once they are joined by a single edge
+
+        Returns:
+            Optional[float]: the equivalent resistance, None if not fully reduced
+        """
+        edges = self._bundles.get(_pair(node_a, node_b), ())
+        if self.edge_count() != 1 or len(edges) != 1:
+            return None
+        return self._value[next(iter(edges))]
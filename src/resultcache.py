@@ -0,0 +1,315 @@
+from __future__ import annotations
+from hashlib import blake2b
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from src import errors
+from src.elementtable import ElementTable
+from src.netlistbinary import read_binary_netlist, write_binary_netlist
+from src.netlistparser import Netlist
+from src.netlistreader import iter_logical_lines
+from src.solver import DCSolution, MNASystem
+from src.steplog import StepLog
+import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+
+
+# bumped when the format of the entries changes, old entries then never match
+CACHE_VERSION = 2
+DEFAULT_DIRECTORY = Path(
+    os.environ.get("CIRCUIT_SOLVER_CACHE", Path.home() / ".cache" / "circuit_solver")
+)
+DEFAULT_MAX_BYTES = 1 << 30
+# an eviction frees entries until the cache is below this fraction of max_bytes
+EVICTION_TARGET = 0.8
+TEMPORARY_PREFIX = ".tmp-"
+# temporary files older than this were left by a crashed writer, evictions delete them
+STALE_TEMPORARY_SECONDS = 3600
+
+
+def content_key(lines: Iterable[str], has_title: bool = True) -> str:
+    """Returns a digest of the content of a Netlist, independent of the element order,
+    the whitespace, the comments and the title
+
+    The logical lines (continuations joined, see netlistreader.iter_logical_lines) are
+    normalized to single spaces. The element lines are sorted, the top level lines
+    together and the lines of every subcircuit within their .subckt/.ends block; the
+    directives keep their order, which matters (a later .param redefinition wins, the
+    .step/.dc order nests the sweeps).
+
+    Parameters:
+        lines (Iterable[str]): the physical lines of the Netlist (e.g. an open file)
+        has_title (bool): whether the first line is a title line (SPICE convention)
+
+    Returns:
+        str: the hexadecimal content key
+    """
+    top_level: List[str] = []
+    directives: List[str] = []
+    blocks: List[str] = []
+    block: Optional[List[str]] = None
+    for _, tokens in iter_logical_lines(lines, has_title=has_title):
+        line = " ".join(tokens)
+        directive = tokens[0].lower()
+        if directive == ".subckt":
+            header, block, block_directives = line, [], []
+        elif directive == ".ends" and block is not None:
+            blocks.append("\n".join([header, *sorted(block), *block_directives, line]))
+            block = None
+        elif block is not None:
+            (block_directives if directive.startswith(".") else block).append(line)
+        else:
+            (directives if directive.startswith(".") else top_level).append(line)
+    digest = blake2b(f"circuit_solver {CACHE_VERSION}\n".encode("utf-8"), digest_size=20)
+    for line in sorted(top_level) + directives + sorted(blocks):
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def file_content_key(file_path: Union[str, Path]) -> str:
+    """Returns the content key of a Netlist file (see content_key)"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return content_key(f)
+
+
+class ResultCache:
+    """ A persistent, content-addressed cache of parsed Netlists and their results
+
+    The entries are keyed by the content key of the Netlist (see content_key), so a
+    Netlist saved with its elements in another order, or reformatted, hits the entries
+    of the original; the cached element table keeps the order of the first parse.
+    Every entry is a file: the element tables in the binary Netlist format (opened
+    memory-mapped), the solution vectors as .npy and the reductions as .npz files.
+
+    Several processes can share a directory: an entry is written to a temporary file
+    then renamed over its final path, so readers see a complete entry or none, and
+    an entry that disappears (evicted by another process) is a miss. When the entries
+    outgrow max_bytes, the least recently used ones are deleted; a hit marks its entry
+    as used by touching its modification time.
+
+        cache = ResultCache()
+        netlist = cache.parse("netlist.asc")
+        solution = cache.solve_dc(netlist)
+
+    Attributes
+        directory: the root directory of the entries
+        max_bytes: the maximum total size of the entries in bytes
+        hits: the number of lookups that found their entry
+        misses: the number of lookups that did not find their entry
+        evictions: the number of entries deleted by this process to respect max_bytes
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEFAULT_DIRECTORY,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._written_bytes = self.current_bytes()
+
+    def _path(self, key: str, kind: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{kind}"
+
+    def _entries(self, temporary: bool = False) -> List[os.DirEntry]:
+        entries = []
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                entries.extend(
+                    entry
+                    for entry in os.scandir(shard.path)
+                    if entry.name.startswith(TEMPORARY_PREFIX) == temporary
+                )
+        return entries
+
+    def current_bytes(self) -> int:
+        """The total size of the entries in the directory, of every process"""
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _load(self, key: str, kind: str, load: Callable[[Path], object]):
+        """Returns the entry loaded from its file, None when missing or unreadable"""
+        path = self._path(key, kind)
+        try:
+            value = load(path)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (errors.BinaryNetlistError, OSError, ValueError, EOFError, zipfile.BadZipFile):
+            # written by another version or damaged, recomputed and overwritten
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def _store(self, key: str, kind: str, save: Callable[[Path], None]):
+        """Writes an entry atomically, then evicts entries if the cache is over budget"""
+        path = self._path(key, kind)
+        path.parent.mkdir(exist_ok=True)
+        handle, temporary = tempfile.mkstemp(prefix=TEMPORARY_PREFIX, dir=path.parent)
+        os.close(handle)
+        try:
+            save(Path(temporary))
+            nbytes = os.path.getsize(temporary)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self._written_bytes += nbytes
+        if self._written_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Deletes the least recently used entries until the cache is below
+        EVICTION_TARGET of `max_bytes` (default: the max_bytes of the cache)"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        stale = time.time() - STALE_TEMPORARY_SECONDS
+        for entry in self._entries(temporary=True):
+            try:
+                if entry.stat().st_mtime < stale:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total > max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= max_bytes * EVICTION_TARGET:
+                    break
+                try:
+                    os.unlink(path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    # still mapped by a reader on some platforms, retried by a later eviction
+                    continue
+                total -= size
+        self._written_bytes = total
+
+    def clear(self):
+        """Deletes every entry"""
+        self.evict(max_bytes=0)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit, miss and eviction counters and the current occupancy"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self.current_bytes(),
+        }
+
+    def get_table(self, key: str) -> Optional[ElementTable]:
+        return self._load(key, "netb", read_binary_netlist)
+
+    def put_table(self, key: str, element_table: ElementTable):
+        self._store(key, "netb", lambda path: write_binary_netlist(element_table, path))
+
+    def get_array(self, key: str, name: str) -> Optional[np.ndarray]:
+        return self._load(key, f"{name}.npy", np.load)
+
+    def put_array(self, key: str, name: str, values: np.ndarray):
+        def save(path: Path):
+            with open(path, "wb") as f:
+                np.save(f, values)
+
+        self._store(key, f"{name}.npy", save)
+
+    def parse(self, file_path: Union[str, Path]) -> Netlist:
+        """Parses a Netlist file into a columnar Netlist, reusing the cached element
+        table of the same content
+
+        Returns:
+            Netlist: the Netlist, its `content_key` set for the results cached after it
+        """
+        key = file_content_key(file_path)
+        element_table = self.get_table(key)
+        if element_table is None:
+            netlist = Netlist.from_table(Netlist.read_element_table(file_path)).validate()
+            self.put_table(key, netlist.element_table)
+        else:
+            # the table was validated before it was cached
+            netlist = Netlist.from_table(element_table)
+        netlist.content_key = key
+        return netlist
+
+    def solve_dc(self, netlist: Netlist) -> DCSolution:
+        """Solves the DC operating point of a Netlist, reusing the cached solution vector
+
+        Only Netlists parsed through the cache (with a `content_key`) are cached.
+        """
+        if netlist.content_key is None:
+            return netlist.solve_dc()
+        system = MNASystem.from_netlist(netlist)
+        x = self.get_array(netlist.content_key, "dc")
+        if x is None or len(x) != system.size:
+            x = system.solve_rhs(system.rhs)
+            self.put_array(netlist.content_key, "dc", x)
+        return DCSolution(system, x)
+
+    def calculate_effective_resistance(self, netlist: Netlist, explain: bool = True) -> Netlist:
+        """Reduces the resistors of a Netlist (see Netlist.calculate_effective_resistance),
+        reusing the cached reduced circuit and the log of its steps
+
+        Only Netlists parsed through the cache (with a `content_key`) are cached.
+        """
+        key = netlist.content_key
+        if key is None or netlist.step_logs or netlist._explanatory_parts:
+            return Netlist.calculate_effective_resistance(netlist, explain=explain)
+        kind = "reduction.explained.npz" if explain else "reduction.npz"
+        arrays = self._load(key, kind, _load_arrays)
+        if arrays is not None:
+            return Netlist(
+                components_dict=None,
+                element_table=ElementTable(
+                    arrays["kind"],
+                    arrays["start_node"],
+                    arrays["end_node"],
+                    arrays["value"],
+                    arrays["tags"].tolist(),
+                ),
+                step_logs=(StepLog.from_arrays(arrays),) if "operations" in arrays else (),
+            )
+        reduced = Netlist.calculate_effective_resistance(netlist, explain=explain)
+        table = reduced.element_table
+        columns = {
+            "kind": table.kind,
+            "start_node": table.start_node,
+            "end_node": table.end_node,
+            "value": table.value,
+            "tags": np.array(list(table.tags), dtype=str),
+        }
+        if explain and reduced.step_logs:
+            columns.update(reduced.step_logs[-1].to_arrays())
+
+        def save(path: Path):
+            with open(path, "wb") as f:
+                np.savez(f, **columns)
+
+        self._store(key, kind, save)
+        return reduced
+
+
+def _load_arrays(path: Path) -> Dict[str, np.ndarray]:
+    with np.load(path) as arrays:
+        return dict(arrays)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Sequence
+from src.elementtable import CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE
+from src.profiling import instrumented
+from src.solver import MNASystem
+import numpy as np
+
+
+class Sensitivities:
+    """ The derivatives of node voltages with respect to every element value
+
+    Attributes
+        nodes: the output nodes, one row of `values` each
+        tags: the tag of every element, one column of `values` each
+        values: dV(node) / d(element value), (nodes, elements); zero for the
+            capacitors and inductors (opens and shorts whatever their value in DC)
+    """
+
+    def __init__(self, nodes: np.ndarray, tags: Sequence[str], values: np.ndarray):
+        self.nodes = nodes
+        self.tags = tags
+        self.values = values
+        self._columns: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __getitem__(self, tag: str) -> np.ndarray:
+        """Returns the sensitivity of every output node to the element with a tag
+
+        Raises:
+            KeyError: when no element has the tag
+        """
+        if not self._columns:
+            self._columns = {tag: column for column, tag in enumerate(self.tags)}
+        return self.values[:, self._columns[tag]]
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        """Returns the sensitivities of the output nodes by element tag"""
+        return {tag: self.values[:, column] for column, tag in enumerate(self.tags)}
+
+
+@instrumented("sensitivity", elements=lambda sensitivities: sensitivities.values.size)
+def adjoint_sensitivities(
+    system: MNASystem, nodes: Optional[Iterable[int]] = None
+) -> Sensitivities:
+    """Computes the sensitivity of node voltages to every resistor and source value
+
+    With A x = b and an output V = e^T x, the adjoint solution A^T λ = e gives
+    dV/dp = λ^T (db/dp - dA/dp x) for every element value p at once:
+
+        resistor R from a to b:  (λ_a - λ_b) (x_a - x_b) / R^2
+        voltage source:          λ of its branch current row
+        current source a to b:   λ_b - λ_a
+
+    so the cost is one transposed solve per output node, with the factorization of
+    the operating point, instead of one solve per element.
+
+    Parameters:
+        system (MNASystem): the MNA system of the circuit
+        nodes (Optional[Iterable[int]]): the output nodes, every non-ground node by default
+
+    Raises:
+        KeyError: when an output node is not part of the circuit
+        errors.SingularCircuitError: when the circuit has no unique solution
+
+    Returns:
+        Sensitivities: dV(node) / d(element value), indexed by element tag
+    """
+    pattern = system.pattern
+    nodes = system.nodes if nodes is None else np.asarray(list(nodes), dtype=np.int64)
+    rows = system.node_index(nodes)
+    x = system.solve_rhs(system.rhs)
+
+    outputs = np.zeros((system.size, len(nodes)))
+    grounded = rows < 0
+    outputs[rows[~grounded], np.flatnonzero(~grounded)] = 1.0
+    adjoint = system.factorize().solve(outputs, trans="T")
+
+    incidence = pattern.incidence()
+    across = incidence.T @ x
+    adjoint_across = (incidence.T @ adjoint).T
+    kind = system.element_table.kind
+    values = np.zeros((len(nodes), len(kind)))
+    resistors = np.flatnonzero(kind == RESISTOR)
+    values[:, resistors] = (
+        adjoint_across[:, resistors] * across[resistors] / system.values[resistors] ** 2
+    )
+    values[:, kind == CURRENT_SOURCE] = -adjoint_across[:, kind == CURRENT_SOURCE]
+    voltage_sources = kind == VOLTAGE_SOURCE
+    branch_rows = system.node_count + np.arange(voltage_sources.sum())
+    values[:, voltage_sources] = adjoint[branch_rows].T
+    return Sensitivities(nodes, system.element_table.tags, values)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor
+from hashlib import blake2b
+from typing import Callable, Dict, Optional, Tuple
+from src import errors
+from src.bulk import netlist_record
+from src.netlistparser import Netlist
+from src.netlistreader import iter_logical_lines
+import asyncio
+import json
+import os
+
+
+DEFAULT_MAX_PENDING = 64
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def netlist_fingerprint(text: str) -> str:
+    """Returns a digest of the content of a Netlist text
+
+    The digest is computed over the tokens of the logical lines, so the title,
+    comments, blank lines, continuations and spacing do not change it.
+    """
+    digest = blake2b(digest_size=16)
+    for _, tokens in iter_logical_lines(text.splitlines()):
+        digest.update(" ".join(tokens).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def solve_text(text: str) -> Dict:
+    """Parses and solves a Netlist text (see bulk.netlist_record for the result)"""
+    return netlist_record(Netlist.from_text(text))
+
+
+class SolverService:
+    """ An asyncio front end that solves Netlist texts on a bounded executor
+
+    The parsing and solving run on an executor (a process pool by default) so the
+    event loop is never blocked. Identical submissions (same netlist_fingerprint)
+    that arrive while one of them is being solved are coalesced: they all await the
+    same job, which is solved once. At most `max_pending` distinct jobs are queued or
+    running: a submission of another Netlist waits in `solve` for one of them to
+    finish before its job is created, or is rejected with
+    errors.ServiceOverloadedError once `queue_timeout` is exceeded.
+
+    Attributes
+        max_pending: the maximum number of distinct jobs queued or running
+        queue_timeout: the time (s) a submission may wait for a slot, None to wait forever
+        submitted: the number of submissions
+        coalesced: the number of submissions that joined an in-flight job
+        solved: the number of jobs that completed successfully
+        rejected: the number of jobs rejected because the service was busy
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        workers: Optional[int] = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        queue_timeout: Optional[float] = None,
+        solve: Callable[[str], Dict] = solve_text,
+    ):
+        self._executor = executor
+        self._owns_executor = executor is None
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._solve = solve
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.solved = 0
+        self.rejected = 0
+
+    async def __aenter__(self) -> SolverService:
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the executor if it was created by the service"""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    @property
+    def pending(self) -> int:
+        """The number of distinct jobs queued or running"""
+        return len(self._in_flight)
+
+    async def solve(self, text: str) -> Dict:
+        """Solves a Netlist text, sharing the job of an identical in-flight submission
+
+        Parameters:
+            text (str): the content of a Netlist file
+
+        Returns:
+            Dict: the result record, shared between coalesced submissions (do not mutate)
+
+        Raises:
+            errors.ServiceOverloadedError: when no slot frees up within `queue_timeout`
+        """
+        key = netlist_fingerprint(text)
+        self.submitted += 1
+        job = self._in_flight.get(key)
+        if job is None:
+            await self._acquire_slot()
+            # an identical submission may have created the job while this one waited
+            job = self._in_flight.get(key)
+            if job is None:
+                job = asyncio.ensure_future(self._run(text))
+                self._in_flight[key] = job
+                job.add_done_callback(lambda done: self._finish(key, done))
+            else:
+                self._get_slots().release()
+                self.coalesced += 1
+        else:
+            self.coalesced += 1
+        # a cancelled submission must not cancel the job of the coalesced ones
+        return await asyncio.shield(job)
+
+    async def _acquire_slot(self):
+        slots = self._get_slots()
+        if slots.locked() and self.queue_timeout is not None:
+            try:
+                if self.queue_timeout <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise errors.ServiceOverloadedError(self.max_pending)
+        else:
+            await slots.acquire()
+
+    def _finish(self, key: str, job: asyncio.Future):
+        if self._in_flight.get(key) is job:
+            del self._in_flight[key]
+        # the slot was taken by solve when the job was created
+        self._get_slots().release()
+        if not job.cancelled():
+            # mark the exception as retrieved when every submission was cancelled
+            job.exception()
+
+    async def _run(self, text: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._get_executor(), self._solve, text)
+        self.solved += 1
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the submission counters and the number of pending jobs"""
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "solved": self.solved,
+            "rejected": self.rejected,
+            "pending": self.pending,
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Starts a minimal HTTP/1.1 front end
+
+        `POST /solve` with the Netlist text as body answers the JSON result record,
+        `GET /stats` answers the counters. Errors are answered as {"error": ...} with
+        400 (invalid netlist), 503 (busy) or 500.
+
+        Returns:
+            asyncio.AbstractServer: the started server (port 0 picks a free port)
+        """
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, payload = await self._handle_request(reader)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": f"malformed request: {e}"}
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader) -> Tuple[int, Dict]:
+        method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_REQUEST_BYTES:
+            return 413, {"error": "the netlist is too large"}
+        body = await reader.readexactly(length)
+
+        if method == "GET" and path == "/stats":
+            return 200, self.stats()
+        if method != "POST" or path != "/solve":
+            return 404, {"error": f"no route for {method} {path}"}
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError as e:
+            return 400, {"error": f"the netlist is not valid UTF-8: {e}"}
+        try:
+            return 200, await self.solve(text)
+        except errors.ServiceOverloadedError as e:
+            return 503, {"error": str(e)}
+        except errors.BaseError as e:
+            return 400, {"error": f"{e.__class__.__name__}: {e}"}
+        except Exception as e:
+            return 500, {"error": f"{e.__class__.__name__}: {e}"}
+
+
+class ServiceClient:
+    """ A minimal asyncio HTTP client of a SolverService front end
+
+    Attributes
+        host: the host of the service
+        port: the port of the service
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.host = host
+        self.port = port
+
+    @classmethod
+    def for_server(cls, server: asyncio.AbstractServer) -> ServiceClient:
+        """Returns a client of a server started in this process by SolverService.serve"""
+        host, port = server.sockets[0].getsockname()[:2]
+        return cls(host, port)
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> Tuple[int, Dict]:
+        """Sends one request and returns the status and the decoded JSON payload"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                (
+                    f"{method} {path} HTTP/1.1\r\n"
+                    f"Host: {self.host}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("latin-1")
+                + body
+            )
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, payload = response.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        return status, json.loads(payload)
+
+    async def solve(self, text: str) -> Dict:
+        """Solves a Netlist text on the service
+
+        Raises:
+            errors.ServiceResponseError: when the service answers an error (503 when busy)
+        """
+        status, payload = await self.request("POST", "/solve", text.encode("utf-8"))
+        if status != 200:
+            raise errors.ServiceResponseError(status, payload.get("error"))
+        return payload
+
+    async def stats(self) -> Dict[str, int]:
+        """Returns the counters of the service"""
+        return (await self.request("GET", "/stats"))[1]
@@ -0,0 +1,638 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional
+from src import errors
+from src.components import LinearElement
+from src.elementtable import CURRENT_SOURCE, INDUCTOR, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.ordering import DEFAULT_ORDERING, GROUND_NODE, NodeNumbering, symmetric_ordering
+from src.profiling import instrumented
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+if TYPE_CHECKING:
+    from src.factorcache import FactorizationCache
+
+
+DENSE_BATCH_LIMIT = 128
+DENSE_BATCH_ENTRIES = 1 << 22
+
+
+class MNAPattern:
+    """ The symbolic (value independent) structure of the MNA system of a topology
+
+    The unknowns x are the voltages of every non-ground node followed by the
+    current through every voltage source, then through every shorted inductor. A
+    voltage source forces V(start_node) - V(end_node) = value and its current is
+    positive when it flows from the start node through the source to the end node.
+    A current source pushes its value from the start node through the source into
+    the end node. The inductors that are not conductance elements (all of them in
+    DC) are shorts, stamped as 0 V sources.
+
+    The CSC sparsity pattern is computed once; the matrix data and right hand side
+    of any set of element values (one run or a batch of runs) are then a product
+    with precomputed scatter matrices. The node numbers are compacted into a dense
+    index (see ordering.NodeNumbering) and the fill-reducing ordering of the unknowns
+    is computed once, then reused by every factorization.
+
+    Attributes
+        numbering: the dense index of the nodes, the matrix row of a node being its
+            index minus one (the ground has no row)
+        nodes: the non-ground node numbers, in the order of the matrix rows
+        size: the number of unknowns
+        conductance_elements: the elements stamped as two-terminal conductances
+            (the resistors, plus the companion models of capacitors and inductors
+            in transient and AC analyses)
+        shorts: the inductors stamped as 0 V sources
+        branches: the elements with a branch current unknown, the voltage sources
+            then the shorts
+        indices, indptr: the CSC sparsity pattern of the MNA matrix
+        ordering: the fill-reducing ordering method (see ordering.ORDERINGS)
+        column_ordering: the fill-reducing column ordering, once computed
+    """
+
+    @instrumented("assemble")
+    def __init__(
+        self,
+        element_table: ElementTable,
+        conductance_elements: Optional[np.ndarray] = None,
+        ordering: str = DEFAULT_ORDERING,
+    ):
+        self.element_table = element_table
+        self.element_count = len(element_table)
+        self.resistors = element_table.indices(RESISTOR)
+        self.voltage_sources = element_table.indices(VOLTAGE_SOURCE)
+        self.current_sources = element_table.indices(CURRENT_SOURCE)
+        if conductance_elements is None:
+            conductance_elements = self.resistors
+        self.conductance_elements = np.asarray(conductance_elements, dtype=np.int64)
+        self.shorts = np.setdiff1d(element_table.indices(INDUCTOR), self.conductance_elements)
+        self.branches = np.concatenate((self.voltage_sources, self.shorts))
+
+        start_node, end_node = element_table.start_node, element_table.end_node
+        solved = np.concatenate(
+            (self.conductance_elements, self.branches, self.current_sources)
+        )
+        self.numbering = NodeNumbering(np.concatenate((start_node[solved], end_node[solved])))
+        self.nodes = self.numbering.nodes[1:]
+        self.node_count = len(self.nodes)
+        self.size = self.node_count + len(self.branches)
+
+        self.start_index = np.full(self.element_count, -1, dtype=np.int64)
+        self.end_index = np.full(self.element_count, -1, dtype=np.int64)
+        self.start_index[solved] = self.node_index(start_node[solved])
+        self.end_index[solved] = self.node_index(end_node[solved])
+
+        self._build_matrix_pattern()
+        self._build_rhs_pattern()
+        self.ordering = ordering
+        self.column_ordering = symmetric_ordering(self.indices, self.indptr, self.size, ordering)
+        if self.column_ordering is not None:
+            self._inverse_ordering = np.argsort(self.column_ordering)
+
+    def node_index(self, nodes: np.ndarray) -> np.ndarray:
+        """Maps node numbers to matrix rows, the ground node is mapped to -1
+
+        Parameters:
+            nodes (np.ndarray): the node numbers
+
+        Raises:
+            KeyError: when a node is not solved by the system
+
+        Returns:
+            np.ndarray: the matrix row of every node
+        """
+        return self.numbering.index(nodes) - 1
+
+    def _build_matrix_pattern(self):
+        r = self.conductance_elements
+        a, b = self.start_index[r], self.end_index[r]
+        rows = [a, b, a, b]
+        cols = [a, b, b, a]
+        elements = [r, r, r, r]
+        signs = [np.ones(len(r)), np.ones(len(r)), -np.ones(len(r)), -np.ones(len(r))]
+
+        v = self.branches
+        branch_rows = self.node_count + np.arange(len(v))
+        for nodes, sign in ((self.start_index[v], 1.0), (self.end_index[v], -1.0)):
+            rows.extend((nodes, branch_rows))
+            cols.extend((branch_rows, nodes))
+            elements.extend((np.full(len(v), -1), np.full(len(v), -1)))
+            signs.extend((np.full(len(v), sign), np.full(len(v), sign)))
+
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        elements, signs = np.concatenate(elements), np.concatenate(signs)
+        stamped = (rows >= 0) & (cols >= 0)
+        rows, cols = rows[stamped], cols[stamped]
+        elements, signs = elements[stamped], signs[stamped]
+
+        keys, position = np.unique(cols * self.size + rows, return_inverse=True)
+        self.nnz = len(keys)
+        size = max(self.size, 1)
+        self.indices = keys % size
+        self.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(keys // size, minlength=self.size)))
+        )
+
+        variable = elements >= 0
+        self._conductance_scatter = sp.csr_matrix(
+            (signs[variable], (position[variable], elements[variable])),
+            shape=(self.nnz, self.element_count),
+        )
+        self._constant_data = np.bincount(
+            position[~variable], weights=signs[~variable], minlength=self.nnz
+        )
+
+    def _build_rhs_pattern(self):
+        i, v = self.current_sources, self.voltage_sources
+        rows = [self.start_index[i], self.end_index[i], self.node_count + np.arange(len(v))]
+        elements = [i, i, v]
+        signs = [-np.ones(len(i)), np.ones(len(i)), np.ones(len(v))]
+        rows, elements, signs = np.concatenate(rows), np.concatenate(elements), np.concatenate(signs)
+        stamped = rows >= 0
+        self._rhs_scatter = sp.csr_matrix(
+            (signs[stamped], (rows[stamped], elements[stamped])),
+            shape=(self.size, self.element_count),
+        )
+
+    def incidence(self) -> sp.csr_matrix:
+        """Returns the node incidence matrix of the elements, (size, elements)
+
+        The column of an element holds +1 on the row of its start node and -1 on the
+        row of its end node, so `incidence().T @ x` is the voltage across every element
+        and `incidence() @ j` injects a current j flowing out of every end node into
+        the start node.
+        """
+        elements = np.arange(self.element_count)
+        rows = np.concatenate((self.start_index, self.end_index))
+        cols = np.concatenate((elements, elements))
+        signs = np.concatenate((np.ones(self.element_count), -np.ones(self.element_count)))
+        stamped = rows >= 0
+        return sp.csr_matrix(
+            (signs[stamped], (rows[stamped], cols[stamped])),
+            shape=(self.size, self.element_count),
+        )
+
+    def conductances(self, values: np.ndarray) -> np.ndarray:
+        """Returns the conductance of every resistor and 0 for every other element
+
+        Parameters:
+            values (np.ndarray): element values, (elements,) or (runs, elements)
+        """
+        conductances = np.zeros(np.shape(values))
+        conductances[..., self.resistors] = 1 / values[..., self.resistors]
+        return conductances
+
+    def matrix_data(self, values: np.ndarray) -> np.ndarray:
+        """Returns the CSC data of the MNA matrix for element values
+
+        Parameters:
+            values (np.ndarray): element values, (elements,) or (runs, elements)
+
+        Returns:
+            np.ndarray: the matrix data, (nnz,) or (runs, nnz)
+        """
+        return self.conductance_data(self.conductances(values))
+
+    def conductance_data(self, conductances: np.ndarray) -> np.ndarray:
+        """Returns the CSC data of the MNA matrix for the conductance of every element
+
+        Parameters:
+            conductances (np.ndarray): the stamped conductance of every element (only
+                read for `conductance_elements`), (elements,) or (runs, elements)
+
+        Returns:
+            np.ndarray: the matrix data, (nnz,) or (runs, nnz)
+        """
+        return (self._conductance_scatter @ conductances.T).T + self._constant_data
+
+    def matrix(self, values: np.ndarray) -> sp.csc_matrix:
+        """Returns the sparse MNA matrix for one set of element values"""
+        return self.conductance_matrix(self.conductances(values))
+
+    def conductance_matrix(self, conductances: np.ndarray) -> sp.csc_matrix:
+        """Returns the sparse MNA matrix for the conductance of every element"""
+        return sp.csc_matrix(
+            (self.conductance_data(conductances), self.indices, self.indptr),
+            shape=(self.size, self.size),
+        )
+
+    def rhs(self, values: np.ndarray) -> np.ndarray:
+        """Returns the right hand side vector(s) for element values
+
+        Parameters:
+            values (np.ndarray): element values, (elements,) or (runs, elements)
+
+        Returns:
+            np.ndarray: the right hand side, (size,) or (runs, size)
+        """
+        return (self._rhs_scatter @ np.asarray(values, dtype=np.float64).T).T
+
+    def factorize(self, values: np.ndarray) -> MNAFactorization:
+        """Computes the sparse LU factorization of the MNA matrix for element values
+
+        The column ordering (computed up front, or found by the first factorization
+        for the SuperLU orderings) is reused by every factorization of this pattern.
+
+        Returns:
+            MNAFactorization: the factorization of the matrix
+
+        Raises:
+            errors.SingularCircuitError: when the circuit has no unique solution
+        """
+        return self.factorize_matrix(self.matrix(values))
+
+    @instrumented("factorize")
+    def factorize_matrix(self, matrix: sp.csc_matrix) -> MNAFactorization:
+        """Computes the sparse LU factorization of a matrix with this pattern"""
+        if self.size == 0:
+            raise errors.SingularCircuitError("the circuit has no nodes to solve")
+        try:
+            if self.column_ordering is None:
+                lu = splu(matrix, permc_spec=self.ordering)
+                # perm_c maps every column to its position, the ordering is its inverse
+                self.column_ordering = np.argsort(lu.perm_c)
+                self._inverse_ordering = lu.perm_c.copy()
+                return MNAFactorization(lu)
+            return MNAFactorization(
+                splu(matrix[:, self.column_ordering], permc_spec="NATURAL"),
+                self._inverse_ordering,
+            )
+        except RuntimeError as e:
+            raise errors.SingularCircuitError(str(e))
+
+    @property
+    def nbytes(self) -> int:
+        """The (approximate) memory held by the pattern in bytes"""
+        scatters = (self._conductance_scatter, self._rhs_scatter)
+        return (
+            self.indices.nbytes
+            + self.indptr.nbytes
+            + self._constant_data.nbytes
+            + self.start_index.nbytes
+            + self.end_index.nbytes
+            + sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in scatters)
+        )
+
+    def node_voltages(self, x: np.ndarray) -> np.ndarray:
+        return x[..., : self.node_count]
+
+    def element_currents(self, x: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Returns the current through every element of the table
+
+        Parameters:
+            x (np.ndarray): the solution(s), (size,) or (runs, size)
+            values (np.ndarray): the element values, (elements,) or (runs, elements)
+
+        Returns:
+            np.ndarray: the currents, NaN for capacitors and the inductors that are
+            not shorts
+        """
+        voltages = np.concatenate(
+            (self.node_voltages(x), np.zeros(x.shape[:-1] + (1,))), axis=-1
+        )
+        currents = np.full(np.shape(values), np.nan)
+        r = self.resistors
+        currents[..., r] = (
+            voltages[..., self.start_index[r]] - voltages[..., self.end_index[r]]
+        ) / values[..., r]
+        currents[..., self.branches] = x[..., self.node_count :]
+        currents[..., self.current_sources] = values[..., self.current_sources]
+        return currents
+
+    def solve_batch(self, values: np.ndarray) -> np.ndarray:
+        """Solves the system for many sets of element values
+
+        Parameters:
+            values (np.ndarray): the element values, (runs, elements)
+
+        Returns:
+            np.ndarray: the solutions, (runs, size)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        return self.solve_conductance_batch(self.conductances(values), self.rhs(values))
+
+    def solve_conductance_batch(self, conductances: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """Solves the system for many sets of stamped conductances (real or complex)
+
+        Small systems are solved as stacks of dense matrices with one vectorized
+        call per chunk of runs; larger ones reuse the sparsity pattern and the
+        column ordering for every factorization.
+
+        Parameters:
+            conductances (np.ndarray): the stamped conductances, (runs, elements)
+            rhs (np.ndarray): the right hand sides, (runs, size)
+
+        Returns:
+            np.ndarray: the solutions, (runs, size)
+        """
+        if self.size == 0:
+            raise errors.SingularCircuitError("the circuit has no nodes to solve")
+        x = np.empty((len(conductances), self.size), dtype=np.result_type(conductances, rhs))
+        if self.size > DENSE_BATCH_LIMIT:
+            for run, run_conductances in enumerate(conductances):
+                x[run] = self.factorize_matrix(self.conductance_matrix(run_conductances)).solve(
+                    rhs[run]
+                )
+            return x
+
+        columns = np.repeat(np.arange(self.size), np.diff(self.indptr))
+        chunk = max(1, DENSE_BATCH_ENTRIES // (self.size * self.size))
+        for begin in range(0, len(conductances), chunk):
+            data = self.conductance_data(conductances[begin : begin + chunk])
+            matrices = np.zeros((len(data), self.size, self.size), dtype=x.dtype)
+            matrices[:, self.indices, columns] = data
+            try:
+                x[begin : begin + chunk] = np.linalg.solve(
+                    matrices, rhs[begin : begin + chunk, :, None]
+                )[..., 0]
+            except np.linalg.LinAlgError as e:
+                raise errors.SingularCircuitError(str(e))
+        return x
+
+
+class MNAFactorization:
+    """ A sparse LU factorization of an MNA matrix
+
+    Attributes
+        lu: the SuperLU factorization, of the column permuted matrix when
+            `inverse_ordering` is given
+        inverse_ordering: maps the permuted unknowns back to the MNA unknowns
+    """
+
+    def __init__(self, lu, inverse_ordering: Optional[np.ndarray] = None):
+        self.lu = lu
+        self.inverse_ordering = inverse_ordering
+
+    def solve(self, rhs: np.ndarray, trans: str = "N") -> np.ndarray:
+        """Solves A x = rhs (or A^T x = rhs with trans="T") for one or more right hand sides
+
+        Parameters:
+            rhs (np.ndarray): the right hand side(s), (size,) or (size, k)
+        """
+        if self.inverse_ordering is None:
+            return self.lu.solve(rhs, trans=trans)
+        if trans == "N":
+            return self.lu.solve(rhs)[self.inverse_ordering]
+        ordering = np.argsort(self.inverse_ordering)
+        return self.lu.solve(rhs[ordering], trans=trans)
+
+    @property
+    def fill(self) -> int:
+        """The number of stored entries of the L and U factors"""
+        return self.lu.L.nnz + self.lu.U.nnz
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the L and U factors in bytes"""
+        return sum(
+            factor.data.nbytes + factor.indices.nbytes + factor.indptr.nbytes
+            for factor in (self.lu.L, self.lu.U)
+        )
+
+
+class MNASystem:
+    """ The sparse Modified Nodal Analysis system (A x = b) of a DC circuit
+
+    Attributes
+        pattern: the symbolic structure of the system
+        nodes: the non-ground node numbers, in the order of the matrix rows
+        matrix: the sparse (CSC) MNA matrix
+        rhs: the right hand side (excitation) vector
+    """
+
+    def __init__(
+        self,
+        element_table: ElementTable,
+        pattern: Optional[MNAPattern] = None,
+        cache: Optional[FactorizationCache] = None,
+    ):
+        self.element_table = element_table
+        self.cache = cache
+        if cache is not None:
+            self.fingerprint = element_table.topology_fingerprint()
+            pattern = cache.get_pattern(element_table, self.fingerprint)
+        self.pattern = pattern if pattern is not None else MNAPattern(element_table)
+        self.values = element_table.value
+        self.nodes = self.pattern.nodes
+        self.node_count = self.pattern.node_count
+        self.size = self.pattern.size
+        self.matrix = self.pattern.matrix(self.values)
+        self.rhs = self.pattern.rhs(self.values)
+        self._lu = None
+
+    @classmethod
+    def from_netlist(cls, netlist, cache: Optional[FactorizationCache] = None) -> MNASystem:
+        """Builds the MNA system straight from the element table of a parsed Netlist
+
+        Parameters:
+            netlist (Netlist): the parsed Netlist
+            cache (Optional[FactorizationCache]): the cache of patterns and factorizations
+
+        Returns:
+            MNASystem: the assembled (not yet factorized) system
+        """
+        return cls(netlist.element_table, cache=cache)
+
+    @classmethod
+    def from_elements(
+        cls,
+        resistors: List[LinearElement],
+        voltage_sources: List[LinearElement],
+        current_sources: List[LinearElement],
+    ) -> MNASystem:
+        """Builds the MNA system from lists of elements
+
+        Returns:
+            MNASystem: the assembled (not yet factorized) system
+        """
+        return cls(
+            ElementTable.from_components(
+                {"r": resistors, "v": voltage_sources, "i": current_sources}
+            )
+        )
+
+    def node_index(self, nodes: np.ndarray) -> np.ndarray:
+        return self.pattern.node_index(nodes)
+
+    def factorize(self):
+        """Computes (once) the sparse LU factorization of the MNA matrix
+
+        Raises:
+            errors.SingularCircuitError: when the circuit has no unique solution
+        """
+        if self._lu is None:
+            if self.cache is not None:
+                self._lu = self.cache.get_factorization(self.pattern, self.fingerprint, self.values)
+            else:
+                self._lu = self.pattern.factorize(self.values)
+        return self._lu
+
+    def solve_rhs(self, rhs: np.ndarray) -> np.ndarray:
+        """Solves the system for another right hand side, reusing the factorization"""
+        x = self.factorize().solve(rhs)
+        if not np.all(np.isfinite(x)):
+            raise errors.SingularCircuitError("the MNA matrix is numerically singular")
+        return x
+
+    def solve(self) -> DCSolution:
+        """Solves the system with a single factorization
+
+        Returns:
+            DCSolution: every node voltage and branch current of the circuit
+        """
+        return DCSolution(self, self.solve_rhs(self.rhs))
+
+
+def _source_resistance(pattern: MNAPattern, x: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Returns the resistance seen by the only source of the circuit"""
+    sources = np.concatenate((pattern.voltage_sources, pattern.current_sources))
+    if len(sources) != 1:
+        raise errors.SingularCircuitError(
+            "the effective resistance needs exactly one voltage or current source"
+        )
+    voltages = np.concatenate((pattern.node_voltages(x), np.zeros(x.shape[:-1] + (1,))), axis=-1)
+    source = sources[0]
+    across = voltages[..., pattern.start_index[source]] - voltages[..., pattern.end_index[source]]
+    if len(pattern.voltage_sources):
+        return -across / x[..., pattern.node_count]
+    return -across / values[..., source]
+
+
+class DCSolution:
+    """ The DC operating point of a circuit
+
+    Attributes
+        nodes: the non-ground node numbers
+        node_voltages: the voltage of every node in `nodes`
+        element_currents: the current through every element of the element table
+            (NaN for capacitors, inductors are shorts)
+        resistor_currents: the current through every resistor, from start to end node
+        voltage_source_currents: the current through every voltage source
+        current_source_currents: the current through every current source
+    """
+
+    def __init__(self, system: MNASystem, x: np.ndarray):
+        self.system = system
+        pattern = system.pattern
+        self.x = x
+        self.nodes = system.nodes
+        self.node_voltages = pattern.node_voltages(x)
+        self.element_currents = pattern.element_currents(x, system.values)
+        self.resistor_currents = self.element_currents[pattern.resistors]
+        self.voltage_source_currents = self.element_currents[pattern.voltage_sources]
+        self.current_source_currents = self.element_currents[pattern.current_sources]
+
+    def get_node_voltage(self, node: int) -> float:
+        """Returns the voltage of a node with respect to ground (node 0)
+
+        Parameters:
+            node (int): the node number
+
+        Returns:
+            float: the node voltage
+        """
+        if node == GROUND_NODE:
+            return 0.0
+        index = int(self.system.node_index([node])[0])
+        if index >= self.system.node_count or self.nodes[index] != node:
+            raise KeyError(node)
+        return float(self.node_voltages[index])
+
+    def get_node_voltages(self) -> Dict[int, float]:
+        """Returns the voltage of every node, including ground
+
+        Returns:
+            Dict[int, float]: node number -> voltage
+        """
+        voltages = {GROUND_NODE: 0.0}
+        voltages.update(zip(self.nodes.tolist(), self.node_voltages.tolist()))
+        return voltages
+
+    def get_branch_currents(self) -> List[tuple]:
+        """Returns the current through every resistor, voltage and current source
+
+        Returns:
+            List[tuple]: (element tag, current) pairs, in element table order
+        """
+        tags = self.system.element_table.tags
+        return [
+            (tags[index], current)
+            for index, current in enumerate(self.element_currents.tolist())
+            if not np.isnan(current)
+        ]
+
+    def get_effective_resistance(self) -> float:
+        """Returns the resistance seen by the only source of the circuit
+
+        Returns:
+            float: the source voltage over the current it delivers
+        """
+        return float(_source_resistance(self.system.pattern, self.x, self.system.values))
+
+
+class BatchSolution:
+    """ The DC operating points of many runs of the same topology
+
+    Attributes
+        nodes: the non-ground node numbers
+        values: the element values of every run, (runs, elements)
+        node_voltages: the node voltages of every run, (runs, nodes)
+        element_currents: the element currents of every run, (runs, elements)
+    """
+
+    def __init__(self, pattern: MNAPattern, values: np.ndarray, x: np.ndarray):
+        self.pattern = pattern
+        self.values = values
+        self.x = x
+        self.nodes = pattern.nodes
+        self.node_voltages = pattern.node_voltages(x)
+        self.element_currents = pattern.element_currents(x, values)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def effective_resistance(self) -> np.ndarray:
+        """The resistance seen by the only source of the circuit, for every run"""
+        return _source_resistance(self.pattern, self.x, self.values)
+
+
+def solve_dc(netlist, cache: Optional[FactorizationCache] = None) -> DCSolution:
+    """Solves the DC operating point of a parsed Netlist with sparse MNA
+
+    Parameters:
+        netlist (Netlist): the parsed Netlist
+        cache (Optional[FactorizationCache]): the cache of patterns and factorizations
+
+    Returns:
+        DCSolution: every node voltage and branch current of the circuit
+    """
+    return MNASystem.from_netlist(netlist, cache=cache).solve()
+
+
+def solve_dc_batch(
+    element_table: ElementTable,
+    values: np.ndarray,
+    cache: Optional[FactorizationCache] = None,
+) -> BatchSolution:
+    """Solves the DC operating points of one topology for many sets of element values
+
+    Parameters:
+        element_table (ElementTable): the topology (its values are ignored)
+        values (np.ndarray): the element values of every run, (runs, elements) in
+            element table order
+        cache (Optional[FactorizationCache]): the cache of patterns
+
+    Returns:
+        BatchSolution: the node voltages and element currents of every run
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if values.shape[1] != len(element_table):
+        raise ValueError(
+            f"expected {len(element_table)} element values per run, got {values.shape[1]}"
+        )
+    if cache is not None:
+        pattern = cache.get_pattern(element_table)
+    else:
+        pattern = MNAPattern(element_table)
+    return BatchSolution(pattern, values, pattern.solve_batch(values))
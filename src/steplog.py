@@ -0,0 +1,222 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from src.components import Resistor
+import numpy as np
+
+
+SERIES = 0
+PARALLEL = 1
+WYE_DELTA = 2
+DELTA_WYE = 3
+OPERATION_NAMES = ("series", "parallel", "wye_delta", "delta_wye")
+LOG_COLUMNS = ("operations", "operand_offsets", "operands", "result_offsets", "results")
+
+
+class StepLog:
+    """ A compact log of the steps of a reduction, rendered to text on demand
+
+    A step is an operation code, the edges it merged and the edges it created, kept
+    in flat integer arrays. The edges are indices into the edge columns of the
+    ReductionEngine, which only ever grow, so a step costs a few machine integers
+    instead of Resistor objects and dicts; nothing is formatted until the text is
+    read (see iter_text).
+
+    Attributes
+        operations: the operation code of every step (SERIES, PARALLEL, WYE_DELTA, DELTA_WYE)
+        operand_offsets: the start of the operands of every step in `operands`
+        operands: the merged (removed) edges of every step, concatenated
+        result_offsets: the start of the results of every step in `results`
+        results: the edges created by every step, concatenated
+    """
+
+    def __init__(
+        self, start_nodes: Sequence[int], end_nodes: Sequence[int], values: Sequence[float]
+    ):
+        self._start = start_nodes
+        self._end = end_nodes
+        self._value = values
+        self.operations = array("B")
+        self.operand_offsets = array("q", [0])
+        self.operands = array("q")
+        self.result_offsets = array("q", [0])
+        self.results = array("q")
+
+    def record(self, operation: int, operands: Sequence[int], results: Sequence[int]):
+        self.operations.append(operation)
+        self.operands.extend(operands)
+        self.operand_offsets.append(len(self.operands))
+        self.results.extend(results)
+        self.result_offsets.append(len(self.results))
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Returns the log and the edge columns it refers to as arrays (e.g. to save them)"""
+        return {
+            "start_nodes": np.asarray(self._start, dtype=np.int64),
+            "end_nodes": np.asarray(self._end, dtype=np.int64),
+            "values": np.asarray(self._value, dtype=np.float64),
+            **{column: np.asarray(getattr(self, column)) for column in LOG_COLUMNS},
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> StepLog:
+        """Rebuilds a log saved with to_arrays"""
+        step_log = cls(
+            arrays["start_nodes"].tolist(), arrays["end_nodes"].tolist(), arrays["values"].tolist()
+        )
+        for column in LOG_COLUMNS:
+            setattr(step_log, column, array(getattr(step_log, column).typecode, arrays[column]))
+        return step_log
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the log arrays in bytes"""
+        return sum(
+            getattr(self, column).itemsize * len(getattr(self, column)) for column in LOG_COLUMNS
+        )
+
+    def step(self, index: int) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+        """Returns the operation code, the merged edges and the created edges of a step"""
+        begin, end = self.operand_offsets[index], self.operand_offsets[index + 1]
+        first, last = self.result_offsets[index], self.result_offsets[index + 1]
+        return (
+            self.operations[index],
+            tuple(self.operands[begin:end]),
+            tuple(self.results[first:last]),
+        )
+
+    def __iter__(self) -> Iterator[Tuple[int, Tuple[int, ...], Tuple[int, ...]]]:
+        return (self.step(index) for index in range(len(self)))
+
+    def count(self, operation: int) -> int:
+        """Returns the number of steps of an operation"""
+        return self.operations.count(operation)
+
+    def resistor(self, edge: int) -> Resistor:
+        return Resistor(self._value[edge], self._start[edge], self._end[edge])
+
+    def iter_parts(self) -> Iterator[Dict]:
+        """Materializes the steps in the explanatory_parts format of a Netlist"""
+        for operation, operands, results in self:
+            resistors = [self.resistor(edge) for edge in operands]
+            if operation == SERIES:
+                yield explanatory_part(
+                    series_resistors=resistors, series_accumulation=self.resistor(results[0])
+                )
+            elif operation == PARALLEL:
+                edge = operands[0]
+                pair = tuple(sorted((self._start[edge], self._end[edge])))
+                yield explanatory_part(
+                    parallel_resistors={pair: resistors},
+                    parallel_accumulation=self.resistor(results[0]),
+                )
+            else:
+                yield explanatory_part(
+                    transformation=OPERATION_NAMES[operation],
+                    transformed_resistors=resistors,
+                    transformed_equivalents=[self.resistor(edge) for edge in results],
+                )
+
+    def iter_text(self) -> Iterator[str]:
+        """Streams the explanation of every step, one text chunk per step"""
+        for operation, operands, results in self:
+            resistors = [self.resistor(edge) for edge in operands]
+            equivalents = [self.resistor(edge) for edge in results]
+            if operation == SERIES:
+                yield series_text(resistors, equivalents[0])
+            elif operation == PARALLEL:
+                yield parallel_text(resistors, equivalents[0])
+            else:
+                yield transformation_text(OPERATION_NAMES[operation], resistors, equivalents)
+
+
+def explanatory_part(
+    series_resistors: Optional[List[Resistor]] = None,
+    parallel_resistors: Optional[Dict[Tuple[int, int], List[Resistor]]] = None,
+    series_accumulation: Optional[Resistor] = None,
+    parallel_accumulation: Optional[Resistor] = None,
+    transformation: Optional[str] = None,
+    transformed_resistors: Optional[List[Resistor]] = None,
+    transformed_equivalents: Optional[List[Resistor]] = None,
+) -> Dict:
+    part = {
+        "series_resistors": series_resistors or [],
+        "parallel_resistors": parallel_resistors or {},
+        "series_accumulation": series_accumulation,
+        "parallel_accumulation": parallel_accumulation,
+    }
+    if transformation is not None:
+        part["transformation"] = transformation
+        part["transformed_resistors"] = transformed_resistors
+        part["transformed_equivalents"] = transformed_equivalents
+    return part
+
+
+def series_text(resistors: List[Resistor], accumulation: Resistor) -> str:
+    resistors = resistors[::-1]
+    names = " ".join(
+        f"{resistor.tag} ({resistor.value}{resistor.symbol})" for resistor in resistors
+    )
+    terms = " + ".join(f" ({resistor.value}{resistor.symbol})," for resistor in resistors)
+    return (
+        f"\nThe following resistors are in Series: {names}\n( {terms} ) "
+        f" = {accumulation.value}{accumulation.symbol}\n"
+    )
+
+
+def parallel_text(resistors: List[Resistor], accumulation: Resistor) -> str:
+    resistors = resistors[::-1]
+    names = " ".join(
+        f"{resistor.tag} ({resistor.value}{resistor.symbol})," for resistor in resistors
+    )
+    terms = " + ".join(f" 1/({resistor.value}{resistor.symbol}) " for resistor in resistors)
+    return (
+        f"\nThe following resistors are in Parallel: {names}\n1 /({terms})"
+        f" = {accumulation.value}{accumulation.symbol}\n"
+    )
+
+
+def transformation_text(
+    transformation: str, resistors: List[Resistor], equivalents: List[Resistor]
+) -> str:
+    names, results = (
+        ", ".join(f"{resistor.tag} ({resistor.value}{resistor.symbol})" for resistor in group)
+        for group in (resistors, equivalents)
+    )
+    if transformation == OPERATION_NAMES[WYE_DELTA]:
+        (centre,) = {resistors[0].start_node, resistors[0].end_node} & {
+            resistors[1].start_node,
+            resistors[1].end_node,
+        }
+        return (
+            f"\nThe following resistors form a Star (Y) around node {centre}: {names}"
+            "\nStar to Delta: R_ab = (R_a R_b + R_b R_c + R_c R_a) / R_c, giving "
+            f"{results}\n"
+        )
+    nodes = sorted(
+        {node for resistor in resistors for node in (resistor.start_node, resistor.end_node)}
+    )
+    return (
+        f"\nThe following resistors form a Delta (Δ) between nodes "
+        f"{nodes[0]}, {nodes[1]} and {nodes[2]}: {names}"
+        "\nDelta to Star: R_a = R_ab R_ca / (R_ab + R_bc + R_ca), giving "
+        f"{results}\n"
+    )
+
+
+def iter_part_text(part: Dict) -> Iterator[str]:
+    """Streams the explanation of a step in the explanatory_parts format"""
+    if part.get("transformation"):
+        yield transformation_text(
+            part["transformation"], part["transformed_resistors"], part["transformed_equivalents"]
+        )
+    parallel_resistors = [
+        resistor for resistors in part["parallel_resistors"].values() for resistor in resistors
+    ]
+    if parallel_resistors:
+        yield parallel_text(parallel_resistors, part["parallel_accumulation"])
+    if part["series_resistors"]:
+        yield series_text(part["series_resistors"], part["series_accumulation"])
@@ -0,0 +1,440 @@
+from __future__ import annotations
+from hashlib import blake2b
+from pathlib import Path
+from sys import intern
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+from src import errors
+from src.elementtable import (
+    CURRENT_SOURCE,
+    RESISTOR,
+    SYMBOL_KINDS,
+    VOLTAGE_SOURCE,
+    ElementTable,
+)
+from src.netlistreader import (
+    SUBCKT_DIRECTIVE,
+    ElementRecord,
+    element_record,
+    iter_logical_lines,
+)
+from src.ordering import GROUND_NODE
+from src.parameters import resolve_records
+from src.solver import MNAPattern
+import numpy as np
+from scipy.sparse.linalg import splu
+
+
+ENDS_DIRECTIVE = ".ends"
+INSTANCE_SYMBOL = "x"
+# the element kinds a macromodel can reduce (the DC resistive cells)
+REDUCIBLE_KINDS = (RESISTOR, VOLTAGE_SOURCE, CURRENT_SOURCE)
+# port conductances and injections below this fraction of the largest one are dropped
+MACROMODEL_TOLERANCE = 1e-12
+
+
+class InstanceRecord(NamedTuple):
+    """A subcircuit instance line (X<name> <node>... <subcircuit>) of a Netlist
+
+    Attributes
+        name: the name of the instance (x1, xcell, ...)
+        nodes: the node connected to every port of the subcircuit, in port order
+        subcircuit: the (lower case) name of the instantiated subcircuit
+        line_number: the line of the file where the instance starts
+    """
+
+    name: str
+    nodes: tuple
+    subcircuit: str
+    line_number: int
+
+
+class SubcircuitDefinition:
+    """ The body of a .subckt ... .ends block
+
+    The nodes of the body are local names (node 0 is the global ground); the
+    elements and instances keep them as tokens until the definition is reduced.
+
+    Attributes
+        name: the (lower case) name of the subcircuit
+        ports: the local names of the ports, in order
+        elements: the (name, symbol, start, end, value, line_number) element lines
+        instances: the nested subcircuit instances
+    """
+
+    def __init__(self, name: str, ports: List[str], line_number: int):
+        self.name = name
+        self.ports = ports
+        self.line_number = line_number
+        self.elements: List[tuple] = []
+        self.instances: List[InstanceRecord] = []
+        self._digest = blake2b(" ".join(ports).encode("utf-8"), digest_size=16)
+
+    def add_line(self, tokens: List[str], line_number: int):
+        self._digest.update(("\n" + " ".join(tokens)).encode("utf-8"))
+        if tokens[0][0].lower() == INSTANCE_SYMBOL:
+            self.instances.append(_instance_record(tokens, line_number, int_nodes=False))
+            return
+        if len(tokens) < 4:
+            raise errors.NetlistSyntaxError(
+                line_number, " ".join(tokens), "expected <name> <node> <node> <value>"
+            )
+        self.elements.append(
+            (tokens[0], tokens[0][0].lower(), tokens[1], tokens[2], tokens[-1], line_number)
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """A digest of the ports and body, shared by identical definitions"""
+        return self._digest.hexdigest()
+
+
+def _instance_record(tokens: List[str], line_number: int, int_nodes: bool = True) -> InstanceRecord:
+    if len(tokens) < 3 or any("=" in token for token in tokens):
+        raise errors.NetlistSyntaxError(
+            line_number, " ".join(tokens), "expected X<name> <node>... <subcircuit>"
+        )
+    nodes = tokens[1:-1]
+    if int_nodes:
+        try:
+            nodes = [int(node) for node in nodes]
+        except ValueError:
+            raise errors.NetlistSyntaxError(line_number, " ".join(tokens), "nodes must be integers")
+    return InstanceRecord(tokens[0], tuple(nodes), tokens[-1].lower(), line_number)
+
+
+class Macromodel:
+    """ The port equivalent of a subcircuit: I_ports = conductance @ V_ports - injection
+
+    The conductance matrix is the Schur complement of the MNA matrix of the cell
+    onto its ports, and the injection the currents its sources push into the ports
+    when they are grounded. Both are realized with plain elements, so an instance
+    costs a handful of table rows whatever the size of the cell: a resistor between
+    every pair of coupled ports, a resistor from every port with a net conductance
+    to ground, and a current source from ground into every port with an injection.
+
+    Attributes
+        name: the name of the subcircuit
+        ports: the local names of the ports
+        conductance: the port conductance matrix, (ports, ports)
+        injection: the port current injections, (ports,)
+    """
+
+    def __init__(self, name: str, ports: List[str], conductance: np.ndarray, injection: np.ndarray):
+        self.name = name
+        self.ports = ports
+        self.conductance = conductance
+        self.injection = injection
+
+        port_count = len(ports)
+        scale = max(float(np.max(np.abs(conductance), initial=0.0)), 1e-300)
+        first, second = np.triu_indices(port_count, k=1)
+        coupling = -(conductance[first, second] + conductance[second, first]) / 2
+        to_ground = conductance.sum(axis=1)
+        coupled = np.abs(coupling) > MACROMODEL_TOLERANCE * scale
+        grounded = np.abs(to_ground) > MACROMODEL_TOLERANCE * scale
+        injected = np.abs(injection) > MACROMODEL_TOLERANCE * max(
+            float(np.max(np.abs(injection), initial=0.0)), 1e-300
+        )
+        ports_index = np.arange(port_count)
+
+        # equivalent elements in port index space, -1 standing for the ground
+        self.kind = np.concatenate(
+            (
+                np.full(coupled.sum() + grounded.sum(), RESISTOR),
+                np.full(injected.sum(), CURRENT_SOURCE),
+            )
+        ).astype(np.uint8)
+        self.start_port = np.concatenate(
+            (first[coupled], ports_index[grounded], np.full(injected.sum(), -1))
+        )
+        self.end_port = np.concatenate(
+            (second[coupled], np.full(grounded.sum(), -1), ports_index[injected])
+        )
+        self.value = np.concatenate(
+            (1 / coupling[coupled], 1 / to_ground[grounded], injection[injected])
+        )
+        self.labels = (
+            [f"r.{ports[a]}.{ports[b]}" for a, b in zip(first[coupled], second[coupled])]
+            + [f"r.{ports[a]}.0" for a in ports_index[grounded]]
+            + [f"i.{ports[a]}" for a in ports_index[injected]]
+        )
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    @classmethod
+    def reduce(cls, definition: SubcircuitDefinition, library: SubcircuitLibrary) -> Macromodel:
+        """Reduces a subcircuit definition to its port equivalent
+
+        Raises:
+            errors.SubcircuitError: when the cell holds capacitors or inductors, or its
+                internal nodes are not uniquely determined by the port voltages
+        """
+        ports = definition.ports
+        local_nodes: Dict[str, int] = {str(GROUND_NODE): GROUND_NODE}
+        for port in ports:
+            if port in local_nodes:
+                raise errors.SubcircuitError(definition.name, f"port {port} is repeated or ground")
+            local_nodes[port] = len(local_nodes)
+
+        def local(node: str) -> int:
+            return local_nodes.setdefault(node, len(local_nodes))
+
+        for name, symbol, _, _, _, line_number in definition.elements:
+            if SYMBOL_KINDS.get(symbol) not in REDUCIBLE_KINDS:
+                raise errors.SubcircuitError(
+                    definition.name,
+                    f"{name} (line {line_number}) cannot be part of a DC macromodel",
+                )
+        records = [
+            ElementRecord(name, symbol, local(start), local(end), value, line_number)
+            for name, symbol, start, end, value, line_number in definition.elements
+        ]
+        tables = [ElementTable.from_records(records)]
+        for instance in definition.instances:
+            nodes = np.array([local(node) for node in instance.nodes], dtype=np.int64)
+            tables.append(library.expand([instance], nodes[None, :]))
+        cell = ElementTable.concatenate(tables)
+
+        conductance = np.zeros((len(ports), len(ports)))
+        injection = np.zeros(len(ports))
+        if len(cell):
+            pattern = MNAPattern(cell)
+            port_nodes = np.arange(1, len(ports) + 1)
+            solved = np.isin(port_nodes, pattern.nodes)
+            port_rows = pattern.node_index(port_nodes[solved])
+            internal = np.setdiff1d(np.arange(pattern.size), port_rows)
+            matrix = pattern.matrix(cell.value).tocsc()
+            rhs = pattern.rhs(cell.value)
+            reduced = matrix[port_rows][:, port_rows].toarray()
+            reduced_rhs = rhs[port_rows]
+            if len(internal):
+                try:
+                    lu = splu(matrix[internal][:, internal].tocsc())
+                except RuntimeError:
+                    raise errors.SubcircuitError(
+                        definition.name, "the internal nodes are floating or shorted"
+                    )
+                coupling = matrix[port_rows][:, internal]
+                reduced -= coupling @ lu.solve(matrix[internal][:, port_rows].toarray())
+                reduced_rhs = reduced_rhs - coupling @ lu.solve(rhs[internal])
+            if not np.all(np.isfinite(reduced)) or not np.all(np.isfinite(reduced_rhs)):
+                raise errors.SubcircuitError(definition.name, "the cell cannot be reduced")
+            conductance[np.ix_(solved, solved)] = reduced
+            injection[solved] = reduced_rhs
+        return cls(definition.name, ports, conductance, injection)
+
+    def expand(self, names: List[str], port_nodes: np.ndarray) -> ElementTable:
+        """Stamps the equivalent elements of many instances of the macromodel
+
+        Parameters:
+            names (List[str]): the name of every instance, used to tag its elements
+            port_nodes (np.ndarray): the node of every port of every instance, (instances, ports)
+
+        Returns:
+            ElementTable: the equivalent elements, tagged <symbol><instance>.<label>
+        """
+        padded = np.concatenate(
+            (port_nodes, np.full((len(port_nodes), 1), GROUND_NODE, dtype=np.int64)), axis=1
+        )
+        start_node = padded[:, self.start_port]
+        end_node = padded[:, self.end_port]
+        kept = start_node != end_node
+        tags = [
+            intern(f"{label[0]}{name}{label[1:]}")
+            for name, row in zip(names, kept)
+            for label, keep in zip(self.labels, row)
+            if keep
+        ]
+        instances = len(port_nodes)
+        return ElementTable(
+            kind=np.broadcast_to(self.kind, (instances, len(self)))[kept],
+            start_node=start_node[kept],
+            end_node=end_node[kept],
+            value=np.broadcast_to(self.value, (instances, len(self)))[kept],
+            tags=tags,
+        )
+
+
+class SubcircuitLibrary:
+    """ The subcircuit definitions of a Netlist and their cached macromodels
+
+    Every distinct definition (by content fingerprint) is reduced once, the first
+    time it is instantiated, and its macromodel is shared by every instance.
+
+    Attributes
+        definitions: the definitions, by (lower case) name
+        reductions: the number of definitions reduced so far
+    """
+
+    def __init__(self):
+        self.definitions: Dict[str, SubcircuitDefinition] = {}
+        self._macromodels: Dict[str, Macromodel] = {}
+        self._reducing: Set[str] = set()
+        self.reductions = 0
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def add(self, definition: SubcircuitDefinition):
+        if definition.name in self.definitions:
+            raise errors.SubcircuitError(definition.name, "the subcircuit is defined twice")
+        self.definitions[definition.name] = definition
+
+    def macromodel(self, name: str) -> Macromodel:
+        """Returns the (cached) macromodel of a subcircuit
+
+        Raises:
+            errors.SubcircuitError: when the subcircuit is unknown or instantiates itself
+        """
+        definition = self.definitions.get(name)
+        if definition is None:
+            raise errors.SubcircuitError(name, "the subcircuit is not defined")
+        macromodel = self._macromodels.get(definition.fingerprint)
+        if macromodel is None:
+            if name in self._reducing:
+                raise errors.SubcircuitError(name, "the subcircuit instantiates itself")
+            self._reducing.add(name)
+            try:
+                macromodel = Macromodel.reduce(definition, self)
+            finally:
+                self._reducing.discard(name)
+            self._macromodels[definition.fingerprint] = macromodel
+            self.reductions += 1
+        return macromodel
+
+    def expand(
+        self, instances: List[InstanceRecord], port_nodes: Optional[np.ndarray] = None
+    ) -> ElementTable:
+        """Stamps the macromodel elements of subcircuit instances
+
+        Parameters:
+            instances (List[InstanceRecord]): the instances
+            port_nodes (Optional[np.ndarray]): the nodes of the instances, (instances, ports),
+                defaults to the (integer) nodes of the records
+
+        Returns:
+            ElementTable: the equivalent elements of every instance, in instance order
+                within every subcircuit
+        """
+        groups: Dict[str, List[int]] = {}
+        for position, instance in enumerate(instances):
+            groups.setdefault(instance.subcircuit, []).append(position)
+        tables = []
+        for name, positions in groups.items():
+            macromodel = self.macromodel(name)
+            for position in positions:
+                instance = instances[position]
+                if len(instance.nodes) != len(macromodel.ports):
+                    raise errors.NetlistSyntaxError(
+                        instance.line_number,
+                        instance.name,
+                        f"{name} has {len(macromodel.ports)} ports, "
+                        f"got {len(instance.nodes)} nodes",
+                    )
+            if port_nodes is None:
+                nodes = np.array(
+                    [instances[position].nodes for position in positions], dtype=np.int64
+                )
+            else:
+                nodes = port_nodes[positions]
+            nodes = nodes.reshape(len(positions), len(macromodel.ports))
+            tables.append(macromodel.expand([instances[p].name for p in positions], nodes))
+        if not tables:
+            return ElementTable([], [], [], [], [])
+        return ElementTable.concatenate(tables)
+
+
+def parse_hierarchical(
+    lines: Iterable[str], has_title: bool = True, directives: Optional[List[tuple]] = None
+) -> Tuple[List[ElementRecord], List[InstanceRecord], SubcircuitLibrary]:
+    """Splits a Netlist into its top level elements, instances and subcircuit definitions
+
+    Parameters:
+        lines (Iterable[str]): the physical lines of the Netlist (e.g. an open file)
+        has_title (bool): whether the first line is a title line (SPICE convention)
+        directives (Optional[List[tuple]]): collects the (line_number, tokens) of the
+            top level directive lines (.param, .step, ...)
+
+    Returns:
+        Tuple: the top level element records, the top level instances and the library
+    """
+    records: List[ElementRecord] = []
+    instances: List[InstanceRecord] = []
+    library = SubcircuitLibrary()
+    definition: Optional[SubcircuitDefinition] = None
+
+    for line_number, tokens in iter_logical_lines(lines, has_title=has_title):
+        directive = tokens[0].lower()
+        if directive == SUBCKT_DIRECTIVE:
+            if definition is not None or len(tokens) < 2:
+                raise errors.NetlistSyntaxError(
+                    line_number,
+                    " ".join(tokens),
+                    "expected .subckt <name> <port>... outside subcircuits",
+                )
+            definition = SubcircuitDefinition(tokens[1].lower(), tokens[2:], line_number)
+        elif directive == ENDS_DIRECTIVE:
+            if definition is None:
+                raise errors.NetlistSyntaxError(
+                    line_number, " ".join(tokens), ".ends without .subckt"
+                )
+            library.add(definition)
+            definition = None
+        elif directive.startswith("."):
+            if directives is not None and definition is None:
+                directives.append((line_number, tokens))
+        elif definition is not None:
+            definition.add_line(tokens, line_number)
+        elif directive[0] == INSTANCE_SYMBOL:
+            instances.append(_instance_record(tokens, line_number))
+        else:
+            records.append(element_record(tokens, line_number))
+
+    if definition is not None:
+        raise errors.NetlistSyntaxError(
+            definition.line_number, definition.name, "the subcircuit has no .ends"
+        )
+    return records, instances, library
+
+
+def hierarchical_table(
+    lines: Iterable[str], has_title: bool = True, library: Optional[SubcircuitLibrary] = None
+) -> ElementTable:
+    """Reads a Netlist with subcircuits into an element table
+
+    The top level elements come first, in file order, followed by the macromodel
+    elements of every instance. The {...} values of the top level elements are
+    evaluated at the nominal .param values.
+
+    Parameters:
+        lines (Iterable[str]): the physical lines of the Netlist (e.g. an open file)
+        has_title (bool): whether the first line is a title line (SPICE convention)
+        library (Optional[SubcircuitLibrary]): a library to add the definitions to,
+            sharing its macromodels across Netlists
+
+    Returns:
+        ElementTable: the table of the elements
+    """
+    directives: List[tuple] = []
+    records, instances, definitions = parse_hierarchical(
+        lines, has_title=has_title, directives=directives
+    )
+    records = resolve_records(records, directives)
+    if library is None:
+        library = definitions
+    else:
+        for definition in definitions.definitions.values():
+            library.definitions[definition.name] = definition
+    table = ElementTable.from_records(records)
+    if not instances:
+        return table
+    return ElementTable.concatenate((table, library.expand(instances)))
+
+
+def read_hierarchical_table(
+    file_path: Union[str, Path], library: Optional[SubcircuitLibrary] = None
+) -> ElementTable:
+    """Reads a Netlist file with subcircuits into an element table (see hierarchical_table)"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return hierarchical_table(f, library=library)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from src import errors
+from src.elementtable import ElementTable
+from src.ordering import GROUND_NODE
+from src.parameters import (
+    Sweep,
+    evaluate,
+    is_expression,
+    parameter_definitions,
+    parse_sweep_directives,
+    resolve_parameters,
+    resolve_records,
+)
+from src.profiling import stage
+from src.solver import DENSE_BATCH_LIMIT, MNAPattern
+from src.subcircuit import parse_hierarchical
+from src.topology import TopologyIndex
+import os
+import numpy as np
+
+
+DEFAULT_CHUNK_SIZE = 1024
+# below this number of points, or for circuits small enough for the dense batched
+# solve, the points are solved in this process
+PARALLEL_MIN_POINTS = 256
+# the chunks submitted ahead of the one being streamed, per worker
+PENDING_CHUNKS_PER_WORKER = 2
+
+
+class SweepPoint(NamedTuple):
+    """The DC operating point of one point of a sweep
+
+    Attributes
+        index: the index of the point, the first sweep varying fastest
+        parameters: the value of every parameter and swept element value at the point
+        nodes: the non-ground node numbers
+        node_voltages: the voltage of every node in `nodes`
+        element_currents: the current through every element, in element table order
+    """
+
+    index: int
+    parameters: Dict[str, float]
+    nodes: np.ndarray
+    node_voltages: np.ndarray
+    element_currents: np.ndarray
+
+    def get_node_voltage(self, node: int) -> float:
+        """Returns the voltage of a node at the point, 0 for the ground (`nodes` is sorted)
+
+        Raises:
+            KeyError: when the node is not part of the circuit
+        """
+        if node == GROUND_NODE:
+            return 0.0
+        row = np.searchsorted(self.nodes, node)
+        if row == len(self.nodes) or self.nodes[row] != node:
+            raise KeyError(node)
+        return float(self.node_voltages[row])
+
+
+class ParametricNetlist:
+    """ A Netlist with .param expressions and .step/.dc sweeps, parsed once
+
+    The topology is read, validated and its MNA pattern built once; every point of
+    the sweeps only changes element values. The points are evaluated in chunks, the
+    parameters and expressions as arrays over the points of a chunk, and every chunk
+    is solved as one batch (see MNAPattern.solve_batch), in this process or in a
+    pool of workers that each build the pattern once.
+
+        netlist = ParametricNetlist.read("divider.asc")
+        for point in netlist.run():
+            print(point.parameters["R0"], point.get_node_voltage(2))
+
+    Attributes
+        element_table: the elements, with their values at the nominal parameters
+        expressions: the {...} expression of the value of the element rows that have one
+        definitions: the .param expression of every parameter
+        sweeps: the nested sweeps, the first one varying fastest
+        shape: the number of points of every sweep
+    """
+
+    def __init__(
+        self,
+        element_table: ElementTable,
+        expressions: Dict[int, str],
+        definitions: Dict[str, str],
+        sweeps: List[Sweep],
+    ):
+        self.element_table = element_table
+        self.expressions = expressions
+        self.definitions = definitions
+        self.topology = TopologyIndex(element_table).validate()
+        self._pattern: Optional[MNAPattern] = None
+
+        columns = {tag.lower(): column for column, tag in enumerate(element_table.tags)}
+        self.sweeps: List[Sweep] = []
+        self._element_columns: Dict[str, int] = {}
+        for sweep in sweeps:
+            if not sweep.is_parameter and sweep.name.lower() in columns:
+                self._element_columns[sweep.name] = columns[sweep.name.lower()]
+            elif sweep.name not in definitions and not sweep.is_parameter:
+                raise errors.ParameterError(
+                    sweep.name, "it is neither an element nor a .param parameter"
+                )
+            else:
+                sweep = sweep._replace(is_parameter=True)
+            self.sweeps.append(sweep)
+        self.shape = tuple(len(sweep.values) for sweep in self.sweeps)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], has_title: bool = True) -> ParametricNetlist:
+        """Parses the lines of a Netlist with its directives
+
+        Subcircuit instances are replaced by their macromodels, computed at the
+        nominal values: only the top level elements can depend on the sweeps.
+
+        Parameters:
+            lines (Iterable[str]): the physical lines of the Netlist (e.g. an open file)
+            has_title (bool): whether the first line is a title line (SPICE convention)
+        """
+        directives: List[tuple] = []
+        records, instances, library = parse_hierarchical(
+            lines, has_title=has_title, directives=directives
+        )
+        expressions = {
+            row: record.value for row, record in enumerate(records) if is_expression(record.value)
+        }
+        table = ElementTable.from_records(resolve_records(records, directives))
+        if instances:
+            table = ElementTable.concatenate((table, library.expand(instances)))
+        definitions = parameter_definitions(directives)
+        return cls(table, expressions, definitions, parse_sweep_directives(directives))
+
+    @classmethod
+    def read(cls, file_path: Union[str, Path]) -> ParametricNetlist:
+        """Parses a Netlist file with its directives (see from_lines)"""
+        with open(file_path, "r", encoding="utf-8") as f:
+            return cls.from_lines(f)
+
+    def __len__(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def pattern(self) -> MNAPattern:
+        """The MNA pattern of the topology, shared by every point"""
+        if self._pattern is None:
+            self._pattern = MNAPattern(self.element_table)
+        return self._pattern
+
+    def values(self, begin: int = 0, end: Optional[int] = None) -> Tuple[Dict, np.ndarray]:
+        """Evaluates the parameters and element values of a range of points
+
+        Parameters:
+            begin (int): the first point
+            end (Optional[int]): the point after the last one, every point by default
+
+        Raises:
+            errors.ParameterError: when an expression cannot be evaluated
+
+        Returns:
+            Tuple: the parameters and swept element values of the points, as arrays of
+                (points,), and the element values, (points, elements)
+        """
+        end = len(self) if end is None else min(end, len(self))
+        points = np.arange(begin, end)
+        indices = np.unravel_index(points, self.shape, order="F") if self.shape else ()
+        swept = {
+            sweep.name: sweep.values[index] for sweep, index in zip(self.sweeps, indices)
+        }
+        parameters = resolve_parameters(
+            self.definitions,
+            {name: value for name, value in swept.items() if name not in self._element_columns},
+        )
+        values = np.repeat(self.element_table.value[np.newaxis, :], len(points), axis=0)
+        for row, expression in self.expressions.items():
+            values[:, row] = evaluate(expression, parameters)
+        for name, column in self._element_columns.items():
+            values[:, column] = swept[name]
+            parameters[name] = swept[name]
+        return (
+            {name: np.broadcast_to(value, points.shape) for name, value in parameters.items()},
+            values,
+        )
+
+    def run(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None
+    ) -> Iterator[SweepPoint]:
+        """Solves the DC operating point of every point, streamed in point order
+
+        Parameters:
+            chunk_size (int): the number of points evaluated and solved together
+            workers (Optional[int]): the number of processes, 0 or 1 to solve in this
+                process; defaults to the number of CPUs for circuits too large for the
+                dense batched solve with more than PARALLEL_MIN_POINTS points
+
+        Raises:
+            errors.ParameterError: when an expression cannot be evaluated
+
+        Returns:
+            Iterator[SweepPoint]: the solution of every point
+        """
+        pattern = self.pattern
+        if workers is None:
+            parallel = pattern.size > DENSE_BATCH_LIMIT and len(self) > PARALLEL_MIN_POINTS
+            workers = (os.cpu_count() or 1) if parallel else 1
+        chunks = range(0, len(self), max(chunk_size, 1))
+        if workers <= 1 or len(chunks) <= 1:
+            for begin in chunks:
+                parameters, values = self.values(begin, begin + chunk_size)
+                with stage("sweep", elements=values.size):
+                    x = pattern.solve_batch(values)
+                yield from self._points(begin, parameters, values, x)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(self.element_table,),
+        ) as executor:
+            pending: deque = deque()
+            for begin in chunks:
+                parameters, values = self.values(begin, begin + chunk_size)
+                pending.append((begin, parameters, values, executor.submit(_solve_chunk, values)))
+                if len(pending) > PENDING_CHUNKS_PER_WORKER * workers:
+                    begin, parameters, values, future = pending.popleft()
+                    yield from self._points(begin, parameters, values, future.result())
+            while pending:
+                begin, parameters, values, future = pending.popleft()
+                yield from self._points(begin, parameters, values, future.result())
+
+    def _points(
+        self, begin: int, parameters: Dict, values: np.ndarray, x: np.ndarray
+    ) -> Iterator[SweepPoint]:
+        pattern = self.pattern
+        node_voltages = pattern.node_voltages(x)
+        element_currents = pattern.element_currents(x, values)
+        for offset in range(len(x)):
+            yield SweepPoint(
+                begin + offset,
+                {name: float(value[offset]) for name, value in parameters.items()},
+                pattern.nodes,
+                node_voltages[offset],
+                element_currents[offset],
+            )
+
+
+_worker_pattern: Optional[MNAPattern] = None
+
+
+def _initialize_worker(element_table: ElementTable):
+    global _worker_pattern
+    _worker_pattern = MNAPattern(element_table)
+
+
+def _solve_chunk(values: np.ndarray) -> np.ndarray:
+    return _worker_pattern.solve_batch(values)
+
@@ -0,0 +1,162 @@
+from __future__ import annotations
+from typing import List, Tuple
+from src import errors
+from src.elementtable import CURRENT_SOURCE, INDUCTOR, VOLTAGE_SOURCE, ElementTable
+from src.ordering import GROUND_NODE, NodeNumbering
+from src.profiling import instrumented
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+
+class TopologyIndex:
+    """ The node to element incidence of a circuit, built once when a Netlist is loaded
+
+    The terminals of the elements are sorted by node into a CSR-like adjacency, so
+    the elements incident to a node are a slice instead of a scan of every element.
+    The structural checks (validate) run on the same dense node index with sparse
+    connected components, and never look at the element values.
+
+    Attributes
+        element_table: the elements of the circuit
+        numbering: the dense index of every node, the ground being 0
+        start_index, end_index: the dense index of the terminals of every element
+        indptr: the start of the incident elements of every dense node in `incident`
+        incident: the incident elements of every node, concatenated (an element
+            connecting a node to itself appears twice)
+    """
+
+    @instrumented("index")
+    def __init__(self, element_table: ElementTable):
+        self.element_table = element_table
+        self.numbering = NodeNumbering(
+            np.concatenate(([GROUND_NODE], element_table.start_node, element_table.end_node))
+        )
+        self.start_index = self.numbering.index(element_table.start_node)
+        self.end_index = self.numbering.index(element_table.end_node)
+        terminals = np.concatenate((self.start_index, self.end_index))
+        elements = np.tile(np.arange(len(element_table), dtype=np.int64), 2)
+        self.incident = elements[np.lexsort((elements, terminals))]
+        self.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(terminals, minlength=self.numbering.node_count)))
+        )
+        self._connected = None
+
+    @property
+    def nodes(self) -> np.ndarray:
+        """The node numbers, ground first"""
+        return self.numbering.nodes
+
+    def degree(self, node: int) -> int:
+        """Returns the number of element terminals connected to a node"""
+        index = int(self.numbering.index(node))
+        return int(self.indptr[index + 1] - self.indptr[index])
+
+    def incident_elements(self, node: int) -> np.ndarray:
+        """Returns the rows of the elements connected to a node, in table order
+
+        Raises:
+            KeyError: when no element is connected to the node
+        """
+        index = int(self.numbering.index(node))
+        return self.incident[self.indptr[index] : self.indptr[index + 1]]
+
+    def connection_counts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Counts the elements connecting every distinct pair of nodes
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: the (n, 2) node pairs, in the order of their
+            first element, and the number of elements between every pair
+        """
+        pairs, first, counts = np.unique(
+            self.element_table.connection_nodes(), axis=0, return_index=True, return_counts=True
+        )
+        order = np.argsort(first)
+        return pairs[order], counts[order]
+
+    def _grounded(self, elements: np.ndarray) -> np.ndarray:
+        """Returns whether every dense node is connected to the ground through `elements`"""
+        node_count = self.numbering.node_count
+        graph = sp.coo_matrix(
+            (np.ones(len(elements)), (self.start_index[elements], self.end_index[elements])),
+            shape=(node_count, node_count),
+        ).tocsr()
+        _, components = connected_components(graph, directed=False)
+        return components == components[0]
+
+    @property
+    def connected(self) -> np.ndarray:
+        """Whether every dense node has a path to the ground through any element"""
+        if self._connected is None:
+            self._connected = self._grounded(np.arange(len(self.element_table)))
+        return self._connected
+
+    def floating_nodes(self) -> np.ndarray:
+        """Returns the nodes with no path to the ground through any element"""
+        return self.nodes[~self.connected]
+
+    def current_source_cutsets(self) -> np.ndarray:
+        """Returns the nodes only connected to the ground through current sources"""
+        without_sources = self._grounded(
+            np.flatnonzero(self.element_table.kind != CURRENT_SOURCE)
+        )
+        return self.nodes[self.connected & ~without_sources]
+
+    def voltage_source_loops(self) -> List[str]:
+        """Returns the tags of the voltage sources and inductors closing a loop of them,
+        the inductors being the shorts of the DC analysis"""
+        # a union-find of the nodes joined by voltage sources, the roots are not stored
+        parent = {}
+
+        def root(node):
+            while node in parent:
+                # path halving
+                parent[node] = parent.get(parent[node], parent[node])
+                node = parent[node]
+            return node
+
+        loops = []
+        table = self.element_table
+        sources = np.sort(
+            np.concatenate((table.indices(VOLTAGE_SOURCE), table.indices(INDUCTOR)))
+        )
+        for source, start, end in zip(
+            sources.tolist(),
+            self.start_index[sources].tolist(),
+            self.end_index[sources].tolist(),
+        ):
+            start, end = root(start), root(end)
+            if start == end:
+                loops.append(self.element_table.tags[source])
+            else:
+                parent[start] = end
+        return loops
+
+    @instrumented("validate", elements=lambda index: len(index.element_table))
+    def validate(self) -> TopologyIndex:
+        """Checks that the connectivity of the circuit can give a unique solution
+
+        Raises:
+            errors.MissingGroundError: when no element is connected to the ground
+            errors.FloatingNodeError: when nodes have no path to the ground
+            errors.VoltageSourceLoopError: when voltage sources and inductors form a loop
+            errors.CurrentSourceCutsetError: when nodes only reach the ground through
+                current sources
+
+        Returns:
+            TopologyIndex: the index itself
+        """
+        if not len(self.element_table):
+            return self
+        if self.indptr[1] == 0:
+            raise errors.MissingGroundError()
+        floating = self.floating_nodes()
+        if len(floating):
+            raise errors.FloatingNodeError(floating.tolist())
+        loops = self.voltage_source_loops()
+        if loops:
+            raise errors.VoltageSourceLoopError(loops)
+        cutsets = self.current_source_cutsets()
+        if len(cutsets):
+            raise errors.CurrentSourceCutsetError(cutsets.tolist())
+        return self
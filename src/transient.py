@@ -0,0 +1,293 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+from src import errors
+from src.elementtable import CAPACITOR, INDUCTOR, RESISTOR, ElementTable
+from src.solver import MNAFactorization, MNAPattern
+import numpy as np
+
+
+BACKWARD_EULER = "backward_euler"
+TRAPEZOIDAL = "trapezoidal"
+INTEGRATION_METHODS = {BACKWARD_EULER: 1.0, TRAPEZOIDAL: 2.0}
+
+MAX_STEP_HALVINGS = 30
+INITIAL_STEP_HALVINGS = 8
+
+
+class WaveformArray:
+    """ Transient waveforms kept in memory, in a preallocated array
+
+    The array is allocated for `capacity` time points and only grows (doubling) when
+    an adaptive run needs more points.
+
+    Attributes
+        columns: the name of every column (V(node) and I(element) signals)
+        times: the time of every recorded point
+        values: the signals of every recorded point, (points, columns)
+    """
+
+    def __init__(self, columns: List[str], capacity: int = 1024):
+        self.columns = columns
+        self._times = np.empty(max(capacity, 1))
+        self._values = np.empty((max(capacity, 1), len(columns)))
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, time: float, row: np.ndarray):
+        if self._length == len(self._times):
+            self._times = np.concatenate((self._times, np.empty(len(self._times))))
+            self._values = np.concatenate((self._values, np.empty_like(self._values)))
+        self._times[self._length] = time
+        self._values[self._length] = row
+        self._length += 1
+
+    def close(self):
+        pass
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[: self._length]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[: self._length]
+
+    def signal(self, column: str) -> np.ndarray:
+        """Returns the waveform of one column (e.g. "V(2)")"""
+        return self.values[:, self.columns.index(column)]
+
+
+class WaveformFile:
+    """ Transient waveforms streamed to a binary file
+
+    Every point is written as a row of float64 values (time followed by the
+    columns); rows are buffered and flushed in chunks so memory use is constant
+    whatever the number of time steps.
+
+    Attributes
+        path: the path of the binary file
+        columns: the name of every column (V(node) and I(element) signals)
+    """
+
+    def __init__(self, path: Union[str, Path], columns: List[str], chunk_rows: int = 4096):
+        self.path = Path(path)
+        self.columns = columns
+        self._buffer = np.empty((chunk_rows, len(columns) + 1))
+        self._buffered = 0
+        self._length = 0
+        self._file = open(self.path, "wb")
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, time: float, row: np.ndarray):
+        self._buffer[self._buffered, 0] = time
+        self._buffer[self._buffered, 1:] = row
+        self._buffered += 1
+        self._length += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        self._buffer[: self._buffered].tofile(self._file)
+        self._buffered = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    @classmethod
+    def load(cls, path: Union[str, Path], columns: List[str], mmap: bool = True) -> np.ndarray:
+        """Loads a waveform file as a (points, 1 + columns) array, memory-mapped by default"""
+        width = len(columns) + 1
+        if mmap:
+            return np.memmap(path, dtype=np.float64, mode="r").reshape(-1, width)
+        return np.fromfile(path, dtype=np.float64).reshape(-1, width)
+
+
+class TransientAnalysis:
+    """ Time-domain simulation of R, L, C and source circuits with companion models
+
+    Capacitors and inductors are replaced at every step by their backward Euler or
+    trapezoidal companion model: a conductance (C/h or h/L scaled by the method) in
+    parallel with a current source carrying the history. The matrix therefore only
+    depends on the step size h and is factorized once per step size; every step is
+    then a right hand side update and a back-substitution. The simulation starts
+    from a zero state (uncharged capacitors, no inductor current).
+
+    Attributes
+        element_table: the elements of the circuit
+        method: the integration method (BACKWARD_EULER or TRAPEZOIDAL)
+        columns: the name of every recorded signal
+        factorizations: the number of matrix factorizations done so far
+    """
+
+    def __init__(
+        self,
+        element_table: ElementTable,
+        method: str = TRAPEZOIDAL,
+        sources: Optional[Dict[int, Callable[[float], float]]] = None,
+    ):
+        if method not in INTEGRATION_METHODS:
+            raise ValueError(f"unknown integration method {method!r}")
+        self.element_table = element_table
+        self.method = method
+        self._order = INTEGRATION_METHODS[method]
+        self.sources = sources or {}
+
+        self.capacitors = element_table.indices(CAPACITOR)
+        self.inductors = element_table.indices(INDUCTOR)
+        self.pattern = MNAPattern(
+            element_table,
+            conductance_elements=np.concatenate(
+                (element_table.indices(RESISTOR), self.capacitors, self.inductors)
+            ),
+        )
+        self._incidence = self.pattern.incidence()
+        self._values = np.array(element_table.value, dtype=np.float64)
+        self._factorizations: Dict[tuple, MNAFactorization] = {}
+        self.factorizations = 0
+
+        self.columns = [f"V({node})" for node in self.pattern.nodes.tolist()] + [
+            f"I({element_table.tags[index]})"
+            for index in np.concatenate((self.pattern.voltage_sources, self.inductors)).tolist()
+        ]
+
+    def _factorization(self, step: float, order: float) -> MNAFactorization:
+        factorization = self._factorizations.get((step, order))
+        if factorization is None:
+            conductances = self.pattern.conductances(self._values)
+            conductances[self.capacitors] = order * self._values[self.capacitors] / step
+            conductances[self.inductors] = step / (order * self._values[self.inductors])
+            factorization = self.pattern.factorize_matrix(
+                self.pattern.conductance_matrix(conductances)
+            )
+            self._factorizations[(step, order)] = factorization
+            self.factorizations += 1
+        return factorization
+
+    def _source_values(self, time: float) -> np.ndarray:
+        if not self.sources:
+            return self._values
+        values = self._values.copy()
+        for index, waveform in self.sources.items():
+            values[index] = waveform(time)
+        return values
+
+    def _step(self, state: tuple, time: float, step: float, order: float) -> tuple:
+        """Integrates the circuit over one step from a state (x, voltages, currents)"""
+        _, voltages, currents = state
+        c, l = self.capacitors, self.inductors
+        history = np.zeros(len(self._values))
+        capacitor_conductance = order * self._values[c] / step
+        inductor_conductance = step / (order * self._values[l])
+        history[c] = capacitor_conductance * voltages[c]
+        history[l] = -currents[l]
+        if order == INTEGRATION_METHODS[TRAPEZOIDAL]:
+            history[c] += currents[c]
+            history[l] -= inductor_conductance * voltages[l]
+
+        rhs = self.pattern.rhs(self._source_values(time + step)) + self._incidence @ history
+        x = self._factorization(step, order).solve(rhs)
+        new_voltages = self._incidence.T @ x
+        new_currents = np.zeros(len(self._values))
+        new_currents[c] = capacitor_conductance * new_voltages[c] - history[c]
+        new_currents[l] = inductor_conductance * new_voltages[l] - history[l]
+        return x, new_voltages, new_currents
+
+    def _record(self, output, time: float, state: tuple):
+        x, _, currents = state
+        output.append(time, np.concatenate((x, currents[self.inductors])))
+
+    def run(
+        self,
+        stop_time: float,
+        step: float,
+        adaptive: bool = False,
+        min_step: Optional[float] = None,
+        reltol: float = 1e-3,
+        abstol: float = 1e-6,
+        output: Optional[Union[WaveformArray, WaveformFile, str, Path]] = None,
+    ):
+        """Simulates the circuit from 0 to stop_time
+
+        With `adaptive`, the local truncation error is estimated from the difference
+        between the solution and its linear extrapolation from the previous points:
+        steps above tolerance are rejected and retried with half the step, and the
+        step doubles (up to `step`) while the error stays small. The step sizes are
+        restricted to step / 2^k so that their factorizations are reused.
+
+        Parameters:
+            stop_time (float): the end of the simulation
+            step (float): the time step (the largest one when adaptive)
+            adaptive (bool): whether to control the time step from the error estimate
+            min_step (Optional[float]): the smallest allowed step, defaults to step / 2^30
+            reltol (float): the relative error tolerance of the node voltages
+            abstol (float): the absolute error tolerance of the node voltages
+            output: the waveform writer, or a file path to stream the waveforms to;
+                defaults to a preallocated WaveformArray
+
+        Returns:
+            Union[WaveformArray, WaveformFile]: the (closed) waveform writer
+        """
+        if step <= 0 or stop_time <= 0:
+            raise ValueError("the step and the stop time must be positive")
+        if output is None:
+            output = WaveformArray(self.columns, capacity=int(np.ceil(stop_time / step)) + 1)
+        elif isinstance(output, (str, Path)):
+            output = WaveformFile(output, self.columns)
+        min_step = min_step or step / 2 ** MAX_STEP_HALVINGS
+
+        element_count = len(self._values)
+        state = (np.zeros(self.pattern.size), np.zeros(element_count), np.zeros(element_count))
+        previous_x, previous_step, error = None, None, None
+        time, current_step = 0.0, step
+        if adaptive:
+            # the first step is not error controlled, start small and let the step grow
+            current_step = max(step / 2 ** INITIAL_STEP_HALVINGS, min_step)
+        try:
+            while time < stop_time * (1 - 1e-12):
+                step_size = min(current_step, stop_time - time)
+                # the zero state does not hold the capacitor currents of t=0+, so the
+                # first step is always a (self-starting) backward Euler step
+                order = self._order if previous_x is not None else 1.0
+                new_state = self._step(state, time, step_size, order)
+                if adaptive and previous_x is not None:
+                    error = self._error_ratio(
+                        previous_x, previous_step, state[0], new_state[0], step_size, reltol, abstol
+                    )
+                    if error > 1 and step_size / 2 >= min_step:
+                        current_step = step_size / 2
+                        continue
+                previous_x, previous_step = state[0], step_size
+                state = new_state
+                time += step_size
+                self._record(output, time, state)
+                if error is not None and error < 0.25 and current_step * 2 <= step:
+                    current_step *= 2
+        finally:
+            output.close()
+        if not np.all(np.isfinite(state[0])):
+            raise errors.SingularCircuitError("the transient solution diverged")
+        return output
+
+    def _error_ratio(
+        self,
+        previous_x: np.ndarray,
+        previous_step: float,
+        x: np.ndarray,
+        new_x: np.ndarray,
+        step: float,
+        reltol: float,
+        abstol: float,
+    ) -> float:
+        """Returns the largest node voltage error over its tolerance, estimated from the
+        difference between the new solution and its linear extrapolation"""
+        nodes = slice(0, self.pattern.node_count)
+        predicted = x[nodes] + (x[nodes] - previous_x[nodes]) * (step / previous_step)
+        tolerance = reltol * np.abs(new_x[nodes]) + abstol
+        return float(np.max(np.abs(new_x[nodes] - predicted) / tolerance, initial=0.0))
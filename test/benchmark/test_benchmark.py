@@ -0,0 +1,129 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.benchmark import (
+    BenchmarkResult,
+    compare,
+    load_baseline,
+    main,
+    run_benchmarks,
+    save_baseline,
+)
+from src.elementtable import CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE
+from src.generators import (
+    GENERATORS,
+    format_values,
+    generate,
+    ladder,
+    series_parallel_tree,
+    write_generated_netlist,
+)
+from src.netlistparser import Netlist
+from src.reduction import ReductionEngine
+from src.solver import MNASystem
+
+
+class TestGenerators:
+    @pytest.mark.parametrize("family", list(GENERATORS))
+    @pytest.mark.parametrize("elements", [10, 1000])
+    def test_generated_circuits_solve(self, family, elements):
+        table = generate(family, elements)
+        assert elements / 2 <= len(table) <= elements
+        solution = MNASystem(table).solve()
+        assert np.all(np.isfinite(solution.node_voltages))
+
+    def test_deterministic(self):
+        first = generate("series_parallel", 500, seed=3)
+        second = generate("series_parallel", 500, seed=3)
+        assert np.array_equal(first.start_node, second.start_node)
+        assert np.array_equal(first.value, second.value)
+        assert not np.array_equal(first.value, generate("series_parallel", 500, seed=4).value)
+
+    def test_ladder_reduces_to_one_resistor(self):
+        table = ladder(201)
+        engine = ReductionEngine.from_table(table, record_steps=False).reduce()
+        assert engine.edge_count() == 1
+        resistance = MNASystem(table).solve().get_effective_resistance()
+        assert engine.get_resistors()[0].value == pytest.approx(resistance)
+
+    def test_series_parallel_tree_is_reducible(self):
+        engine = ReductionEngine.from_table(series_parallel_tree(2000), record_steps=False).reduce()
+        assert engine.edge_count() == 1
+
+    def test_star_delta_is_not_series_parallel(self):
+        table = generate("star_delta", 200)
+        engine = ReductionEngine.from_table(table, record_steps=False).reduce()
+        assert engine.edge_count() > 1
+
+    def test_multi_source(self):
+        table = generate("multi_source", 500)
+        assert np.count_nonzero(table.kind == VOLTAGE_SOURCE) > 1
+        assert np.count_nonzero(table.kind == CURRENT_SOURCE) > 0
+
+    def test_unknown_family(self):
+        with pytest.raises(ValueError):
+            generate("moebius", 10)
+
+    def test_text_roundtrip(self, tmp_path):
+        table = generate("grid", 300)
+        write_generated_netlist(table, tmp_path / "grid.asc")
+        parsed = Netlist.read_element_table(tmp_path / "grid.asc")
+        assert np.array_equal(parsed.kind, table.kind)
+        assert np.allclose(parsed.value, table.value, rtol=1e-6)
+
+    def test_format_values(self):
+        assert format_values(np.array([4700.0, 1.2e6, 82.0, 1e-3])).tolist() == [
+            "4.7k",
+            "1.2Meg",
+            "82",
+            "0.001",
+        ]
+
+
+class TestBenchmark:
+    def test_run_benchmarks(self):
+        results = run_benchmarks(["ladder", "grid"], [10, 100], repeat=1)
+        assert len(results) == 2 * 2 * 4
+        assert {result.stage for result in results} == {"parse", "convert_value", "reduce", "solve"}
+        assert all(result.seconds > 0 for result in results)
+        assert max(result.peak_bytes for result in results) > 0
+
+    def test_unknown_stage(self):
+        with pytest.raises(ValueError):
+            run_benchmarks(["ladder"], [10], stages=["compile"])
+
+    def test_baseline_roundtrip_and_compare(self, tmp_path):
+        results = [
+            BenchmarkResult("grid", 1000, "solve", 0.5, 1 << 20),
+            BenchmarkResult("grid", 1000, "parse", 0.0001, 1 << 10),
+        ]
+        save_baseline(results, tmp_path / "baseline.json")
+        baseline = load_baseline(tmp_path / "baseline.json")
+        assert compare(results, baseline) == []
+
+        slower = [
+            results[0]._replace(seconds=1.0, peak_bytes=1 << 21),
+            results[1]._replace(seconds=0.0005),
+        ]
+        regressions = compare(slower, baseline, tolerance=0.5)
+        assert [(regression.key, regression.metric) for regression in regressions] == [
+            ("grid/1000/solve", "seconds"),
+            ("grid/1000/solve", "peak_bytes"),
+        ]
+        assert regressions[0].ratio == pytest.approx(2.0)
+
+    def test_unsupported_baseline(self, tmp_path):
+        (tmp_path / "baseline.json").write_text(json.dumps({"version": 99, "results": {}}))
+        with pytest.raises(ValueError):
+            load_baseline(tmp_path / "baseline.json")
+
+    def test_main(self, tmp_path, capsys):
+        baseline = tmp_path / "baseline.json"
+        arguments = ["--families", "ladder", "--sizes", "10", "--repeat", "1"]
+        arguments += ["--baseline", str(baseline)]
+        assert main(arguments + ["--save"]) == 0
+        assert "ladder/9/solve" in json.loads(baseline.read_text())["results"]
+        assert main(arguments) == 0
+        assert "ladder/9/parse" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import json
+import multiprocessing
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src import bulk
+from src.bulk import ColumnarWriter, bulk_solve, iter_netlist_paths, main, solve_file
+
+
+REPO = Path(__file__).resolve().parents[2]
+NETLISTS = ["netlist.asc", "netlist_complex.asc", "netlist_complex_1.asc", "netlist_parallel.asc"]
+
+
+@pytest.fixture
+def netlist_dir(tmp_path):
+    for name in NETLISTS:
+        shutil.copy(REPO / name, tmp_path / name)
+    (tmp_path / "nested").mkdir()
+    shutil.copy(REPO / "netlist_parallel.asc", tmp_path / "nested" / "copy.asc")
+    (tmp_path / "corrupt.asc").write_text("Broken\nr1 1 x 10k\n.end\n")
+    return tmp_path
+
+
+class TestBulkSolve:
+    def test_solve_file(self):
+        record = solve_file(REPO / "netlist_complex.asc")
+        assert record["status"] == "ok"
+        assert record["effective_resistance"] == pytest.approx(13959.550561797752)
+        assert record["node_voltages"]["0"] == 0
+
+    def test_corrupt_file_is_isolated(self, netlist_dir):
+        records = {Path(record["path"]).name: record for record in bulk_solve(
+            iter_netlist_paths(netlist_dir), workers=0, chunk_size=2
+        )}
+        assert len(records) == 6
+        assert records["corrupt.asc"]["status"] == "error"
+        assert "NetlistSyntaxError" in records["corrupt.asc"]["error"]
+        assert records["netlist.asc"]["effective_resistance"] is None
+        assert records["copy.asc"]["status"] == "ok"
+
+    def test_process_pool_matches_inline(self, netlist_dir):
+        paths = sorted(iter_netlist_paths(netlist_dir))
+        inline = {record["path"]: record for record in bulk_solve(paths, workers=0)}
+        pooled = {record["path"]: record for record in bulk_solve(paths, workers=2, chunk_size=1)}
+        assert pooled == inline
+
+    @pytest.mark.skipif(
+        multiprocessing.get_start_method() != "fork", reason="the workers must inherit the patch"
+    )
+    def test_crashed_worker_is_isolated(self, netlist_dir, monkeypatch):
+        solve = bulk.solve_file
+
+        def crashing_solve_file(path):
+            if Path(path).name == "crash.asc":
+                os._exit(1)
+            return solve(path)
+
+        monkeypatch.setattr(bulk, "solve_file", crashing_solve_file)
+        (netlist_dir / "crash.asc").write_text("Crash\nv1 1 0 1\nr1 1 0 1\n.end\n")
+        paths = sorted(iter_netlist_paths(netlist_dir)) * 3
+        records = list(bulk_solve(paths, workers=2, chunk_size=2, max_pending=2))
+        assert len(records) == len(paths)
+        failed = {Path(record["path"]).name for record in records if record["status"] == "error"}
+        assert failed == {"crash.asc", "corrupt.asc"}
+        crashes = [record for record in records if Path(record["path"]).name == "crash.asc"]
+        assert all("BrokenProcessPool" in record["error"] for record in crashes)
+
+    def test_glob_source(self, netlist_dir):
+        paths = list(iter_netlist_paths(str(netlist_dir / "netlist_*.asc")))
+        assert len(paths) == 3
+
+
+class TestBulkCli:
+    def test_json_lines_output(self, netlist_dir, tmp_path):
+        output = tmp_path / "results.jsonl"
+        assert main([str(netlist_dir), "-o", str(output), "-w", "0"]) == 0
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted(record["status"] for record in records) == ["error"] + ["ok"] * 5
+
+    def test_columnar_output(self, netlist_dir, tmp_path):
+        output = tmp_path / "results.npz"
+        main([str(netlist_dir), "-o", str(output), "-w", "0"])
+        columns = np.load(output)
+        assert len(columns["path"]) == 6
+        assert np.isnan(columns["effective_resistance"][columns["status"] == "error"]).all()
+
+    def test_columnar_output_in_chunks(self, netlist_dir, tmp_path, monkeypatch):
+        monkeypatch.setattr(ColumnarWriter, "CHUNK_SIZE", 4)
+        output = tmp_path / "results.npz"
+        main([str(netlist_dir), "-o", str(output), "-w", "0"])
+        columns = np.load(output)
+        assert len(columns["path"]) == 6 and len(set(columns["path"])) == 6
+        assert sorted(columns["status"]) == ["error"] + ["ok"] * 5
+        assert np.isnan(columns["effective_resistance"][columns["status"] == "error"]).all()
+        # the chunks are deleted once the columns are written
+        assert not list(tmp_path.glob(".chunks-*"))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from src.components import convert_value, convert_values
+from src import errors
+
+
+class TestConvertValue:
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("2m", 2e-3),
+            ("3a", 3e-18),
+            ("1meg", 1e6),
+            ("1M", 1e6),
+            ("5da", 50),
+            ("4.7u", 4.7e-6),
+            ("-4.7k", -4700),
+            ("1e3", 1000),
+            ("10kΩ", 1e4),
+        ],
+    )
+    def test_prefixes(self, value, expected):
+        assert convert_value(value) == pytest.approx(expected)
+
+    def test_numbers_are_unchanged(self):
+        assert convert_value(5) == 5
+
+    def test_invalid_value_raises(self):
+        with pytest.raises(errors.ValueConversionError):
+            convert_value("ten")
+
+
+class TestConvertValues:
+    def test_batch_conversion(self):
+        converted = convert_values(["10k", "2.2k", "10k", "1meg"])
+        assert converted.dtype == np.float64
+        assert converted.tolist() == pytest.approx([1e4, 2.2e3, 1e4, 1e6])
+
+    def test_shape_is_kept(self):
+        converted = convert_values(np.array([["1k", "2"], ["3m", "4n"]]))
+        assert converted.shape == (2, 2)
+        assert converted[1].tolist() == pytest.approx([3e-3, 4e-9])
+
+    def test_invalid_value_raises(self):
+        with pytest.raises(errors.ValueConversionError):
+            convert_values(["1k", "?"])
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.elementtable import ElementTable, RESISTOR, VOLTAGE_SOURCE
+from src.netlistparser import Netlist
+from src.netlistreader import iter_netlist_records
+
+
+LINES = ["Title", "v1 0 1 dc 10", "r1 1 2 42.0k", "r2 1 2 2.5k", "r3 2 0 3.3k", ".end"]
+
+
+class TestElementTable:
+    def test_from_records(self):
+        table = ElementTable.from_records(iter_netlist_records(LINES))
+        assert table.kind.tolist() == [VOLTAGE_SOURCE, RESISTOR, RESISTOR, RESISTOR]
+        assert table.start_node.tolist() == [0, 1, 1, 2]
+        assert table.end_node.tolist() == [1, 2, 2, 0]
+        assert table.value.tolist() == pytest.approx([10, 42e3, 2.5e3, 3.3e3])
+        assert table.tags == ["v1", "r1", "r2", "r3"]
+        assert table.nodes().tolist() == [0, 1, 2]
+
+    def test_materialized_elements(self):
+        table = ElementTable.from_records(iter_netlist_records(LINES))
+        components = table.to_components()
+        assert [resistor.tag for resistor in components["r"]] == ["R_12", "R_12", "R_20"]
+        assert components["v"][0].value == 10
+
+    def test_connection_nodes_match_linear_elements(self):
+        table = ElementTable(
+            kind=[RESISTOR] * 4,
+            start_node=[2, 0, 3, 4],
+            end_node=[1, 5, 0, 2],
+            value=[1, 1, 1, 1],
+        )
+        elements = table.to_components()["r"]
+        assert table.connection_nodes().tolist() == [
+            [element.start_node, element.end_node] for element in elements
+        ]
+
+
+class TestColumnarNetlist:
+    def test_lazy_materialization(self, tmp_path):
+        path = tmp_path / "circuit.asc"
+        path.write_text("\n".join(LINES) + "\n")
+        netlist = Netlist.parse(path, columnar=True)
+        assert netlist._components is None
+        assert sorted(netlist._parallel_element_nodes) == [(1, 2)]
+        assert netlist._components is None
+
+        solution = netlist.solve_dc()
+        assert netlist._components is None
+        assert solution.get_node_voltage(1) == pytest.approx(-10)
+
+        assert len(netlist.get_resistors()) == 3
+        eager = Netlist.parse(path)
+        assert Netlist.calculate_effective_resistance(netlist).get_resistors()[
+            0
+        ].value == pytest.approx(
+            Netlist.calculate_effective_resistance(eager).get_resistors()[0].value
+        )
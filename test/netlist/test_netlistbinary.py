@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src import errors
+from src.elementtable import RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.netlistbinary import (
+    HEADER_DTYPE,
+    convert_netlist,
+    main,
+    read_binary_header,
+    read_binary_netlist,
+    write_binary_netlist,
+)
+from src.netlistparser import Netlist
+from src.netlistreader import read_netlist_records
+
+
+REPO = Path(__file__).resolve().parents[2]
+
+
+def text_table(name):
+    return ElementTable.from_records(read_netlist_records(REPO / name))
+
+
+def assert_same_table(table, expected):
+    np.testing.assert_array_equal(table.kind, expected.kind)
+    np.testing.assert_array_equal(table.start_node, expected.start_node)
+    np.testing.assert_array_equal(table.end_node, expected.end_node)
+    np.testing.assert_array_equal(table.value, expected.value)
+    assert list(table.tags) == list(expected.tags)
+
+
+class TestBinaryNetlist:
+    @pytest.mark.parametrize("name", ["netlist.asc", "netlist_complex.asc", "netlist_parallel.asc"])
+    def test_round_trip(self, tmp_path, name):
+        binary_path = tmp_path / "circuit.netb"
+        convert_netlist(REPO / name, binary_path)
+        table = read_binary_netlist(binary_path)
+        assert isinstance(table.value.base, np.memmap) or isinstance(table.value, np.memmap)
+        assert_same_table(table, text_table(name))
+
+        text_path = tmp_path / "circuit.asc"
+        convert_netlist(binary_path, text_path)
+        assert_same_table(text_table(text_path), text_table(name))
+
+    def test_header_and_alignment(self, tmp_path):
+        path = tmp_path / "circuit.netb"
+        write_binary_netlist(text_table("netlist_complex.asc"), path)
+        header = read_binary_header(path)
+        assert header["element_count"] == len(text_table("netlist_complex.asc"))
+        assert header["node_count"] == len(text_table("netlist_complex.asc").nodes())
+        for section in ("nodes", "kind", "start_node", "end_node", "value", "tag_offsets"):
+            assert header[section] % 8 == 0 and header[section] >= HEADER_DTYPE.itemsize
+
+    def test_tags_are_decoded_on_access(self, tmp_path):
+        path = tmp_path / "circuit.netb"
+        write_binary_netlist(ElementTable([0, 0], [1, 2], [2, 0], [1.0, 2.0], ["rÅ", "r2"]), path)
+        table = read_binary_netlist(path, mmap=False)
+        assert table.tags[0] == "rÅ" and table.tags[-1] == "r2"
+        assert table.index_of("r2") == 1
+
+    def test_invalid_files(self, tmp_path):
+        path = tmp_path / "circuit.netb"
+        path.write_bytes(b"not a netlist")
+        with pytest.raises(errors.BinaryNetlistError):
+            read_binary_netlist(path)
+        path.write_bytes(b"\0" * HEADER_DTYPE.itemsize)
+        with pytest.raises(errors.BinaryNetlistError):
+            read_binary_netlist(path)
+
+        write_binary_netlist(text_table("netlist_complex.asc"), path)
+        path.write_bytes(path.read_bytes()[:-16])
+        with pytest.raises(errors.BinaryNetlistError):
+            read_binary_netlist(path)
+
+    def test_netlist_parse_and_solve(self, tmp_path):
+        path = tmp_path / "circuit.netb"
+        assert main([str(REPO / "netlist_parallel.asc"), str(path)]) == 0
+        solution = Netlist.parse(path).solve_dc()
+        expected = Netlist.parse(REPO / "netlist_parallel.asc", columnar=True).solve_dc()
+        assert solution.get_node_voltages() == pytest.approx(expected.get_node_voltages())
+
+        saved = tmp_path / "saved.netb"
+        Netlist.parse(path).save_binary(saved)
+        assert saved.read_bytes() == path.read_bytes()
+
+    def test_topology_is_built_on_first_use(self, tmp_path):
+        path = tmp_path / "circuit.netb"
+        kinds = [VOLTAGE_SOURCE, RESISTOR, RESISTOR]
+        write_binary_netlist(ElementTable(kinds, [1, 1, 2], [0, 2, 0], [1.0] * 3), path)
+        netlist = Netlist.parse(path)
+        assert netlist._topology is None and netlist._connection_nodes is None
+        assert netlist._floating_element_nodes == [(1, 0), (1, 2), (2, 0)]
+
+        write_binary_netlist(ElementTable(kinds, [1, 1, 2], [0, 0, 3], [1.0] * 3), path)
+        netlist = Netlist.parse(path)
+        with pytest.raises(errors.FloatingNodeError):
+            netlist.validate()
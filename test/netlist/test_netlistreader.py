@@ -0,0 +1,55 @@
+import pytest
+
+from src.netlistparser import Netlist
+from src.netlistreader import iter_netlist_records
+from src import errors
+
+
+class TestNetlistReader:
+    def test_records_stop_at_end(self):
+        lines = ["Title", "r1 1 2 10k", ".end", "r2 2 0 5k"]
+        records = list(iter_netlist_records(lines))
+        assert [record.name for record in records] == ["r1"]
+        assert records[0].value == "10k"
+        assert records[0].line_number == 2
+
+    def test_missing_end_and_trailing_blank_lines(self):
+        lines = ["Title", "v1 0 1 dc 24", "r1 1 0 1k", "", "   "]
+        records = list(iter_netlist_records(lines))
+        assert [record.symbol for record in records] == ["v", "r"]
+        assert records[0].value == "24"
+
+    def test_comments_and_directives(self):
+        lines = [
+            "Title",
+            "* a full line comment",
+            "r1 1 2 10k ; an inline comment",
+            ".op",
+            "r2 2 0 5k",
+        ]
+        records = list(iter_netlist_records(lines))
+        assert [(record.name, record.value) for record in records] == [
+            ("r1", "10k"),
+            ("r2", "5k"),
+        ]
+
+    def test_continuation_lines(self):
+        lines = ["Title", "v1 0 1", "+ dc 24", "r1 1 0", "+1k"]
+        records = list(iter_netlist_records(lines))
+        assert [(record.name, record.value) for record in records] == [
+            ("v1", "24"),
+            ("r1", "1k"),
+        ]
+        assert records[1].line_number == 4
+
+    def test_invalid_nodes(self):
+        with pytest.raises(errors.NetlistSyntaxError):
+            list(iter_netlist_records(["Title", "r1 a 2 10k"]))
+
+    def test_iter_elements(self, tmp_path):
+        path = tmp_path / "circuit.asc"
+        path.write_text("Title\nv1 0 1 dc 10\nr1 1 2 1k\nr2 2 0 3k\n.end\n")
+        elements = list(Netlist.iter_elements(path))
+        assert [element.tag for element in elements] == ["V_01", "R_12", "R_20"]
+        netlist = Netlist.parse(path)
+        assert len(netlist.get_resistors()) == 2
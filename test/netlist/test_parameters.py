@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from src.netlistparser import Netlist
+from src.parameters import (
+    evaluate,
+    parse_param_directive,
+    parse_sweep_directives,
+    resolve_parameters,
+    sweep_values,
+)
+from src import errors
+
+
+def write_netlist(tmp_path, lines):
+    path = tmp_path / "circuit.asc"
+    path.write_text("\n".join(["Test circuit", *lines, ".end"]) + "\n")
+    return path
+
+
+class TestExpressions:
+    def test_si_literals_and_functions(self):
+        assert evaluate("{2 * R0 + 1k}", {"R0": 500.0}) == pytest.approx(2000.0)
+        assert evaluate("{sqrt(4Meg) / 2^3}", {}) == pytest.approx(250.0)
+        assert evaluate("{1e3 * 10u}", {}) == pytest.approx(0.01)
+        swept = evaluate("{R0 / 2}", {"R0": np.array([2.0, 4.0])})
+        assert swept.tolist() == [1.0, 2.0]
+
+    def test_exponent_literals(self):
+        assert evaluate("{1e-3*2}", {}) == pytest.approx(0.002)
+        assert evaluate("{2.2e-6/R0}", {"R0": 2.0}) == pytest.approx(1.1e-6)
+        assert evaluate("{3e2k}", {}) == pytest.approx(3e5)
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["{__import__('os')}", "{R0.real}", "{[1, 2]}", "{open('x')}", "{lambda: 1}", "{1 +}"],
+    )
+    def test_rejected(self, expression):
+        with pytest.raises(errors.ParameterError):
+            evaluate(expression, {"R0": 1.0})
+
+    def test_undefined_name(self):
+        with pytest.raises(errors.ParameterError):
+            evaluate("{R0 * gain}", {"R0": 1.0})
+
+
+class TestParameters:
+    def test_param_directive(self):
+        definitions = parse_param_directive([".param", "a=1k", "b", "=", "{2", "*", "a}"])
+        assert definitions == {"a": "1k", "b": "{2 * a}"}
+        with pytest.raises(errors.NetlistSyntaxError):
+            parse_param_directive([".param", "1k"])
+
+    def test_resolution_order_and_cycles(self):
+        values = resolve_parameters({"b": "{a * 2}", "a": "1k", "c": "{a + b}"})
+        assert values == {"a": 1000.0, "b": 2000.0, "c": 3000.0}
+        with pytest.raises(errors.ParameterError):
+            resolve_parameters({"a": "{b}", "b": "{a + 1}"})
+        # an override replaces the definition, as a sweep does
+        assert resolve_parameters({"a": "1k", "b": "{a}"}, {"a": 5.0})["b"] == 5.0
+
+    def test_sweep_values(self):
+        assert sweep_values("lin", [1.0, 2.0, 0.25]).tolist() == [1.0, 1.25, 1.5, 1.75, 2.0]
+        assert np.allclose(sweep_values("dec", [1.0, 100.0, 2]), [1, 10**0.5, 10, 10**1.5, 100])
+        assert sweep_values("oct", [1.0, 4.0, 1]).tolist() == [1.0, 2.0, 4.0]
+        with pytest.raises(errors.ParameterError):
+            sweep_values("lin", [1.0, 2.0, -1.0])
+
+    def test_sweep_directives(self):
+        sweeps = parse_sweep_directives(
+            [
+                (2, [".step", "param", "R0", "list", "1k", "2k"]),
+                (3, [".dc", "v1", "0", "10", "5", "i1", "1m", "2m", "1m"]),
+            ]
+        )
+        assert [(sweep.name, sweep.is_parameter) for sweep in sweeps] == [
+            ("R0", True),
+            ("v1", False),
+            ("i1", False),
+        ]
+        assert sweeps[0].values.tolist() == [1000.0, 2000.0]
+        assert sweeps[1].values.tolist() == [0.0, 5.0, 10.0]
+
+
+class TestNetlistParameters:
+    def test_parse_at_nominal_values(self, tmp_path):
+        path = write_netlist(
+            tmp_path,
+            [
+                "v1 1 0 {vin}",
+                "r1 1 2 {R0}",
+                "r2 2 0 { 3 * R0 }",
+                ".param vin=10 R0=1k",
+                ".step param R0 list 1k 2k",
+            ],
+        )
+        for netlist in (Netlist.parse(path), Netlist.parse(path, columnar=True)):
+            assert sorted(netlist.element_table.value.tolist()) == [10.0, 1000.0, 3000.0]
+        assert Netlist.parse(path).solve_dc().get_node_voltage(2) == pytest.approx(7.5)
+
+    def test_stepped_parameter_without_param(self, tmp_path):
+        path = write_netlist(
+            tmp_path, ["v1 1 0 1", "r1 1 0 {R0}", ".step param R0 100 300 100"]
+        )
+        assert Netlist.parse(path, columnar=True).element_table.value.tolist() == [1.0, 100.0]
+
+    def test_expression_elements_keep_file_order(self, tmp_path):
+        path = write_netlist(
+            tmp_path, ["v1 1 0 10", "r1 1 2 {R0}", "r2 2 3 2k", "r3 3 0 {R0 * 3}", ".param R0=1k"]
+        )
+        resistors = Netlist.read_netlist_file(path)["r"]
+        assert [resistor.name for resistor in resistors] == ["r1", "r2", "r3"]
+        assert [resistor.value for resistor in resistors] == [1000.0, 2000.0, 3000.0]
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import pytest
+
+from src.netlistparser import Netlist
+from src.resultcache import ResultCache, content_key, file_content_key
+
+LINES = ["v1 1 0 10", "r1 1 2 1k", "r2 2 0 1k", "r3 2 3 2k", "r4 3 0 2k"]
+
+
+def write_netlist(tmp_path, lines, name="circuit.asc", title="Test circuit"):
+    path = tmp_path / name
+    path.write_text("\n".join([title, *lines, ".end"]) + "\n")
+    return path
+
+
+def parse_in_process(directory, path):
+    netlist = ResultCache(directory).parse(path)
+    return netlist.element_table.tags[:], netlist.element_table.value.tolist()
+
+
+class TestContentKey:
+    def test_order_whitespace_and_comments(self):
+        key = content_key(["Title", *LINES])
+        assert content_key(["Another title", *reversed(LINES)]) == key
+        assert content_key(["Title", "* a comment", "v1   1 0   10 ; inline", *LINES[1:]]) == key
+        assert content_key(["Title", "v1 1 0", "+ 10", *LINES[1:]]) == key
+        assert content_key(["Title", *LINES[:-1], "r4 3 0 2.2k"]) != key
+
+    def test_subcircuit_blocks(self):
+        subcircuit = [".subckt div a b", "r1 a b 1k", "r2 b 0 1k", ".ends"]
+        key = content_key(["Title", *subcircuit, "x1 1 2 div", *LINES])
+        reordered = [".subckt div a b", "r2 b 0 1k", "r1 a b 1k", ".ends"]
+        assert content_key(["Title", *LINES, "x1 1 2 div", *reordered]) == key
+        # a line moved out of its subcircuit is another circuit
+        moved = [".subckt div a b", "r1 a b 1k", ".ends", "r2 b 0 1k"]
+        assert content_key(["Title", *moved, "x1 1 2 div", *LINES]) != key
+
+    def test_directives_keep_their_order(self):
+        key = content_key(["Title", "r1 1 0 {R0}", ".param R0=1k", ".param R0=2k"])
+        assert content_key(["Title", ".param R0=1k", ".param R0=2k", "r1 1 0 {R0}"]) == key
+        # the last definition wins, swapping them is another circuit
+        assert content_key(["Title", "r1 1 0 {R0}", ".param R0=2k", ".param R0=1k"]) != key
+        steps = [".step param a list 1 2", ".step param b list 1 2"]
+        assert content_key(["Title", *LINES, *steps]) != content_key(
+            ["Title", *LINES, *reversed(steps)]
+        )
+
+
+class TestResultCache:
+    def test_parse_hits_across_instances(self, tmp_path):
+        path = write_netlist(tmp_path, LINES)
+        first = ResultCache(tmp_path / "cache").parse(path)
+        cache = ResultCache(tmp_path / "cache")
+        reordered = write_netlist(tmp_path, LINES[::-1], name="reordered.asc")
+        netlist = Netlist.parse(reordered, cache=cache)
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 0
+        assert netlist.content_key == first.content_key == file_content_key(reordered)
+        # the cached table keeps the order of the first parse
+        assert list(netlist.element_table.tags) == list(first.element_table.tags)
+        assert netlist.element_table.value.tolist() == first.element_table.value.tolist()
+
+    def test_solution_vectors(self, tmp_path):
+        path = write_netlist(tmp_path, LINES)
+        cache = ResultCache(tmp_path / "cache")
+        expected = cache.solve_dc(cache.parse(path))
+        solution = cache.solve_dc(cache.parse(path))
+        assert cache.hits == 2
+        assert np.allclose(solution.node_voltages, expected.node_voltages)
+        assert solution.get_node_voltage(2) == pytest.approx(10 * 800 / 1800)
+
+    def test_reduction_and_explanation(self, tmp_path):
+        path = write_netlist(tmp_path, LINES)
+        expected = Netlist.calculate_effective_resistance(Netlist.parse(path, columnar=True))
+        cache = ResultCache(tmp_path / "cache")
+        cache.calculate_effective_resistance(cache.parse(path))
+        reduced = cache.calculate_effective_resistance(cache.parse(path))
+        assert cache.hits == 2
+        assert [r.value for r in reduced.get_resistors()] == [
+            r.value for r in expected.get_resistors()
+        ]
+        assert reduced.get_explanation() == expected.get_explanation()
+
+    def test_size_eviction(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache", max_bytes=4096)
+        for count in range(20):
+            path = write_netlist(tmp_path, LINES + [f"r{count + 5} 1 0 {count + 1}k"])
+            cache.parse(path)
+        assert cache.evictions > 0
+        assert cache.current_bytes() <= 4096
+        # the most recent entry survives
+        assert cache.get_table(file_content_key(path)) is not None
+        cache.clear()
+        assert cache.current_bytes() == 0
+
+    def test_concurrent_processes(self, tmp_path):
+        path = write_netlist(tmp_path, LINES)
+        directory = tmp_path / "cache"
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(parse_in_process, [directory] * 8, [path] * 8))
+        assert all(result == results[0] for result in results)
+        files = [name for _, _, names in os.walk(directory) for name in names]
+        assert files == [f"{file_content_key(path)}.netb"]
@@ -0,0 +1,122 @@
+import pytest
+
+from src.components import Loop, Resistor
+from src.elementtable import (
+    CAPACITOR,
+    CURRENT_SOURCE,
+    INDUCTOR,
+    RESISTOR,
+    VOLTAGE_SOURCE,
+    ElementTable,
+)
+from src.netlistparser import Netlist
+from src.topology import TopologyIndex
+from src import errors
+
+
+def write_netlist(tmp_path, lines):
+    path = tmp_path / "circuit.asc"
+    path.write_text("\n".join(["Test circuit", *lines, ".end"]) + "\n")
+    return path
+
+
+class TestTopologyIndex:
+    def test_incident_elements(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR, RESISTOR, CAPACITOR],
+            [10, 10, 20, 20, 20],
+            [0, 20, 0, 0, 10],
+            [5.0, 1.0, 2.0, 3.0, 1e-6],
+        )
+        index = TopologyIndex(table).validate()
+        assert index.nodes.tolist() == [0, 10, 20]
+        assert index.incident_elements(20).tolist() == [1, 2, 3, 4]
+        assert index.incident_elements(0).tolist() == [0, 2, 3]
+        assert index.degree(10) == 3
+        pairs, counts = index.connection_counts()
+        assert list(map(tuple, pairs.tolist())) == [(10, 0), (10, 20), (20, 0)]
+        assert counts.tolist() == [1, 2, 2]
+        with pytest.raises(KeyError):
+            index.incident_elements(30)
+
+    def test_missing_ground(self):
+        table = ElementTable([VOLTAGE_SOURCE, RESISTOR], [1, 1], [2, 2], [1.0, 1.0])
+        with pytest.raises(errors.MissingGroundError):
+            TopologyIndex(table).validate()
+
+    def test_floating_nodes(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR], [1, 1, 3], [0, 0, 4], [1.0, 1.0, 1.0]
+        )
+        with pytest.raises(errors.FloatingNodeError) as error:
+            TopologyIndex(table).validate()
+        assert error.value.nodes == [3, 4]
+        # a capacitor is a path to the ground, the transient analysis can solve the circuit
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, CAPACITOR], [1, 1, 2], [0, 2, 0], [1.0, 1.0, 1.0]
+        )
+        TopologyIndex(table).validate()
+
+    def test_voltage_source_loop(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, VOLTAGE_SOURCE, VOLTAGE_SOURCE, RESISTOR],
+            [1, 2, 2, 1],
+            [0, 1, 0, 0],
+            [1.0, 1.0, 2.0, 1.0],
+            ["v1", "v2", "v3", "r1"],
+        )
+        with pytest.raises(errors.VoltageSourceLoopError) as error:
+            TopologyIndex(table).validate()
+        assert error.value.tags == ["v3"]
+
+    def test_inductor_loop(self):
+        # the inductors are shorts in DC, one across the source closes a loop
+        table = ElementTable(
+            [VOLTAGE_SOURCE, INDUCTOR, INDUCTOR, RESISTOR],
+            [1, 1, 2, 2],
+            [0, 2, 0, 0],
+            [1.0, 1e-3, 1e-3, 1.0],
+            ["v1", "l1", "l2", "r1"],
+        )
+        with pytest.raises(errors.VoltageSourceLoopError) as error:
+            TopologyIndex(table).validate()
+        assert error.value.tags == ["l2"]
+        TopologyIndex(ElementTable(table.kind[:2], [1, 1], [0, 2], [1.0, 1e-3])).validate()
+
+    def test_current_source_cutset(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, CURRENT_SOURCE, RESISTOR],
+            [1, 1, 0, 2],
+            [0, 0, 2, 3],
+            [1.0, 1.0, 1e-3, 1.0],
+        )
+        with pytest.raises(errors.CurrentSourceCutsetError) as error:
+            TopologyIndex(table).validate()
+        assert error.value.nodes == [2, 3]
+        # the typed errors are singular circuits for the callers of the solvers
+        assert isinstance(error.value, errors.SingularCircuitError)
+
+
+class TestNetlistValidation:
+    def test_load_fails_fast(self, tmp_path):
+        path = write_netlist(tmp_path, ["v1 1 0 10", "r1 1 0 1k", "r2 3 4 1k"])
+        with pytest.raises(errors.FloatingNodeError):
+            Netlist.parse(path)
+        with pytest.raises(errors.FloatingNodeError):
+            Netlist.parse(path, columnar=True)
+
+    def test_parse_errors_propagate(self, tmp_path):
+        path = write_netlist(tmp_path, ["v1 1 0 10", "q1 1 0 1k"])
+        with pytest.raises(errors.NetlistSyntaxError):
+            Netlist.read_netlist_file(path)
+
+    def test_valid_netlist_has_index(self, tmp_path):
+        path = write_netlist(tmp_path, ["v1 1 0 10", "r1 1 2 1k", "r2 2 0 1k", "r3 2 0 1k"])
+        netlist = Netlist.parse(path)
+        assert netlist.topology.degree(2) == 3
+        assert netlist._parallel_element_nodes == [(2, 0)]
+
+
+def test_loop_requires_elements():
+    with pytest.raises(errors.NotALoopError):
+        Loop([Resistor("1k", 1, 0)])
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+from src import profiling
+from src.netlistparser import Netlist
+from src.profiling import Profiler, StageEvent
+
+
+REPO = Path(__file__).resolve().parents[2]
+
+
+class TestProfiler:
+    def test_stages_recorded(self):
+        with Profiler() as profiler:
+            netlist = Netlist.parse(REPO / "netlist_complex.asc")
+            reduced = Netlist.calculate_effective_resistance(netlist)
+            reduced.get_explanation()
+            netlist.solve_dc()
+        report = profiler.report()
+        for stage in ("parse", "explain", "reduce", "assemble", "factorize", "solve"):
+            assert stage in report
+            assert report[stage].calls >= 1
+        assert report["parse"].elements > 0
+        assert report["solve"].wall_time >= report["factorize"].wall_time
+        assert "stage" in str(report)
+        assert set(report.as_dict()["solve"]) >= {"calls", "wall_time", "peak_bytes"}
+
+    def test_convert_value_counter(self):
+        with Profiler() as profiler:
+            Netlist.parse(REPO / "netlist_complex.asc")
+        report = profiler.report()
+        assert report["convert_value"].calls > 0
+        assert report["convert_value"].wall_time == 0
+
+    def test_hooks_receive_events(self):
+        events = []
+        with Profiler(hooks=[events.append]):
+            Netlist.parse(REPO / "netlist.asc").solve_dc()
+        assert events and all(isinstance(event, StageEvent) for event in events)
+        factorize = next(event for event in events if event.stage == "factorize")
+        assert factorize.depth >= 1
+
+    def test_trace_allocations(self):
+        with Profiler(trace_allocations=True) as profiler:
+            with profiling.stage("allocate", elements=3):
+                data = [bytes(1 << 16) for _ in range(8)]
+        report = profiler.report()
+        assert report["allocate"].peak_bytes >= 8 << 16
+        assert report["allocate"].elements == 3
+        del data
+
+    def test_disabled(self):
+        assert profiling.active_profiler() is None
+        Netlist.parse(REPO / "netlist.asc").solve_dc()
+        with Profiler() as profiler:
+            pass
+        assert "parse" not in profiler.report()
+        assert "solve" not in profiler.report()
+
+    def test_profiled_errors_propagate(self):
+        with Profiler() as profiler:
+            with pytest.raises(ZeroDivisionError):
+                with profiling.stage("failing"):
+                    1 / 0
+        assert profiler.report()["failing"].calls == 1
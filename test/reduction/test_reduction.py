@@ -0,0 +1,218 @@
+import pytest
+
+from src.components import Resistor, VoltageSource
+from src.elementtable import ElementTable, RESISTOR, VOLTAGE_SOURCE
+from src.generators import generate, star_delta
+from src.netlistparser import Netlist
+from src.reduction import ReductionEngine
+from src.solver import MNASystem
+from src.steplog import DELTA_WYE, WYE_DELTA
+
+
+def ladder_table(rungs, series=1.0, shunt=2.0):
+    kind, start_node, end_node, value = [VOLTAGE_SOURCE], [1], [0], [1.0]
+    for rung in range(1, rungs + 1):
+        kind += [RESISTOR, RESISTOR]
+        start_node += [rung, rung + 1]
+        end_node += [rung + 1, 0]
+        value += [series, shunt]
+    return ElementTable(kind, start_node, end_node, value)
+
+
+def bridge_ladder_table(cells):
+    """Wheatstone bridges in series, each needing a star/delta transformation"""
+    kind, start_node, end_node, value = [VOLTAGE_SOURCE], [1], [0], [1.0]
+    for cell in range(cells):
+        left, top, bottom, right = 3 * cell + 1, 3 * cell + 2, 3 * cell + 3, 3 * cell + 4
+        for index, (a, b) in enumerate(
+            ((left, top), (left, bottom), (top, bottom), (top, right), (bottom, right))
+        ):
+            kind.append(RESISTOR)
+            start_node.append(a)
+            end_node.append(b)
+            value.append(1.0 + (cell + index) % 7)
+    kind.append(RESISTOR)
+    start_node.append(3 * cells + 1)
+    end_node.append(0)
+    value.append(10.0)
+    return ElementTable(kind, start_node, end_node, value)
+
+
+class TestReductionEngine:
+    def test_series_and_parallel(self):
+        netlist = Netlist.load(
+            {
+                "v": [VoltageSource("10", 0, 1)],
+                "r": [
+                    Resistor("42.0k", 1, 2),
+                    Resistor("2.5k", 1, 2),
+                    Resistor("3.3k", 2, 0),
+                ],
+                "i": [],
+                "l": [],
+                "c": [],
+            }
+        )
+        reduced = Netlist.calculate_effective_resistance(netlist)
+        assert [resistor.value for resistor in reduced.get_resistors()] == pytest.approx(
+            [1 / (1 / 42e3 + 1 / 2.5e3) + 3.3e3]
+        )
+        assert len(reduced.explanatory_parts) == 2
+        assert "Parallel" in reduced.get_explanation()
+        assert "Series" in reduced.get_explanation()
+        assert netlist.explanatory_parts == []
+
+    def test_large_ladder(self):
+        rungs = 50000
+        engine = ReductionEngine.from_table(ladder_table(rungs), record_steps=False).reduce()
+        expected = 3.0
+        for _ in range(rungs - 1):
+            expected = 1.0 + 1 / (1 / 2.0 + 1 / expected)
+        assert engine.effective_resistance(0, 1) == pytest.approx(expected)
+        assert engine.steps == []
+
+    def test_bridge_without_transformations_is_not_reduced(self):
+        engine = ReductionEngine(
+            [1, 1, 2, 2, 3],
+            [2, 3, 3, 0, 0],
+            [1, 2, 3, 4, 5],
+            terminals=[0, 1],
+            transformations=False,
+        ).reduce()
+        assert engine.edge_count() == 5
+        assert engine.effective_resistance(0, 1) is None
+
+    def test_dangling_resistor_is_removed(self):
+        engine = ReductionEngine([1, 1], [0, 2], [5, 7], terminals=[0, 1]).reduce()
+        assert engine.effective_resistance(0, 1) == 5
+
+    def test_shorted_parallel_bundle(self):
+        engine = ReductionEngine([1, 1, 2], [2, 2, 0], [0.0, 4.0, 3.0], terminals=[0, 1]).reduce()
+        assert engine.effective_resistance(0, 1) == 3.0
+        assert "Parallel" in "".join(engine.step_log.iter_text())
+
+
+class TestStarDelta:
+    def test_bridge(self):
+        table = bridge_ladder_table(1)
+        engine = ReductionEngine.from_table(table).reduce()
+        assert engine.edge_count() == 1
+        assert engine.effective_resistance(0, 1) == pytest.approx(
+            MNASystem(table).solve().get_effective_resistance()
+        )
+        assert len(engine.step_log) > 0
+
+    def test_wye_delta(self):
+        # node 4 is the centre of a star whose far nodes are joined by two resistors
+        engine = ReductionEngine(
+            [1, 2, 3, 4, 4, 4], [2, 3, 0, 1, 2, 3], [1, 2, 3, 4, 5, 6], terminals=[0, 1]
+        ).reduce()
+        assert engine.step_log.count(WYE_DELTA) + engine.step_log.count(DELTA_WYE) >= 1
+        table = ElementTable(
+            [VOLTAGE_SOURCE] + [RESISTOR] * 6,
+            [1, 1, 2, 3, 4, 4, 4],
+            [0, 2, 3, 0, 1, 2, 3],
+            [1, 1, 2, 3, 4, 5, 6],
+        )
+        assert engine.effective_resistance(0, 1) == pytest.approx(
+            MNASystem(table).solve().get_effective_resistance()
+        )
+
+    def test_bridge_ladder(self):
+        table = bridge_ladder_table(300)
+        engine = ReductionEngine.from_table(table, record_steps=False).reduce()
+        assert engine.edge_count() == 1
+        assert engine.effective_resistance(0, 1) == pytest.approx(
+            MNASystem(table).solve().get_effective_resistance()
+        )
+
+    def test_transformation_without_gain(self):
+        # a cube has no triangles and only degree-3 nodes whose far nodes are not joined
+        cube = [(1, 2), (2, 3), (3, 4), (4, 1), (5, 6), (6, 7), (7, 8), (8, 5)]
+        cube += [(1, 5), (2, 6), (3, 7), (4, 8)]
+        edges = ([a for a, _ in cube], [b for _, b in cube], [1.0] * 12)
+        engine = ReductionEngine(*edges, terminals=[1, 7]).reduce()
+        assert engine.edge_count() == 12
+        assert len(engine.step_log) == 0
+        engine = ReductionEngine(*edges, terminals=[1, 7], zero_gain=True).reduce()
+        assert engine.edge_count() == 1
+        assert engine.effective_resistance(1, 7) == pytest.approx(5 / 6)
+
+    @pytest.mark.parametrize("elements", [26, 200, 1000])
+    def test_star_delta_chain(self, elements):
+        table = star_delta(elements)
+        engine = ReductionEngine.from_table(table, record_steps=False, zero_gain=True).reduce()
+        assert engine.edge_count() == 1
+        assert engine.effective_resistance(0, 1) == pytest.approx(
+            MNASystem(table).solve().get_effective_resistance()
+        )
+
+    def test_zero_gain_stops_on_meshes(self):
+        table = generate("grid", 2000)
+        engine = ReductionEngine.from_table(table, zero_gain=True).reduce()
+        assert engine.edge_count() > 1
+        # a few stalled runs, not a reshuffle of the whole mesh
+        assert engine.step_log.count(WYE_DELTA) + engine.step_log.count(DELTA_WYE) < 200
+
+    def test_transformations_are_explained(self):
+        netlist = Netlist(components_dict=None, element_table=bridge_ladder_table(1))
+        reduced = Netlist.calculate_effective_resistance(netlist)
+        assert len(reduced.get_resistors()) == 1
+        explanation = reduced.get_explanation()
+        assert "Delta (Δ)" in explanation or "Star (Y)" in explanation
+        assert any("transformation" in part for part in reduced.explanatory_parts)
+
+
+class TestStepLog:
+    def netlist(self):
+        return Netlist.load(
+            {
+                "v": [VoltageSource("10", 0, 1)],
+                "r": [
+                    Resistor("42.0k", 1, 2),
+                    Resistor("2.5k", 1, 2),
+                    Resistor("3.3k", 2, 0),
+                ],
+                "i": [],
+                "l": [],
+                "c": [],
+            }
+        )
+
+    def test_steps_are_compact(self):
+        engine = ReductionEngine.from_table(ladder_table(1000)).reduce()
+        assert len(engine.step_log) == 2 * 1000 - 1
+        assert engine.step_log.nbytes < 64 * len(engine.step_log)
+        operation, operands, results = engine.step_log.step(0)
+        assert len(operands) == 2 and len(results) == 1 and results[0] > max(operands)
+
+    def test_explanation_text(self):
+        reduced = Netlist.calculate_effective_resistance(self.netlist())
+        parallel = 1 / (1 / 42e3 + 1 / 2.5e3)
+        assert reduced.get_explanation() == (
+            "\nThe following resistors are in Parallel: R_12 (2500.0Ω), R_12 (42000.0Ω),"
+            f"\n1 /( 1/(2500.0Ω)  +  1/(42000.0Ω) ) = {parallel}Ω\n"
+            f"\nThe following resistors are in Series: R_12 ({parallel}Ω) R_20 (3300.0Ω)"
+            f"\n(  ({parallel}Ω), +  (3300.0Ω), )  = {parallel + 3300.0}Ω\n"
+        )
+
+    def test_explanation_is_streamed(self):
+        reduced = Netlist.calculate_effective_resistance(self.netlist())
+        chunks = reduced.iter_explanation()
+        assert next(chunks).startswith("\nThe following resistors are in Parallel")
+        assert next(chunks).startswith("\nThe following resistors are in Series")
+        assert next(chunks, None) is None
+
+    def test_no_steps_without_explanation(self):
+        netlist = self.netlist()
+        reduced = Netlist.calculate_effective_resistance(netlist, explain=False)
+        assert reduced.step_logs == ()
+        assert reduced.get_explanation() == ""
+        assert reduced.get_resistors()[0].value == pytest.approx(
+            Netlist.calculate_effective_resistance(netlist).get_resistors()[0].value
+        )
+
+    def test_explanatory_parts_are_not_shared(self):
+        first, second = self.netlist(), self.netlist()
+        first._explanatory_parts.append({})
+        assert second.explanatory_parts == []
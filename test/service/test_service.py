@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src import errors
+from src.service import ServiceClient, SolverService, netlist_fingerprint, solve_text
+
+
+REPO = Path(__file__).resolve().parents[2]
+PARALLEL = (REPO / "netlist_parallel.asc").read_text()
+
+
+class GatedSolve:
+    """Blocks every solve until released, counting the calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, text):
+        self.calls += 1
+        self.release.wait(5)
+        return solve_text(text)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestFingerprint:
+    def test_ignores_title_comments_and_spacing(self):
+        lines = PARALLEL.splitlines()
+        reformatted = "\n".join(
+            ["Another title", "* a comment"] + ["  ".join(line.split()) for line in lines[1:]]
+        )
+        assert netlist_fingerprint(reformatted) == netlist_fingerprint(PARALLEL)
+
+    def test_values_change_the_fingerprint(self):
+        assert netlist_fingerprint(PARALLEL.replace("42.0k", "43.0k")) != netlist_fingerprint(PARALLEL)
+
+
+class TestSolverService:
+    def test_identical_requests_are_coalesced(self):
+        solve = GatedSolve()
+
+        async def scenario():
+            with ThreadPoolExecutor(2) as executor:
+                service = SolverService(executor=executor, solve=solve)
+                tasks = [asyncio.ensure_future(service.solve(PARALLEL)) for _ in range(5)]
+                await asyncio.sleep(0.05)
+                solve.release.set()
+                return service, await asyncio.gather(*tasks)
+
+        service, results = run(scenario())
+        assert solve.calls == 1
+        assert service.stats() == {
+            "submitted": 5, "coalesced": 4, "solved": 1, "rejected": 0, "pending": 0
+        }
+        assert results[0]["effective_resistance"] == pytest.approx(5659.5505617977)
+        assert all(result is results[0] for result in results)
+
+    def test_backpressure_rejects_when_busy(self):
+        solve = GatedSolve()
+
+        async def scenario():
+            with ThreadPoolExecutor(2) as executor:
+                service = SolverService(
+                    executor=executor, solve=solve, max_pending=1, queue_timeout=0
+                )
+                first = asyncio.ensure_future(service.solve(PARALLEL))
+                await asyncio.sleep(0.05)
+                with pytest.raises(errors.ServiceOverloadedError):
+                    await service.solve(PARALLEL.replace("42.0k", "43.0k"))
+                solve.release.set()
+                await first
+                return service
+
+        service = run(scenario())
+        assert service.rejected == 1 and service.solved == 1
+
+    def test_cancelled_submission_does_not_cancel_the_job(self):
+        solve = GatedSolve()
+
+        async def scenario():
+            with ThreadPoolExecutor(1) as executor:
+                service = SolverService(executor=executor, solve=solve)
+                first = asyncio.ensure_future(service.solve(PARALLEL))
+                second = asyncio.ensure_future(service.solve(PARALLEL))
+                await asyncio.sleep(0.05)
+                first.cancel()
+                solve.release.set()
+                return await second
+
+        assert run(scenario())["effective_resistance"] == pytest.approx(5659.5505617977)
+
+    def test_http_front_end(self):
+        async def scenario():
+            with ThreadPoolExecutor(2) as executor:
+                service = SolverService(executor=executor)
+                server = await service.serve()
+                async with server:
+                    client = ServiceClient.for_server(server)
+                    result = await client.solve(PARALLEL)
+                    with pytest.raises(errors.ServiceResponseError) as error:
+                        await client.solve("Title\nr1 1 x 10k\n")
+                    status, _ = await client.request("GET", "/missing")
+                    stats = await client.stats()
+            return result, error.value.status, status, stats
+
+        result, error_status, missing_status, stats = run(scenario())
+        assert result["effective_resistance"] == pytest.approx(5659.5505617977)
+        assert error_status == 400
+        assert missing_status == 404
+        assert stats["submitted"] == 2 and stats["solved"] == 1
+
+    def test_invalid_utf8_body(self):
+        async def scenario():
+            with ThreadPoolExecutor(1) as executor:
+                service = SolverService(executor=executor)
+                server = await service.serve()
+                async with server:
+                    client = ServiceClient.for_server(server)
+                    response = await client.request("POST", "/solve", b"Title\nr1 1 0 10\xff\n")
+                    stats = await client.stats()
+            return response, stats
+
+        (status, payload), stats = run(scenario())
+        assert status == 400
+        assert "UTF-8" in payload["error"]
+        assert stats["submitted"] == 0
+
+    def test_pending_jobs_are_bounded(self):
+        solve = GatedSolve()
+
+        async def scenario():
+            with ThreadPoolExecutor(2) as executor:
+                service = SolverService(executor=executor, solve=solve, max_pending=3)
+                texts = [PARALLEL.replace("42.0k", f"{40 + index}.0k") for index in range(10)]
+                tasks = [asyncio.ensure_future(service.solve(text)) for text in texts]
+                await asyncio.sleep(0.05)
+                pending = service.pending
+                solve.release.set()
+                results = await asyncio.gather(*tasks)
+                return service, pending, results
+
+        service, pending, results = run(scenario())
+        assert pending == 3
+        assert len(results) == 10 and service.solved == 10 and service.pending == 0
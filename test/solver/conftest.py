@@ -0,0 +1,31 @@
+import pytest
+
+from src.elementtable import ElementTable, RESISTOR, VOLTAGE_SOURCE
+
+
+def make_grid_table(size):
+    """A size x size resistor grid driven by a voltage source at one corner"""
+    kind, start_node, end_node, value = [VOLTAGE_SOURCE], [1], [0], [1.0]
+    node = lambda row, col: row * size + col + 1
+    for row in range(size):
+        for col in range(size):
+            if col + 1 < size:
+                kind.append(RESISTOR)
+                start_node.append(node(row, col))
+                end_node.append(node(row, col + 1))
+                value.append(1.0 + (row + col) % 3)
+            if row + 1 < size:
+                kind.append(RESISTOR)
+                start_node.append(node(row, col))
+                end_node.append(node(row + 1, col))
+                value.append(2.0)
+    kind.append(RESISTOR)
+    start_node.append(node(size - 1, size - 1))
+    end_node.append(0)
+    value.append(5.0)
+    return ElementTable(kind, start_node, end_node, value)
+
+
+@pytest.fixture
+def grid_table():
+    return make_grid_table
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.ac import ACAnalysis
+from src.elementtable import ElementTable, CAPACITOR, INDUCTOR, RESISTOR, VOLTAGE_SOURCE
+from src.netlistparser import Netlist
+from src.solver import DENSE_BATCH_LIMIT
+
+
+class TestACAnalysis:
+    def test_rc_low_pass(self):
+        table = ElementTable(
+            kind=[VOLTAGE_SOURCE, RESISTOR, CAPACITOR],
+            start_node=[1, 1, 2],
+            end_node=[0, 2, 0],
+            value=[1.0, 1e3, 1e-6],
+        )
+        frequencies = np.logspace(0, 6, 2000)
+        solution = ACAnalysis(table).run(frequencies, chunk_size=300)
+        expected = 1 / (1 + 2j * np.pi * frequencies * 1e3 * 1e-6)
+        assert solution.transfer(2, 1) == pytest.approx(expected)
+        assert solution.impedance() == pytest.approx(1e3 + 1 / (2j * np.pi * frequencies * 1e-6))
+
+    def test_series_rlc_resonance(self, tmp_path):
+        path = tmp_path / "rlc.asc"
+        path.write_text("RLC\nv1 1 0 1\nr1 1 2 10\nl1 2 3 1m\nc1 3 0 1u\n.end\n")
+        resonance = 1 / (2 * np.pi * np.sqrt(1e-3 * 1e-6))
+        solution = Netlist.parse(path).ac_sweep([resonance / 2, resonance, resonance * 2])
+        assert np.abs(solution.impedance()) == pytest.approx(
+            [np.abs(10 + 1j * (w * 1e-3 - 1 / (w * 1e-6))) for w in 2 * np.pi * solution.frequencies]
+        )
+        assert np.abs(solution.impedance()[1]) == pytest.approx(10)
+
+    def test_sparse_path_matches_dense(self):
+        sections = DENSE_BATCH_LIMIT
+        kind, start_node, end_node, value = [VOLTAGE_SOURCE], [1], [0], [1.0]
+        for node in range(1, sections + 1):
+            kind += [RESISTOR, CAPACITOR]
+            start_node += [node, node + 1]
+            end_node += [node + 1, 0]
+            value += [10.0, 1e-7]
+        table = ElementTable(kind, start_node, end_node, value)
+        frequencies = [1e3, 1e4, 1e5]
+        solution = ACAnalysis(table).run(frequencies)
+        assert solution.node_voltages.shape == (3, sections + 1)
+        for point, frequency in enumerate(frequencies):
+            admittance = ACAnalysis(table).admittances([frequency])[0]
+            pattern = ACAnalysis(table).pattern
+            matrix = pattern.conductance_matrix(admittance).toarray()
+            rhs = pattern.rhs(table.value)
+            assert solution.x[point] == pytest.approx(np.linalg.solve(matrix, rhs))
+
+    def test_frequencies_must_be_positive(self):
+        table = ElementTable([VOLTAGE_SOURCE, RESISTOR], [1, 1], [0, 0], [1, 1])
+        with pytest.raises(ValueError):
+            ACAnalysis(table).run([0.0])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from src import errors
+from src.decomposition import Decomposition
+from src.elementtable import CAPACITOR, CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.netlistparser import Netlist
+from src.solver import MNASystem
+
+
+def islands():
+    """Two grounded islands, one with a dangling chain and a hanging loop"""
+    return ElementTable(
+        kind=[
+            VOLTAGE_SOURCE, RESISTOR, RESISTOR, RESISTOR,  # island 1: source and loop
+            RESISTOR, RESISTOR,  # chain hanging from node 2
+            RESISTOR, RESISTOR, RESISTOR, CURRENT_SOURCE,  # loop hanging from node 4
+            CURRENT_SOURCE, RESISTOR, RESISTOR,  # island 2, a loop through the ground
+            CAPACITOR,
+        ],
+        start_node=[1, 1, 2, 1, 2, 3, 4, 5, 6, 6, 0, 10, 11, 3],
+        end_node=[0, 2, 0, 0, 3, 4, 5, 6, 4, 4, 10, 11, 0, 20],
+        value=[10.0, 1.0, 2.0, 3.0, 4.0, 5.0, 1.0, 1.0, 1.0, 2.0, 1e-3, 100.0, 200.0, 1e-6],
+    )
+
+
+def assert_same_solution(solution, expected):
+    assert solution.get_node_voltages() == pytest.approx(expected.get_node_voltages())
+    np.testing.assert_allclose(solution.element_currents, expected.element_currents, atol=1e-12)
+
+
+class TestDecomposition:
+    def test_blocks_and_articulation_nodes(self):
+        decomposition = Decomposition(islands())
+        assert decomposition.articulation_nodes.tolist() == [0, 2, 3, 4]
+        blocks = decomposition.blocks
+        assert blocks[1] == blocks[2] == blocks[3] != blocks[4]
+        assert blocks[6] == blocks[7] == blocks[8] == blocks[9]
+        assert blocks[13] == -1
+        reference = decomposition.references
+        assert reference[blocks[0]] == 0
+        assert reference[blocks[5]] == 3
+        assert reference[blocks[6]] == 4
+        assert decomposition.block_table(blocks[6]).nodes().tolist() == [0, 5, 6]
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_stitched_solution_matches_monolithic_solve(self, workers):
+        table = islands()
+        solution = Decomposition(table).solve(workers=workers)
+        assert_same_solution(solution, MNASystem(table).solve())
+        assert solution.get_node_voltage(6) == pytest.approx(
+            MNASystem(table).solve().get_node_voltage(6)
+        )
+
+    def test_deep_block_tree(self):
+        # a 2000 resistor chain: every resistor is a block hanging from the previous one
+        count = 2000
+        table = ElementTable(
+            kind=[CURRENT_SOURCE] + [RESISTOR] * count,
+            start_node=[0] + list(range(1, count + 1)),
+            end_node=[1] + list(range(2, count + 1)) + [0],
+            value=[1e-3] + [1.0] * count,
+        )
+        assert_same_solution(Decomposition(table).solve(), MNASystem(table).solve())
+
+    def test_grid(self, grid_table):
+        table = grid_table(6)
+        assert_same_solution(Decomposition(table).solve(workers=3), MNASystem(table).solve())
+
+    def test_floating_island(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR], [1, 1, 5], [0, 0, 6], [1.0, 1.0, 1.0]
+        )
+        with pytest.raises(errors.SingularCircuitError):
+            Decomposition(table).solve()
+
+    def test_netlist_solve_decomposed(self):
+        netlist = Netlist.from_table(islands())
+        assert_same_solution(netlist.solve_decomposed(), netlist.solve_dc())
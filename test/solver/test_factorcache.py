@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.elementtable import ElementTable, RESISTOR, VOLTAGE_SOURCE
+from src.factorcache import FactorizationCache, LRUCache
+from src.netlistparser import Netlist
+
+
+def divider(top, bottom, source=10.0):
+    return Netlist.from_table(
+        ElementTable(
+            kind=[VOLTAGE_SOURCE, RESISTOR, RESISTOR],
+            start_node=[1, 1, 2],
+            end_node=[0, 2, 0],
+            value=[source, top, bottom],
+        )
+    )
+
+
+class TestLRUCache:
+    def test_entry_limit_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert "b" not in cache
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 0,
+            "evictions": 1,
+            "entries": 2,
+            "bytes": 0,
+        }
+
+    def test_byte_limit(self):
+        cache = LRUCache(max_entries=10, max_bytes=100)
+        cache.put("a", 1, nbytes=60)
+        cache.put("b", 2, nbytes=60)
+        assert "a" not in cache and "b" in cache
+        cache.put("c", 3, nbytes=1000)
+        assert "c" not in cache
+        assert cache.current_bytes == 60
+
+
+class TestFactorizationCache:
+    def test_topology_fingerprint(self):
+        assert divider(1, 2).get_topology_fingerprint() == divider(5, 7).get_topology_fingerprint()
+        other = Netlist.from_table(
+            ElementTable([VOLTAGE_SOURCE, RESISTOR], [1, 1], [0, 0], [1, 1])
+        )
+        assert other.get_topology_fingerprint() != divider(1, 2).get_topology_fingerprint()
+
+    def test_repeat_topology_reuses_pattern(self):
+        cache = FactorizationCache()
+        first = divider(1e3, 3e3).solve_dc(cache=cache)
+        second = divider(2e3, 2e3).solve_dc(cache=cache)
+        assert first.get_node_voltage(2) == pytest.approx(7.5)
+        assert second.get_node_voltage(2) == pytest.approx(5.0)
+        stats = cache.stats()
+        assert stats["patterns"]["hits"] == 1 and stats["patterns"]["misses"] == 1
+        assert stats["factorizations"]["misses"] == 2
+
+    def test_source_change_reuses_factorization(self):
+        cache = FactorizationCache()
+        divider(1e3, 3e3, source=10).solve_dc(cache=cache)
+        solution = divider(1e3, 3e3, source=20).solve_dc(cache=cache)
+        assert solution.get_node_voltage(2) == pytest.approx(15.0)
+        assert cache.stats()["factorizations"]["hits"] == 1
+
+    def test_batch_uses_cached_pattern(self):
+        cache = FactorizationCache()
+        netlist = divider(1e3, 3e3)
+        netlist.solve_dc(cache=cache)
+        batch = netlist.solve_batch(np.array([[10, 1e3, 1e3]]), cache=cache)
+        assert batch.node_voltages[0, 1] == pytest.approx(5.0)
+        assert cache.stats()["patterns"]["hits"] == 1
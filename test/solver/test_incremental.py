@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from src.elementtable import RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.incremental import MAX_LOW_RANK_UPDATES, IncrementalSolver
+from src.netlistparser import Netlist
+from src.solver import MNASystem
+from src import errors
+
+
+def fresh_solution(table, values):
+    return MNASystem(
+        ElementTable(table.kind, table.start_node, table.end_node, values, table.tags)
+    ).solve()
+
+
+class TestIncrementalSolver:
+    def test_resistor_edits_match_full_solves(self, grid_table):
+        table = grid_table(6)
+        solver = IncrementalSolver(table)
+        values = table.value.copy()
+        rng = np.random.default_rng(1)
+        for index in rng.choice(np.arange(1, len(table)), size=8, replace=False):
+            values[index] *= rng.uniform(0.2, 5.0)
+            solution = solver.set_value(index, values[index])
+            expected = fresh_solution(table, values)
+            assert solution.node_voltages == pytest.approx(expected.node_voltages)
+            assert solution.element_currents == pytest.approx(expected.element_currents)
+        assert solver.refactorizations == 1
+
+    def test_too_many_edits_refactorize(self, grid_table):
+        table = grid_table(6)
+        solver = IncrementalSolver(table)
+        values = table.value.copy()
+        for index in range(1, MAX_LOW_RANK_UPDATES + 3):
+            values[index] = 3.5
+            solution = solver.set_value(index, 3.5)
+        assert solver.refactorizations == 2
+        assert solution.node_voltages == pytest.approx(
+            fresh_solution(table, values).node_voltages
+        )
+
+    def test_source_edit(self, grid_table):
+        table = grid_table(4)
+        solver = IncrementalSolver(table)
+        solver.set_value(3, 7.0)
+        solution = solver.set_value(0, 2.0)
+        values = table.value.copy()
+        values[[0, 3]] = [2.0, 7.0]
+        assert solution.node_voltages == pytest.approx(
+            fresh_solution(table, values).node_voltages
+        )
+
+    def test_open_resistor(self, grid_table):
+        table = grid_table(3)
+        solver = IncrementalSolver(table)
+        solution = solver.set_value(1, np.inf)
+        values = table.value.copy()
+        values[1] = np.inf
+        assert solution.node_voltages == pytest.approx(
+            fresh_solution(table, values).node_voltages
+        )
+
+    def test_shorted_resistor(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR, RESISTOR, RESISTOR],
+            [1, 1, 2, 2, 3],
+            [0, 2, 3, 3, 0],
+            [10.0, 1e3, 2e3, 2e3, 1e3],
+        )
+        solver = IncrementalSolver(table)
+        # a short in parallel with another resistor merges nodes 2 and 3
+        solution = solver.set_value(2, 0.0)
+        assert solution.get_node_voltage(2) == pytest.approx(5.0)
+        assert solution.get_node_voltage(3) == pytest.approx(5.0)
+        solution = solver.set_value(2, 2e3)
+        assert solution.node_voltages == pytest.approx(
+            fresh_solution(table, table.value).node_voltages
+        )
+
+    def test_singular_edit_keeps_state(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR], [1, 1, 2], [0, 2, 0], [10.0, 1e3, 1e3]
+        )
+        solver = IncrementalSolver(table)
+        solver.set_value(1, 0.0)
+        refactorizations = solver.refactorizations
+        # a second short in parallel with the source makes a loop of voltage sources
+        with pytest.raises(errors.SingularCircuitError):
+            solver.set_value(2, 0.0)
+        assert solver.values.tolist() == [10.0, 0.0, 1e3]
+        assert solver.refactorizations == refactorizations
+        assert solver.solution().get_node_voltage(2) == pytest.approx(10.0)
+        assert solver.set_value(1, 3e3).get_node_voltage(2) == pytest.approx(2.5)
+
+    def test_failed_refactorization_is_not_counted(self, monkeypatch):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR], [1, 1, 2], [0, 2, 0], [10.0, 1e3, 1e3]
+        )
+        solver = IncrementalSolver(table)
+        # the factorization succeeds but its solution is not finite
+        monkeypatch.setattr(MNASystem, "solve_rhs", lambda system, rhs: np.full(len(rhs), np.nan))
+        with pytest.raises(errors.SingularCircuitError):
+            solver.set_value(1, 0.0)
+        assert solver.refactorizations == 1
+        assert solver.values.tolist() == [10.0, 1e3, 1e3]
+
+
+class TestNetlistUpdate:
+    def test_update_by_tag(self, tmp_path):
+        path = tmp_path / "circuit.asc"
+        path.write_text("Title\nv1 1 0 dc 10\nr1 1 2 1k\nr2 2 0 3k\n.end\n")
+        netlist = Netlist.parse(path)
+        assert netlist.solve_dc().get_node_voltage(2) == pytest.approx(7.5)
+        solution = netlist.update_element_value("r1", "3k")
+        assert solution.get_node_voltage(2) == pytest.approx(5.0)
+        assert netlist.get_resistors()[0].value == 3000
+        assert netlist.solve_dc().get_node_voltage(2) == pytest.approx(5.0)
+
+    def test_update_by_name_with_equal_generated_tags(self, tmp_path):
+        path = tmp_path / "circuit.asc"
+        path.write_text("Title\nv1 1 0 10\nr1 1 2 1k\nr2 1 2 1k\nr3 2 0 1k\n.end\n")
+        netlist = Netlist.parse(path)
+        # r1 and r2 are both R_12 in the components, the Netlist names tell them apart
+        solution = netlist.update_element_value("r2", 1e12)
+        assert solution.get_node_voltage(2) == pytest.approx(5.0)
+
+    def test_unknown_tag(self, grid_table):
+        netlist = Netlist.from_table(grid_table(2))
+        with pytest.raises(KeyError):
+            netlist.update_element_value("R_99", 1)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.elementtable import ElementTable, RESISTOR, VOLTAGE_SOURCE
+from src.ordering import COLAMD, NATURAL, REVERSE_CUTHILL_MCKEE, NodeNumbering
+from src.solver import MNAPattern, MNASystem
+
+
+def sparse_ladder():
+    """A ladder whose node numbers are arbitrary, sparse integers"""
+    return ElementTable(
+        kind=[VOLTAGE_SOURCE, RESISTOR, RESISTOR, RESISTOR, RESISTOR],
+        start_node=[9000, 9000, 42, 42, 7],
+        end_node=[0, 42, 0, 7, 0],
+        value=[10.0, 1.0, 2.0, 3.0, 4.0],
+    )
+
+
+class TestNodeNumbering:
+    def test_dense_index_with_ground_first(self):
+        numbering = NodeNumbering.from_table(sparse_ladder())
+        assert numbering.nodes.tolist() == [0, 7, 42, 9000]
+        assert numbering.index([9000, 0, 7]).tolist() == [3, 0, 1]
+        assert numbering.original([3, 0, 1]).tolist() == [9000, 0, 7]
+
+    def test_unknown_node(self):
+        with pytest.raises(KeyError):
+            NodeNumbering.from_table(sparse_ladder()).index([8])
+
+    def test_renumbered_table_has_the_same_solution(self):
+        table = sparse_ladder()
+        numbering = NodeNumbering.from_table(table)
+        dense = numbering.renumber(table)
+        assert dense.nodes().tolist() == [0, 1, 2, 3]
+        assert dense.tags == table.tags
+
+        voltages = MNASystem(table).solve().get_node_voltages()
+        dense_voltages = MNASystem(dense).solve().get_node_voltages()
+        for index, voltage in dense_voltages.items():
+            assert voltages[int(numbering.original(index))] == pytest.approx(voltage)
+
+
+class TestFillReducingOrdering:
+    @pytest.mark.parametrize("ordering", [NATURAL, COLAMD, REVERSE_CUTHILL_MCKEE])
+    def test_orderings_agree(self, grid_table, ordering):
+        table = grid_table(8)
+        expected = MNASystem(table).solve().node_voltages
+        system = MNASystem(table, pattern=MNAPattern(table, ordering=ordering))
+        np.testing.assert_allclose(system.solve().node_voltages, expected)
+
+    def test_default_ordering_reduces_fill(self, grid_table):
+        table = grid_table(30)
+        fill = {
+            ordering: MNAPattern(table, ordering=ordering).factorize(table.value).fill
+            for ordering in (None, NATURAL, COLAMD)
+            if ordering is not None
+        }
+        default_fill = MNAPattern(table).factorize(table.value).fill
+        assert default_fill < fill[COLAMD] < fill[NATURAL]
+
+    def test_ordering_is_reused(self, grid_table):
+        table = grid_table(20)
+        pattern = MNAPattern(table)
+        first = pattern.factorize(table.value)
+        ordering = pattern.column_ordering.copy()
+        second = pattern.factorize(table.value * 2)
+        np.testing.assert_array_equal(pattern.column_ordering, ordering)
+        assert second.fill <= 1.05 * first.fill
+
+    def test_rcm_ordering_is_computed_up_front(self, grid_table):
+        pattern = MNAPattern(grid_table(5), ordering=REVERSE_CUTHILL_MCKEE)
+        assert sorted(pattern.column_ordering.tolist()) == list(range(pattern.size))
+
+    def test_unknown_ordering(self, grid_table):
+        with pytest.raises(ValueError):
+            MNAPattern(grid_table(3), ordering="AMD")
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.elementtable import CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.netlistparser import Netlist
+from src.solver import MNASystem
+from src import ports
+
+
+def divider_table():
+    return ElementTable(
+        [VOLTAGE_SOURCE, RESISTOR, RESISTOR, CURRENT_SOURCE],
+        [1, 1, 2, 0],
+        [0, 2, 0, 2],
+        [10.0, 1e3, 1e3, 1e-3],
+    )
+
+
+def brute_force_equivalent(element_table, start_node, end_node):
+    """The resistance seen by a 1A test current from end_node to start_node,
+    with the sources of the circuit turned off"""
+    kind = element_table.kind
+    values = np.where(kind == RESISTOR, element_table.value, 0.0)
+    table = ElementTable(
+        np.append(kind, CURRENT_SOURCE),
+        np.append(element_table.start_node, end_node),
+        np.append(element_table.end_node, start_node),
+        np.append(values, 1.0),
+    )
+    solution = MNASystem(table).solve()
+    voltage = lambda node: 0.0 if node == 0 else solution.get_node_voltage(node)
+    return voltage(start_node) - voltage(end_node)
+
+
+class TestPortEquivalents:
+    def test_divider(self):
+        equivalents = ports.port_equivalents(
+            MNASystem(divider_table()), [(2, 0), (0, 2), (1, 2), (1, 0), (2, 2)]
+        )
+        assert len(equivalents) == 5
+        # 10V/2 plus 1mA through 500 ohms
+        assert equivalents.voltage == pytest.approx([5.5, -5.5, 4.5, 10.0, 0.0])
+        assert equivalents.resistance == pytest.approx([500.0, 500.0, 500.0, 0.0, 0.0], abs=1e-9)
+        assert equivalents.current[:3] == pytest.approx([0.011, -0.011, 0.009])
+        assert np.isinf(equivalents.current[3])
+        assert equivalents.get_equivalent(2, 0) == pytest.approx((5.5, 500.0))
+
+    @pytest.mark.parametrize("max_transfer_nodes", [0, 4096])
+    def test_grid_matches_test_sources(self, grid_table, monkeypatch, max_transfer_nodes):
+        monkeypatch.setattr(ports, "MAX_TRANSFER_NODES", max_transfer_nodes)
+        monkeypatch.setattr(ports, "SOLVE_BLOCK_SIZE", 3)
+        table = grid_table(4)
+        pairs = [(2, 0), (16, 0), (5, 11), (11, 5), (3, 14), (16, 2), (7, 8)]
+        system = MNASystem(table)
+        equivalents = ports.port_equivalents(system, pairs)
+        solution = system.solve()
+        voltage = lambda node: 0.0 if node == 0 else solution.get_node_voltage(node)
+        for (a, b), port_voltage, resistance in zip(
+            pairs, equivalents.voltage, equivalents.resistance
+        ):
+            assert port_voltage == pytest.approx(voltage(a) - voltage(b))
+            assert resistance == pytest.approx(brute_force_equivalent(table, a, b))
+
+    def test_unknown_node(self):
+        with pytest.raises(KeyError):
+            ports.port_equivalents(MNASystem(divider_table()), [(2, 7)])
+
+    def test_netlist(self):
+        netlist = Netlist.from_table(divider_table())
+        equivalents = netlist.port_equivalents([(2, 0)])
+        assert equivalents.get_equivalent(2, 0) == pytest.approx((5.5, 500.0))
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from src.elementtable import CAPACITOR, CURRENT_SOURCE, RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.netlistparser import Netlist
+from src.sensitivity import adjoint_sensitivities
+from src.solver import MNASystem
+
+
+def finite_differences(element_table, nodes, step=1e-6):
+    """Differentiates the node voltages with one perturbed solve per element"""
+    def voltages(values):
+        table = ElementTable(
+            element_table.kind, element_table.start_node, element_table.end_node, values
+        )
+        solution = MNASystem(table).solve()
+        return np.array([solution.get_node_voltage(node) for node in nodes])
+
+    values = element_table.value.astype(np.float64)
+    columns = []
+    for element in range(len(values)):
+        delta = step * max(abs(values[element]), 1.0)
+        up, down = values.copy(), values.copy()
+        up[element] += delta
+        down[element] -= delta
+        columns.append((voltages(up) - voltages(down)) / (2 * delta))
+    return np.column_stack(columns)
+
+
+class TestAdjointSensitivities:
+    def test_divider(self):
+        table = ElementTable(
+            [VOLTAGE_SOURCE, RESISTOR, RESISTOR, CURRENT_SOURCE, CAPACITOR],
+            [1, 1, 2, 0, 2],
+            [0, 2, 0, 2, 0],
+            [10.0, 1e3, 3e3, 1e-3, 1e-6],
+            ["v1", "r1", "r2", "i1", "c1"],
+        )
+        sensitivities = adjoint_sensitivities(MNASystem(table), [2])
+        # V2 = (10 / r1 + i1) r1 r2 / (r1 + r2)
+        assert sensitivities["v1"] == pytest.approx([0.75])
+        assert sensitivities["i1"] == pytest.approx([750.0])
+        assert sensitivities["r1"] == pytest.approx([(-10 * 3e3 + 1e-3 * 9e6) / 16e6])
+        assert sensitivities["r2"] == pytest.approx([(10 * 1e3 + 1e-3 * 1e6) / 16e6])
+        assert sensitivities["c1"] == pytest.approx([0.0])
+        with pytest.raises(KeyError):
+            sensitivities["r9"]
+
+    def test_matches_finite_differences(self, grid_table):
+        base = grid_table(4)
+        table = ElementTable(
+            np.append(base.kind, [CURRENT_SOURCE, VOLTAGE_SOURCE]),
+            np.append(base.start_node, [0, 16]),
+            np.append(base.end_node, [7, 11]),
+            np.append(base.value, [2e-3, 0.5]),
+        )
+        nodes = [0, 3, 7, 11, 16]
+        expected = finite_differences(table, nodes)
+        sensitivities = adjoint_sensitivities(MNASystem(table), nodes)
+        assert sensitivities.values.shape == (5, len(table))
+        assert sensitivities.values[0] == pytest.approx(np.zeros(len(table)))
+        assert sensitivities.values == pytest.approx(expected, rel=1e-5, abs=1e-9)
+        # a pattern that already has its column ordering solves the permuted system
+        pattern = MNASystem(table).pattern
+        pattern.factorize(table.value)
+        reordered = adjoint_sensitivities(MNASystem(table, pattern=pattern), nodes)
+        assert reordered.values == pytest.approx(expected, rel=1e-5, abs=1e-9)
+
+    def test_netlist_all_nodes(self):
+        netlist = Netlist.parse("netlist_complex.asc")
+        sensitivities = netlist.sensitivities()
+        assert len(sensitivities) == len(netlist.solve_dc().nodes)
+        assert set(sensitivities.as_dict()) == set(netlist.element_table.tags)
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from src.components import Resistor, VoltageSource, CurrentSource
+from src.decomposition import Decomposition
+from src.elementtable import ElementTable
+from src.netlistparser import Netlist
+from src.solver import MNASystem
+from src import errors
+
+
+def write_netlist(tmp_path, lines):
+    path = tmp_path / "circuit.asc"
+    path.write_text("\n".join(["Test circuit", *lines, ".end"]) + "\n")
+    return path
+
+
+class TestMNASolver:
+    def test_voltage_divider(self):
+        netlist = Netlist.load(
+            {
+                "v": [VoltageSource("10", 1, 0)],
+                "r": [Resistor("1k", 1, 2), Resistor("3k", 2, 0)],
+                "i": [],
+                "l": [],
+                "c": [],
+            }
+        )
+        solution = netlist.solve_dc()
+        assert solution.get_node_voltage(2) == pytest.approx(7.5)
+        assert solution.resistor_currents == pytest.approx([2.5e-3, 2.5e-3])
+        assert solution.voltage_source_currents == pytest.approx([-2.5e-3])
+
+    def test_multiple_sources(self, tmp_path):
+        path = write_netlist(
+            tmp_path,
+            ["v1 0 1 dc 24", "v2 3 0 dc 15", "r1 1 2 10k", "r2 2 3 8.1k", "r3 2 0 4.7k"],
+        )
+        solution = Netlist.parse(path).solve_dc()
+        v1, v3 = -24.0, 15.0
+        v2 = (v1 / 10e3 + v3 / 8.1e3) / (1 / 10e3 + 1 / 8.1e3 + 1 / 4.7e3)
+        voltages = solution.get_node_voltages()
+        assert voltages[1] == pytest.approx(v1)
+        assert voltages[2] == pytest.approx(v2)
+        assert voltages[3] == pytest.approx(v3)
+
+    def test_unbalanced_bridge(self, tmp_path):
+        path = write_netlist(
+            tmp_path,
+            [
+                "v1 1 0 dc 1",
+                "r1 1 2 1",
+                "r2 1 3 2",
+                "r3 2 3 3",
+                "r4 2 0 4",
+                "r5 3 0 5",
+            ],
+        )
+        solution = Netlist.parse(path).solve_dc()
+        source_current = -solution.voltage_source_currents[0]
+        assert 1 / source_current == pytest.approx(61 / 21)
+
+    def test_source_polarity_in_both_parse_modes(self, tmp_path):
+        path = write_netlist(
+            tmp_path, ["v1 2 1 10", "i1 3 2 1m", "r1 1 0 1k", "r2 2 0 1k", "r3 3 0 1k"]
+        )
+        solutions = [Netlist.parse(path, columnar=columnar).solve_dc() for columnar in (False, True)]
+        for solution in solutions:
+            # V(2) - V(1) = 10, with 1 mA pushed from node 3 into node 2
+            assert solution.get_node_voltage(2) - solution.get_node_voltage(1) == pytest.approx(10)
+            assert solution.get_node_voltage(3) == pytest.approx(-1.0)
+        assert solutions[0].get_node_voltages() == pytest.approx(solutions[1].get_node_voltages())
+
+    def test_inductor_is_a_short_in_dc(self, tmp_path):
+        path = write_netlist(
+            tmp_path, ["v1 1 0 10", "r1 1 2 1k", "l1 2 3 1m", "r2 3 0 1k", "c1 3 0 1u"]
+        )
+        solution = Netlist.parse(path, columnar=True).solve_dc()
+        assert solution.get_node_voltage(2) == pytest.approx(5.0)
+        assert solution.get_node_voltage(3) == pytest.approx(5.0)
+        assert solution.element_currents[2] == pytest.approx(5e-3)
+        assert np.isnan(solution.element_currents[4])
+        # the blocks of the decomposition stamp the inductor the same way
+        decomposed = Decomposition(Netlist.parse(path, columnar=True).element_table).solve()
+        assert decomposed.get_node_voltage(3) == pytest.approx(5.0)
+
+    def test_current_source(self):
+        system = MNASystem.from_elements(
+            resistors=[Resistor("2", 1, 0)],
+            voltage_sources=[],
+            current_sources=[CurrentSource("3", 0, 1)],
+        )
+        assert system.solve().get_node_voltage(1) == pytest.approx(6.0)
+
+    def test_floating_node_is_singular(self):
+        system = MNASystem.from_elements(
+            resistors=[Resistor("1", 1, 0), Resistor("1", 2, 3)],
+            voltage_sources=[VoltageSource("1", 1, 0)],
+            current_sources=[],
+        )
+        with pytest.raises(errors.SingularCircuitError):
+            system.solve()
+
+
+class TestBatchSolve:
+    @pytest.mark.parametrize("size", [3, 14])
+    def test_batch_matches_single_solves(self, grid_table, size):
+        table = grid_table(size)
+        rng = np.random.default_rng(0)
+        values = table.value * rng.uniform(0.9, 1.1, size=(5, len(table)))
+        batch = Netlist.from_table(table).solve_batch(values)
+        assert batch.node_voltages.shape == (5, size * size)
+        for run, run_values in enumerate(values):
+            run_table = ElementTable(table.kind, table.start_node, table.end_node, run_values)
+            solution = MNASystem(run_table).solve()
+            assert batch.node_voltages[run] == pytest.approx(solution.node_voltages)
+            assert batch.element_currents[run] == pytest.approx(solution.element_currents)
+            assert batch.effective_resistance[run] == pytest.approx(
+                solution.get_effective_resistance()
+            )
+
+    def test_effective_resistance(self):
+        netlist = Netlist.load(
+            {
+                "v": [VoltageSource("10", 1, 0)],
+                "r": [Resistor("1k", 1, 2), Resistor("3k", 2, 0)],
+                "i": [],
+                "l": [],
+                "c": [],
+            }
+        )
+        assert netlist.element_table.tags == ["R_12", "R_20", "V_10"]
+        values = np.array([[1e3, 3e3, 10], [2e3, 2e3, 5]])
+        batch = netlist.solve_batch(values)
+        assert batch.effective_resistance == pytest.approx([4e3, 4e3])
+        assert batch.node_voltages[:, 1] == pytest.approx([7.5, 2.5])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from src.elementtable import RESISTOR, VOLTAGE_SOURCE, ElementTable
+from src.netlistparser import Netlist
+from src.solver import MNASystem
+from src.sweep import ParametricNetlist
+from src import errors
+
+
+DIVIDER = [
+    "Divider",
+    "v1 1 0 {vin}",
+    "r1 1 2 {R0}",
+    "r2 2 0 {2 * R0 + rload}",
+    ".param vin=10 rload=1k R0=1k",
+]
+
+
+def solve_divider(vin, r0, rload):
+    table = ElementTable(
+        [VOLTAGE_SOURCE, RESISTOR, RESISTOR], [1, 1, 2], [0, 2, 0], [vin, r0, 2 * r0 + rload]
+    )
+    return MNASystem(table).solve().get_node_voltage(2)
+
+
+class TestParametricNetlist:
+    def test_param_step_matches_single_solves(self):
+        netlist = ParametricNetlist.from_lines(DIVIDER + [".step param R0 1k 3k 1k"])
+        assert len(netlist) == 3
+        points = list(netlist.run())
+        assert [point.index for point in points] == [0, 1, 2]
+        for point, r0 in zip(points, [1e3, 2e3, 3e3]):
+            assert point.parameters["R0"] == r0
+            assert point.get_node_voltage(2) == pytest.approx(solve_divider(10.0, r0, 1e3))
+            current = (10.0 - point.get_node_voltage(2)) / r0
+            assert point.element_currents[1] == pytest.approx(current)
+
+    def test_dc_source_sweep(self, tmp_path):
+        path = tmp_path / "divider.asc"
+        path.write_text("\n".join(DIVIDER + [".dc v1 0 10 2.5", ".end"]) + "\n")
+        points = list(Netlist.sweep(path))
+        assert [point.parameters["v1"] for point in points] == [0.0, 2.5, 5.0, 7.5, 10.0]
+        voltages = [point.get_node_voltage(2) for point in points]
+        assert np.allclose(voltages, np.array([0.0, 2.5, 5.0, 7.5, 10.0]) * 0.75)
+
+    def test_nested_sweeps_first_varies_fastest(self):
+        netlist = ParametricNetlist.from_lines(
+            DIVIDER + [".step param rload list 0 1k", ".step param R0 list 1k 2k 4k"]
+        )
+        assert netlist.shape == (2, 3)
+        points = list(netlist.run(chunk_size=4))
+        assert [(p.parameters["rload"], p.parameters["R0"]) for p in points] == [
+            (0.0, 1e3), (1e3, 1e3), (0.0, 2e3), (1e3, 2e3), (0.0, 4e3), (1e3, 4e3)
+        ]
+        for point in points:
+            expected = solve_divider(10.0, point.parameters["R0"], point.parameters["rload"])
+            assert point.get_node_voltage(2) == pytest.approx(expected)
+
+    def test_streams_lazily(self):
+        netlist = ParametricNetlist.from_lines(DIVIDER + [".step param R0 1 1000 1"])
+        points = netlist.run(chunk_size=10)
+        first = next(points)
+        assert first.index == 0 and first.parameters["R0"] == 1.0
+        assert next(points).index == 1
+
+    def test_workers_agree_with_serial(self):
+        netlist = ParametricNetlist.from_lines(
+            DIVIDER + [".step param R0 list 1k 2k 3k", ".dc v1 0 10 5"]
+        )
+        serial = np.array([point.node_voltages for point in netlist.run(chunk_size=2)])
+        parallel = np.array(
+            [point.node_voltages for point in netlist.run(chunk_size=2, workers=2)]
+        )
+        assert np.allclose(serial, parallel)
+
+    def test_unknown_sweep_name(self):
+        with pytest.raises(errors.ParameterError):
+            ParametricNetlist.from_lines(DIVIDER + [".dc v9 0 1 1"])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.elementtable import ElementTable, CAPACITOR, INDUCTOR, RESISTOR, VOLTAGE_SOURCE
+from src.netlistparser import Netlist
+from src.transient import BACKWARD_EULER, TransientAnalysis, WaveformFile
+
+
+def rc_table():
+    """1V step into a 1k / 1u RC low pass (tau = 1ms)"""
+    return ElementTable(
+        kind=[VOLTAGE_SOURCE, RESISTOR, CAPACITOR],
+        start_node=[1, 1, 2],
+        end_node=[0, 2, 0],
+        value=[1.0, 1e3, 1e-6],
+        tags=["v1", "r1", "c1"],
+    )
+
+
+class TestTransientAnalysis:
+    def test_rc_step_response(self):
+        analysis = TransientAnalysis(rc_table())
+        waveform = analysis.run(5e-3, 1e-5)
+        expected = 1 - np.exp(-waveform.times / 1e-3)
+        assert len(waveform) == 500
+        assert waveform.signal("V(2)") == pytest.approx(expected, abs=1e-4)
+        assert analysis.factorizations == 2
+
+    def test_backward_euler(self):
+        waveform = TransientAnalysis(rc_table(), method=BACKWARD_EULER).run(5e-3, 1e-5)
+        expected = 1 - np.exp(-waveform.times / 1e-3)
+        assert waveform.signal("V(2)") == pytest.approx(expected, abs=5e-3)
+
+    def test_rl_current(self, tmp_path):
+        path = tmp_path / "rl.asc"
+        path.write_text("RL\nv1 1 0 dc 1\nr1 1 2 1\nl1 2 0 1m\n.end\n")
+        waveform = Netlist.parse(path, columnar=True).transient(5e-3, 1e-5)
+        expected = 1 - np.exp(-waveform.times / 1e-3)
+        assert waveform.signal("I(l1)") == pytest.approx(expected, abs=1e-4)
+
+    def test_adaptive_step(self):
+        analysis = TransientAnalysis(rc_table())
+        waveform = analysis.run(5e-3, 1e-4, adaptive=True, reltol=1e-3)
+        expected = 1 - np.exp(-waveform.times / 1e-3)
+        assert waveform.times[-1] == pytest.approx(5e-3)
+        assert len(waveform) < 500
+        assert waveform.signal("V(2)") == pytest.approx(expected, abs=1e-4)
+
+    def test_source_waveform(self):
+        analysis = TransientAnalysis(rc_table(), sources={0: lambda time: 2.0})
+        waveform = analysis.run(10e-3, 1e-5)
+        assert waveform.signal("V(2)")[-1] == pytest.approx(2.0, abs=1e-3)
+
+    def test_stream_to_file(self, tmp_path):
+        analysis = TransientAnalysis(rc_table())
+        path = tmp_path / "waveform.bin"
+        analysis.run(5e-3, 1e-5, output=path)
+        data = WaveformFile.load(path, analysis.columns)
+        assert data.shape == (500, len(analysis.columns) + 1)
+        in_memory = TransientAnalysis(rc_table()).run(5e-3, 1e-5)
+        assert data[:, 1:] == pytest.approx(in_memory.values)
@@ -0,0 +1,102 @@
+import pytest
+
+from src import errors
+from src.netlistparser import Netlist
+from src.netlistreader import iter_netlist_records
+from src.subcircuit import hierarchical_table, parse_hierarchical
+
+
+DIVIDER = """Divider cells
+.subckt div a b
+r1 a m 1k
+r2 m b 2k
+r3 m 0 3k
+.ends
+v1 1 0 10
+x1 1 2 div
+r1 2 0 500
+x2 2 0 DIV
+.end
+"""
+
+FLAT_DIVIDER = """Flattened divider cells
+v1 1 0 10
+r11 1 10 1k
+r12 10 2 2k
+r13 10 0 3k
+r1 2 0 500
+r21 2 20 1k
+r22 20 0 2k
+r23 20 0 3k
+.end
+"""
+
+
+def voltages(text):
+    return Netlist.from_text(text).solve_dc().get_node_voltages()
+
+
+class TestSubcircuits:
+    def test_macromodel_matches_the_flattened_circuit(self):
+        reduced, flat = voltages(DIVIDER), voltages(FLAT_DIVIDER)
+        for node in (1, 2):
+            assert reduced[node] == pytest.approx(flat[node])
+
+    def test_internal_sources_become_a_norton_equivalent(self):
+        text = """Thevenin cell
+.subckt battery p
+v1 n 0 5
+r1 n p 100
+i1 0 n 1m
+.ends
+x1 1 battery
+r1 1 0 100
+"""
+        assert voltages(text)[1] == pytest.approx(2.5)
+
+    def test_each_definition_is_reduced_once(self):
+        chain = "\n".join(f"r{k} n{k} n{k + 1} 1" for k in range(50))
+        instances = "\n".join(f"x{k} {k + 1} {k + 2} chain" for k in range(1000))
+        text = f"Chains\n.subckt chain n0 n50\n{chain}\n.ends\nv1 1 0 1\n{instances}\nr1 1001 0 50\n"
+        records, parsed_instances, library = parse_hierarchical(text.splitlines())
+        table = library.expand(parsed_instances)
+        assert library.reductions == 1
+        assert len(table) == 1000
+        assert table.value[0] == pytest.approx(50.0)
+        assert table.tags[0] == "rx0.n0.n50"
+        assert voltages(text)[1001] == pytest.approx(50 / (50 * 1000 + 50))
+
+    def test_nested_subcircuits(self):
+        text = """Nested
+.subckt half a b
+r1 a b 2k
+.ends
+.subckt pair a b
+x1 a b half
+x2 a b half
+.ends
+v1 1 0 1
+x1 1 0 pair
+"""
+        solution = Netlist.from_text(text).solve_dc()
+        assert solution.get_effective_resistance() == pytest.approx(1000.0)
+
+    def test_shared_instance_nodes_are_collapsed(self):
+        table = hierarchical_table(DIVIDER.replace("x2 2 0 DIV", "x2 2 2 div").splitlines())
+        assert all(start != end for start, end in zip(table.start_node, table.end_node))
+
+    def test_invalid_subcircuits(self):
+        with pytest.raises(errors.SubcircuitError):
+            hierarchical_table(["Title", "x1 1 0 missing"])
+        with pytest.raises(errors.SubcircuitError):
+            hierarchical_table(["Title", ".subckt rc a", "c1 a 0 1u", ".ends", "x1 1 rc"])
+        with pytest.raises(errors.SubcircuitError):
+            hierarchical_table(["Title", ".subckt loop a", "x1 a loop", ".ends", "x1 1 loop"])
+        with pytest.raises(errors.NetlistSyntaxError):
+            hierarchical_table(["Title", ".subckt open a", "r1 a 0 1"])
+        with pytest.raises(errors.NetlistSyntaxError):
+            hierarchical_table(["Title", ".subckt one a", "r1 a 0 1", ".ends", "x1 1 2 one"])
+
+    def test_flat_reader_rejects_subcircuits(self):
+        with pytest.raises(errors.NetlistSyntaxError):
+            list(iter_netlist_records(DIVIDER.splitlines()))